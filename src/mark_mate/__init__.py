@@ -6,19 +6,46 @@ with support for multiple content types, GitHub repository analysis, WordPress a
 and AI-powered assessment.
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 __author__ = "MarkMate Development Team"
 __email__ = "dev@markmate.ai"
 
-# Import main classes for library usage
-from .config.grading_config import GradingConfigManager
-from .core.analyzer import ContentAnalyzer
-from .core.enhanced_grader import EnhancedGradingSystem
-from .core.llm_provider import LLMProvider
-from .core.processor import AssignmentProcessor
+# Main classes for library usage, imported on first access (PEP 562) so that
+# the CLI does not load LiteLLM and the provider SDKs just to print --help
+_LAZY_IMPORTS: dict[str, tuple[str, str]] = {
+    "EnhancedGradingSystem": (".core.enhanced_grader", "EnhancedGradingSystem"),
+    # Legacy alias for backward compatibility (if needed)
+    "GradingSystem": (".core.enhanced_grader", "EnhancedGradingSystem"),
+    "LLMProvider": (".core.llm_provider", "LLMProvider"),
+    "AssignmentProcessor": (".core.processor", "AssignmentProcessor"),
+    "ContentAnalyzer": (".core.analyzer", "ContentAnalyzer"),
+    "GradingConfigManager": (".config.grading_config", "GradingConfigManager"),
+}
+
+if TYPE_CHECKING:
+    from .config.grading_config import GradingConfigManager
+    from .core.analyzer import ContentAnalyzer
+    from .core.enhanced_grader import EnhancedGradingSystem
+    from .core.enhanced_grader import EnhancedGradingSystem as GradingSystem
+    from .core.llm_provider import LLMProvider
+    from .core.processor import AssignmentProcessor
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        module_name, attribute = _LAZY_IMPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
 
-# Legacy alias for backward compatibility (if needed)
-GradingSystem = EnhancedGradingSystem
 
 __all__ = [
     "EnhancedGradingSystem",
@@ -217,10 +217,66 @@ def process_regular_files(
     logger.info(f"Created consolidated zip: {zip_path}")
 
 
+def group_student_files(folder_path):
+    """
+    Group the files in a submissions folder by student ID.
+
+    Args:
+        folder_path: Path to the raw submissions folder
+
+    Returns:
+        Tuple of a dictionary mapping student IDs to file paths and a list of
+        filenames without a student ID
+    """
+    student_files = defaultdict(list)
+    unmatched_files = []
+
+    for filename in os.listdir(folder_path):
+        file_path = os.path.join(folder_path, filename)
+        if os.path.isfile(file_path):
+            student_id = extract_student_id(filename)
+            if student_id:
+                student_files[student_id].append(file_path)
+            else:
+                unmatched_files.append(filename)
+
+    return student_files, unmatched_files
+
+
+def consolidate_student(
+    files, student_id, output_dir, wordpress=False, no_zip=False, keep_mac_files=False
+):
+    """
+    Consolidate one student's files into the output directory.
+
+    Args:
+        files: Paths of the student's submitted files
+        student_id: Student ID
+        output_dir: Output directory for processed submissions
+        wordpress: Whether to organize WordPress backups
+        no_zip: Copy zip files instead of extracting them
+        keep_mac_files: Keep Mac system files
+
+    Returns:
+        Path to the consolidated submission: a folder for WordPress backups,
+        otherwise a zip file
+    """
+    if wordpress and any(
+        is_wordpress_backup_file(os.path.basename(f)) for f in files
+    ):
+        organize_wordpress_files(files, student_id, output_dir)
+        return os.path.join(output_dir, f"{student_id}")
+
+    process_regular_files(files, student_id, output_dir, no_zip, keep_mac_files)
+    return os.path.join(output_dir, f"{student_id}.zip")
+
+
 def main(args) -> int:
     """Main consolidation logic."""
     folder_path = args.folder_path
     output_dir = args.output_dir
+    # threading.Event set by the GUI to stop between students
+    stop_event = getattr(args, "stop_event", None)
 
     if not os.path.exists(folder_path):
         logger.error(f"Input folder does not exist: {folder_path}")
@@ -232,17 +288,7 @@ def main(args) -> int:
     logger.info(f"Output directory: {output_dir}")
 
     # Group files by student ID
-    student_files = defaultdict(list)
-    unmatched_files = []
-
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        if os.path.isfile(file_path):
-            student_id = extract_student_id(filename)
-            if student_id:
-                student_files[student_id].append(file_path)
-            else:
-                unmatched_files.append(filename)
+    student_files, unmatched_files = group_student_files(folder_path)
 
     if unmatched_files:
         logger.warning(f"Files without student ID pattern: {len(unmatched_files)}")
@@ -253,23 +299,19 @@ def main(args) -> int:
 
     # Process each student's files
     for student_id, files in student_files.items():
-        logger.info(f"Processing student {student_id}: {len(files)} files")
+        if stop_event is not None and stop_event.is_set():
+            logger.warning("Consolidation cancelled")
+            return 1
 
-        if args.wordpress:
-            # Check if any files are WordPress backups
-            wordpress_files = [
-                f for f in files if is_wordpress_backup_file(os.path.basename(f))
-            ]
-            if wordpress_files:
-                organize_wordpress_files(files, student_id, output_dir)
-            else:
-                process_regular_files(
-                    files, student_id, output_dir, args.no_zip, args.keep_mac_files
-                )
-        else:
-            process_regular_files(
-                files, student_id, output_dir, args.no_zip, args.keep_mac_files
-            )
+        logger.info(f"Processing student {student_id}: {len(files)} files")
+        consolidate_student(
+            files,
+            student_id,
+            output_dir,
+            wordpress=args.wordpress,
+            no_zip=args.no_zip,
+            keep_mac_files=args.keep_mac_files,
+        )
 
     logger.info(f"Consolidation complete! Processed {len(student_files)} students")
     logger.info(f"Output saved to: {output_dir}/")
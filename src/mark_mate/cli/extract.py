@@ -8,11 +8,16 @@ Extracts and analyzes content from student submissions with comprehensive multi-
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Optional
+
+from .. import __version__
+from ..core.result_cache import ResultCache
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +25,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Database of extraction results, stored alongside the grading result cache
+EXTRACT_CACHE_FILENAME = "extraction_results.sqlite3"
+
 
 def add_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) -> argparse.ArgumentParser:
     """Add extract command parser.
@@ -66,6 +74,17 @@ def add_parser(subparsers: argparse._SubParsersAction[argparse.ArgumentParser])
         help="Maximum number of students to process (for testing)",
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for cached extraction results (default: ~/.cache/mark_mate)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Extract every submission instead of reusing cached results",
+    )
+
     return parser
 
 
@@ -146,6 +165,99 @@ def find_student_submissions(submissions_folder, max_students=None):
     return submissions
 
 
+def hash_submission(submission_path):
+    """
+    Hash the contents of a submission file or folder.
+
+    Args:
+        submission_path: Path to the student's submission
+
+    Returns:
+        Hex BLAKE2b digest of the relative paths and bytes of every file
+    """
+    digest = hashlib.blake2b()
+    root = Path(submission_path)
+    if root.is_dir():
+        files = sorted(path for path in root.rglob("*") if path.is_file())
+    else:
+        files = [root]
+
+    for path in files:
+        digest.update(path.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def extraction_cache_key(submission_path, student_id, wordpress) -> Optional[str]:
+    """
+    Build the extraction cache key for a submission.
+
+    Args:
+        submission_path: Path to the student's submission
+        student_id: Student ID
+        wordpress: Whether WordPress processing is enabled
+
+    Returns:
+        Cache key, or None if the submission could not be hashed
+    """
+    try:
+        submission_hash = hash_submission(submission_path)
+    except OSError as e:
+        logger.warning(f"Could not hash submission for student {student_id}: {e}")
+        return None
+
+    return ResultCache.make_key(
+        "extract", __version__, student_id, wordpress, submission_hash
+    )
+
+
+def extract_submission_cached(
+    submission_path,
+    student_id,
+    result_cache: Optional[ResultCache],
+    new_cache_entries: list[tuple[str, dict[str, Any]]],
+    wordpress=False,
+    github_url=None,
+):
+    """
+    Extract a submission, reusing a cached result for unchanged content.
+
+    Args:
+        submission_path: Path to the student's submission
+        student_id: Student ID
+        result_cache: Extraction cache, or None to always extract
+        new_cache_entries: New ``(key, result)`` pairs are appended here, for
+            the caller to store with ``ResultCache.set_many``
+        wordpress: Whether to enable WordPress processing
+        github_url: GitHub repository URL to analyze
+
+    Returns:
+        Dictionary containing extracted content
+    """
+    # Repository analysis depends on the remote, which the hash cannot see
+    cache_key = (
+        extraction_cache_key(submission_path, student_id, wordpress)
+        if result_cache and not github_url
+        else None
+    )
+
+    result = result_cache.get(cache_key) if result_cache and cache_key else None
+    if result is not None:
+        logger.info(f"Using cached extraction for student {student_id}")
+        return result
+
+    result = extract_submission_content(
+        submission_path, student_id, wordpress=wordpress, github_url=github_url
+    )
+    if cache_key and result.get("processed"):
+        new_cache_entries.append((cache_key, result))
+    return result
+
+
 def extract_submission_content(
     submission_path, student_id, wordpress=False, github_url=None
 ):
@@ -182,6 +294,18 @@ def extract_submission_content(
         }
 
 
+def save_extracted_content(extracted_content, output_file):
+    """
+    Write extraction results to a JSON file.
+
+    Args:
+        extracted_content: Extraction session and per-student results
+        output_file: Output JSON file path
+    """
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(extracted_content, f, indent=2, ensure_ascii=False)
+
+
 def main(args) -> int:
     """Main extraction logic."""
     submissions_folder = args.submissions_folder
@@ -190,6 +314,10 @@ def main(args) -> int:
     github_urls_file = args.github_urls
     dry_run = args.dry_run
     max_students = args.max_students
+    cache_dir = args.cache_dir
+    use_cache = not args.no_cache
+    # threading.Event set by the GUI to stop between students
+    stop_event = getattr(args, "stop_event", None)
 
     logger.info(f"Processing submissions from: {submissions_folder}")
     if wordpress:
@@ -234,25 +362,48 @@ def main(args) -> int:
         "students": {},
     }
 
+    result_cache = None
+    if use_cache:
+        result_cache = ResultCache(cache_dir, filename=EXTRACT_CACHE_FILENAME)
+        logger.info(f"Using extraction cache: {result_cache.path}")
+
+    # New extractions, written to the cache in one transaction at the end
+    new_cache_entries: list[tuple[str, dict[str, Any]]] = []
+
     processed_count = 0
     for student_id, submission_path in sorted(submissions.items()):
+        if stop_event is not None and stop_event.is_set():
+            logger.warning("Extraction cancelled; no results were saved")
+            if result_cache:
+                result_cache.set_many(new_cache_entries)
+                result_cache.close()
+            return 1
+
         logger.info(
             f"Processing student {student_id} ({processed_count + 1}/{len(submissions)})"
         )
 
-        github_url = github_urls.get(student_id)
-
-        result = extract_submission_content(
-            submission_path, student_id, wordpress=wordpress, github_url=github_url
+        extracted_content["students"][student_id] = extract_submission_cached(
+            submission_path,
+            student_id,
+            result_cache,
+            new_cache_entries,
+            wordpress=wordpress,
+            github_url=github_urls.get(student_id),
         )
-
-        extracted_content["students"][student_id] = result
         processed_count += 1
 
+    if result_cache:
+        result_cache.set_many(new_cache_entries)
+        logger.info(
+            f"Extraction cache: {result_cache.hits} hits, "
+            f"{result_cache.misses} misses"
+        )
+        result_cache.close()
+
     # Save results
     try:
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(extracted_content, f, indent=2, ensure_ascii=False)
+        save_extracted_content(extracted_content, output_file)
 
         logger.info("Content extraction complete!")
         logger.info(f"Processed {processed_count} students")
@@ -7,11 +7,10 @@ Generate YAML configuration templates for grading.
 
 import argparse
 import logging
-import os
 from pathlib import Path
 from typing import Any, Dict
 
-import yaml
+from ..config.settings import available_providers
 
 # Configure logging
 logging.basicConfig(
@@ -56,18 +55,7 @@ def add_parser(subparsers) -> argparse.ArgumentParser:
 
 def check_available_providers():
     """Check which providers have API keys available."""
-    available = []
-
-    if os.getenv("ANTHROPIC_API_KEY"):
-        available.append("anthropic")
-
-    if os.getenv("OPENAI_API_KEY"):
-        available.append("openai")
-
-    if os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"):
-        available.append("gemini")
-
-    return available
+    return available_providers()
 
 
 def _add_default_prompts(config):
@@ -373,13 +361,23 @@ def main(args) -> int:
             return 1
 
         # Save configuration
+        import yaml
+
         with open(output_file, "w") as f:
             # Add header comment
             f.write("# MarkMate Grading Configuration\n")
             f.write(f"# Template: {template_type}\n")
             f.write("# Generated automatically - customize as needed\n\n")
 
-            yaml.dump(config, f, default_flow_style=False, indent=2, sort_keys=False)
+            # Prefer the libyaml-backed C dumper when PyYAML was built with it
+            yaml.dump(
+                config,
+                f,
+                Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                default_flow_style=False,
+                indent=2,
+                sort_keys=False,
+            )
 
         logger.info(f"Configuration saved to: {output_file}")
 
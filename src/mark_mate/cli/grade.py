@@ -6,17 +6,27 @@ Simplified grading using the enhanced multi-provider system with YAML configurat
 """
 
 import argparse
-import json
+import asyncio
 import logging
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
+from ..config.settings import PROVIDER_API_KEY_ENVS, available_providers
+from ..utils import json_utils
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Number of students graded concurrently when --max-concurrency is not given
+DEFAULT_MAX_CONCURRENCY = 5
+
+# Log grading progress once every this many students
+PROGRESS_LOG_INTERVAL = 10
+
 
 def add_parser(subparsers) -> argparse.ArgumentParser:
     """Add grade command parser."""
@@ -63,6 +73,55 @@ def add_parser(subparsers) -> argparse.ArgumentParser:
         help="Path to YAML grading configuration file (optional - uses defaults if not provided)",
     )
 
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Maximum number of students graded concurrently (default: {DEFAULT_MAX_CONCURRENCY})",
+    )
+
+    parser.add_argument(
+        "--override-rpm",
+        type=int,
+        help="Requests per minute allowed for every grader, replacing the configured rate_limit",
+    )
+
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Submit Anthropic/OpenAI requests through their batch APIs (about half the cost, results may take up to 24 hours)",
+    )
+
+    parser.add_argument(
+        "--students-per-prompt",
+        type=int,
+        default=1,
+        help="Grade this many students in a single LLM call (default: 1)",
+    )
+
+    parser.add_argument(
+        "--json-mode",
+        action="store_true",
+        help="Request JSON output from the provider (a strict response schema when grading one student per prompt)",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip students already recorded in the <output>.jsonl checkpoint from a previous run",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for cached grading results (default: ~/.cache/mark_mate)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write cached grading results",
+    )
+
     return parser
 
 
@@ -73,24 +132,12 @@ def check_available_providers():
     Returns:
         List of available provider names
     """
-    available = []
-
-    if os.getenv("ANTHROPIC_API_KEY"):
-        available.append("anthropic")
-    else:
-        logger.info("ANTHROPIC_API_KEY not found - Claude grading will be disabled")
+    available = available_providers()
 
-    if os.getenv("OPENAI_API_KEY"):
-        available.append("openai")
-    else:
-        logger.info("OPENAI_API_KEY not found - OpenAI grading will be disabled")
-
-    if os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"):
-        available.append("gemini")
-    else:
-        logger.info(
-            "GEMINI_API_KEY or GOOGLE_API_KEY not found - Gemini grading will be disabled"
-        )
+    for provider, envs in PROVIDER_API_KEY_ENVS.items():
+        if provider not in available:
+            env_names = " or ".join(envs)
+            logger.info(f"{env_names} not found - {provider} grading will be disabled")
 
     return available
 
@@ -108,10 +155,11 @@ def create_default_config(available_providers):
     if not available_providers:
         raise ValueError("No API keys available for any LLM provider")
 
+    providers = frozenset(available_providers)
     graders = []
 
     # Add graders based on available providers
-    if "anthropic" in available_providers:
+    if "anthropic" in providers:
         graders.append(
             {
                 "name": "claude-sonnet",
@@ -123,7 +171,7 @@ def create_default_config(available_providers):
             }
         )
 
-    if "openai" in available_providers:
+    if "openai" in providers:
         graders.append(
             {
                 "name": "gpt4o-mini",
@@ -134,7 +182,7 @@ def create_default_config(available_providers):
             }
         )
 
-    if "gemini" in available_providers:
+    if "gemini" in providers:
         graders.append(
             {
                 "name": "gemini-pro",
@@ -175,8 +223,7 @@ def load_extracted_content(content_file):
         Dictionary containing extracted content data
     """
     try:
-        with open(content_file, encoding="utf-8") as f:
-            content = json.load(f)
+        content = json_utils.load_file(content_file)
 
         if "students" not in content:
             raise ValueError("Invalid content file format: missing 'students' key")
@@ -211,7 +258,9 @@ def load_assignment_spec(spec_file):
         raise
 
 
-def grade_submission(student_data, assignment_spec, grading_system, rubric=None):
+async def grade_submission_async(
+    student_data, assignment_spec, grading_system, rubric=None
+):
     """
     Grade a single student submission.
 
@@ -225,7 +274,7 @@ def grade_submission(student_data, assignment_spec, grading_system, rubric=None)
         Dictionary containing grading results
     """
     try:
-        result = grading_system.grade_submission(
+        result = await grading_system.grade_submission_async(
             student_data, assignment_spec, rubric=rubric
         )
 
@@ -242,8 +291,320 @@ def grade_submission(student_data, assignment_spec, grading_system, rubric=None)
         }
 
 
+async def grade_students_async(
+    students,
+    assignment_spec,
+    grading_system,
+    rubric=None,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    on_result=None,
+    stop_event=None,
+):
+    """
+    Grade several students concurrently.
+
+    Args:
+        students: List of (student_id, student_data) pairs
+        assignment_spec: Assignment specification/rubric
+        grading_system: EnhancedGradingSystem instance
+        rubric: Optional separate rubric
+        max_concurrency: Maximum number of students graded at the same time
+        on_result: Optional callback called with (student_id, result) as soon
+            as each student is graded; results are then not collected
+        stop_event: Optional threading.Event; once set, students that have
+            not started grading are skipped
+
+    Returns:
+        List of (student_id, result) pairs in the same order as ``students``
+        (empty when ``on_result`` is given)
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    total = len(students)
+    finished = 0
+
+    async def worker(student_id, student_data):
+        nonlocal finished
+        async with semaphore:
+            if stop_event is not None and stop_event.is_set():
+                return None
+            logger.debug(f"Grading student {student_id}")
+            result = await grade_submission_async(
+                student_data, assignment_spec, grading_system, rubric=rubric
+            )
+            finished += 1
+            if finished % PROGRESS_LOG_INTERVAL == 0 or finished == total:
+                logger.info(f"Graded {finished}/{total} students")
+            if on_result:
+                on_result(student_id, result)
+                return None
+            return student_id, result
+
+    graded = await asyncio.gather(
+        *(
+            worker(student_id, student_data)
+            for student_id, student_data in students
+        )
+    )
+    return [pair for pair in graded if pair is not None]
+
+
+async def grade_submissions_batched(
+    chunk, assignment_spec, grading_system, rubric=None, json_mode=False
+):
+    """
+    Grade a group of students with one prompt per grader run.
+
+    Args:
+        chunk: List of (student_id, student_data) pairs graded together
+        assignment_spec: Assignment specification/rubric
+        grading_system: EnhancedGradingSystem instance
+        rubric: Optional separate rubric
+        json_mode: Request provider JSON mode
+
+    Returns:
+        List of (student_id, result) pairs in the same order as ``chunk``
+    """
+    try:
+        results = await grading_system.grade_submission_group_async(
+            [student_data for _, student_data in chunk],
+            assignment_spec,
+            rubric=rubric,
+            json_mode=json_mode,
+        )
+    except Exception as e:
+        logger.error(
+            f"Error grading students {', '.join(sid for sid, _ in chunk)}: {e}"
+        )
+        results = [
+            {
+                "error": str(e),
+                "graded": False,
+                "timestamp": datetime.now().isoformat(),
+            }
+            for _ in chunk
+        ]
+
+    return [(student_id, result) for (student_id, _), result in zip(chunk, results)]
+
+
+async def grade_student_groups_async(
+    students,
+    assignment_spec,
+    grading_system,
+    rubric=None,
+    students_per_prompt=1,
+    max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    json_mode=False,
+    on_result=None,
+    stop_event=None,
+):
+    """
+    Grade students in groups of ``students_per_prompt``, several groups at a time.
+
+    Args:
+        students: List of (student_id, student_data) pairs
+        assignment_spec: Assignment specification/rubric
+        grading_system: EnhancedGradingSystem instance
+        rubric: Optional separate rubric
+        students_per_prompt: Number of students graded in one LLM call
+        max_concurrency: Maximum number of groups graded at the same time
+        json_mode: Request provider JSON mode
+        on_result: Optional callback called with (student_id, result) as soon
+            as each group is graded; results are then not collected
+        stop_event: Optional threading.Event; once set, groups that have not
+            started grading are skipped
+
+    Returns:
+        List of (student_id, result) pairs in the same order as ``students``
+        (empty when ``on_result`` is given)
+    """
+    size = max(1, students_per_prompt)
+    chunks = [students[i : i + size] for i in range(0, len(students), size)]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def worker(position, chunk):
+        async with semaphore:
+            if stop_event is not None and stop_event.is_set():
+                return []
+            logger.info(f"Grading group {position}/{len(chunks)} ({len(chunk)} students)")
+            pairs = await grade_submissions_batched(
+                chunk, assignment_spec, grading_system, rubric=rubric, json_mode=json_mode
+            )
+            if on_result:
+                for student_id, result in pairs:
+                    on_result(student_id, result)
+                return []
+            return pairs
+
+    graded = await asyncio.gather(
+        *(worker(position, chunk) for position, chunk in enumerate(chunks, 1))
+    )
+    return [pair for group in graded for pair in group]
+
+
+async def grade_students_batch_async(
+    students, assignment_spec, grading_system, rubric=None, on_result=None
+):
+    """
+    Grade all students through provider batch APIs.
+
+    Args:
+        students: List of (student_id, student_data) pairs
+        assignment_spec: Assignment specification/rubric
+        grading_system: EnhancedGradingSystem instance
+        rubric: Optional separate rubric
+        on_result: Optional callback called with (student_id, result) for
+            each student; results are then not returned
+
+    Returns:
+        List of (student_id, result) pairs in the same order as ``students``
+        (empty when ``on_result`` is given)
+    """
+    try:
+        results = await grading_system.grade_submissions_batch_async(
+            [student_data for _, student_data in students],
+            assignment_spec,
+            rubric=rubric,
+        )
+    except Exception as e:
+        logger.error(f"Error during batch grading: {e}")
+        error_result = {
+            "error": str(e),
+            "graded": False,
+            "timestamp": datetime.now().isoformat(),
+        }
+        results = [dict(error_result) for _ in students]
+
+    graded = [(student_id, result) for (student_id, _), result in zip(students, results)]
+    if on_result:
+        for student_id, result in graded:
+            on_result(student_id, result)
+        return []
+    return graded
+
+
+def load_checkpoint(checkpoint_file):
+    """
+    Read the IDs of students already recorded in a JSONL checkpoint.
+
+    A partially written last line (from a crash mid-write) is truncated so
+    that new results can be appended safely.
+
+    Args:
+        checkpoint_file: Path to the JSONL checkpoint
+
+    Returns:
+        Set of student IDs with a recorded result
+    """
+    completed = set()
+    if not os.path.exists(checkpoint_file):
+        return completed
+
+    with open(checkpoint_file, "rb+") as f:
+        valid_end = 0
+        while line := f.readline():
+            if not line.endswith(b"\n"):
+                break
+            try:
+                completed.update(json_utils.loads(line))
+            except ValueError:
+                break
+            valid_end += len(line)
+
+        if valid_end < f.seek(0, os.SEEK_END):
+            logger.warning(f"Discarding incomplete entry at end of {checkpoint_file}")
+            f.truncate(valid_end)
+
+    return completed
+
+
+def write_final_results(output_file, grading_session, checkpoint_file):
+    """
+    Assemble the final results JSON from a JSONL checkpoint.
+
+    Results are copied one student at a time, sorted by student ID, so the
+    full result set is never held in memory.
+
+    Args:
+        output_file: Path of the JSON file to write
+        grading_session: Session metadata for the "grading_session" key
+        checkpoint_file: Path to the JSONL checkpoint
+
+    Returns:
+        Tuple of (students written, students graded without error)
+    """
+    # Locate the latest line for each student
+    offsets = {}
+    with open(checkpoint_file, "rb") as src:
+        position = 0
+        while line := src.readline():
+            for student_id in json_utils.loads(line):
+                offsets[student_id] = position
+            position += len(line)
+
+    grading_session = {**grading_session, "total_students": len(offsets)}
+    successful = 0
+
+    with open(output_file, "w", encoding="utf-8") as out, open(
+        checkpoint_file, "rb"
+    ) as src:
+        # Same layout as json.dump(..., indent=2) of the whole document
+        session = json_utils.dumps(grading_session, indent=True)
+        out.write(
+            '{\n  "grading_session": '
+            + session.replace("\n", "\n  ")
+            + ',\n  "results": {'
+        )
+
+        for index, student_id in enumerate(sorted(offsets)):
+            src.seek(offsets[student_id])
+            result = json_utils.loads(src.readline())[student_id]
+            if not result.get("error"):
+                successful += 1
+
+            body = json_utils.dumps(result, indent=True)
+            out.write(
+                f"{',' if index else ''}\n    {json_utils.dumps(student_id)}: "
+                + body.replace("\n", "\n    ")
+            )
+
+        out.write("\n  }\n}" if offsets else "}\n}")
+
+    return len(offsets), successful
+
+
 def main(args) -> int:
     """Main grading logic."""
+    return asyncio.run(main_async(args))
+
+
+async def _none():
+    """Placeholder awaitable for an optional file that was not given."""
+    return None
+
+
+async def main_async(args) -> int:
+    """Main grading logic, run inside an event loop."""
+    result_cache = None
+    if not args.no_cache and not args.dry_run:
+        try:
+            from ..core.result_cache import ResultCache
+
+            result_cache = ResultCache(args.cache_dir)
+        except Exception as e:
+            logger.error(f"Failed to open result cache: {e}")
+            return 1
+        logger.info(f"Using result cache: {result_cache.path}")
+
+    try:
+        return await _grade_async(args, result_cache)
+    finally:
+        if result_cache:
+            result_cache.close()
+
+
+async def _grade_async(args, result_cache) -> int:
+    """Grade the extracted content with an already opened result cache."""
     content_file = args.extracted_content
     spec_file = args.assignment_spec
     output_file = args.output
@@ -251,6 +612,14 @@ def main(args) -> int:
     max_students = args.max_students
     dry_run = args.dry_run
     config_file = args.config
+    max_concurrency = args.max_concurrency
+    override_rpm = args.override_rpm
+    batch_api = args.batch_api
+    students_per_prompt = args.students_per_prompt
+    json_mode = args.json_mode
+    resume = args.resume
+    # threading.Event set by the GUI to stop between students
+    stop_event = getattr(args, "stop_event", None)
 
     logger.info(f"Grading extracted content from: {content_file}")
     logger.info(f"Assignment specification: {spec_file}")
@@ -265,7 +634,14 @@ def main(args) -> int:
 
         if config_file:
             logger.info(f"Using configuration file: {config_file}")
-            grading_system = EnhancedGradingSystem(config_file)
+            # Parsing the config and compiling prompts reads from disk; keep
+            # it off the event loop, which may be the GUI's
+            grading_system = await asyncio.to_thread(
+                EnhancedGradingSystem,
+                config_file,
+                result_cache=result_cache,
+                structured_output=json_mode and students_per_prompt == 1,
+            )
         else:
             logger.info(
                 "No configuration file provided, creating default configuration"
@@ -285,24 +661,19 @@ def main(args) -> int:
             # Create default config
             default_config = create_default_config(available_providers)
 
-            # Save temporary config file
-            import tempfile
-
-            import yaml
-
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".yaml", delete=False
-            ) as f:
-                yaml.dump(default_config, f, default_flow_style=False, indent=2)
-                temp_config_path = f.name
-
             logger.info(
                 f"Created default configuration with {len(default_config['graders'])} graders"
             )
-            grading_system = EnhancedGradingSystem(temp_config_path)
+            grading_system = await asyncio.to_thread(
+                EnhancedGradingSystem.from_dict,
+                default_config,
+                result_cache=result_cache,
+                structured_output=json_mode and students_per_prompt == 1,
+            )
 
-            # Clean up temp file
-            os.unlink(temp_config_path)
+        if override_rpm:
+            for grader in grading_system.config.graders:
+                grader.rate_limit = override_rpm
 
         logger.info(
             f"Initialized grading system with {len(grading_system.config.graders)} graders"
@@ -311,7 +682,7 @@ def main(args) -> int:
         # Show grader details
         for grader in grading_system.config.graders:
             logger.info(
-                f"  - {grader.name} ({grader.provider}/{grader.model}, weight: {grader.weight})"
+                f"  - {grader.name} ({grader.provider}/{grader.model}, weight: {grader.weight}, rate limit: {grader.rate_limit or 'none'} rpm)"
             )
 
         logger.info(f"Runs per grader: {grading_system.config.runs_per_grader}")
@@ -321,14 +692,16 @@ def main(args) -> int:
         logger.error(f"Failed to initialize grading system: {e}")
         return 1
 
-    # Load content and assignment spec
+    # Load content, assignment spec and rubric concurrently
     try:
-        content_data = load_extracted_content(content_file)
-        assignment_spec = load_assignment_spec(spec_file)
-
-        rubric = None
-        if rubric_file:
-            rubric = load_assignment_spec(rubric_file)  # Same loading logic
+        content_data, assignment_spec, rubric = await asyncio.gather(
+            asyncio.to_thread(load_extracted_content, content_file),
+            asyncio.to_thread(load_assignment_spec, spec_file),
+            # Same loading logic as the assignment spec
+            asyncio.to_thread(load_assignment_spec, rubric_file)
+            if rubric_file
+            else _none(),
+        )
 
     except Exception as e:
         logger.error(f"Failed to load required files: {e}")
@@ -350,52 +723,129 @@ def main(args) -> int:
         )
         return 0
 
-    # Grade each student
-    grading_results = {
-        "grading_session": {
-            "timestamp": datetime.now().isoformat(),
-            "total_students": len(students),
-            "assignment_spec_file": spec_file,
-            "rubric_file": rubric_file,
-            "source_content_file": content_file,
-            "config": {
-                "graders": [g.name for g in grading_system.config.graders],
-                "runs_per_grader": grading_system.config.runs_per_grader,
-                "averaging_method": grading_system.config.averaging_method,
-                "config_file": config_file,
-            },
+    # Grade each student, appending results to a JSONL checkpoint as they finish
+    grading_session = {
+        "timestamp": datetime.now().isoformat(),
+        "total_students": len(students),
+        "assignment_spec_file": spec_file,
+        "rubric_file": rubric_file,
+        "source_content_file": content_file,
+        "config": {
+            "graders": [g.name for g in grading_system.config.graders],
+            "runs_per_grader": grading_system.config.runs_per_grader,
+            "averaging_method": grading_system.config.averaging_method,
+            "config_file": config_file,
         },
-        "results": {},
     }
 
-    graded_count = 0
-    for student_id, student_data in sorted(students.items()):
+    checkpoint_file = f"{output_file}.jsonl"
+    completed = (
+        await asyncio.to_thread(load_checkpoint, checkpoint_file) if resume else set()
+    )
+    pending = sorted(
+        (sid, data) for sid, data in students.items() if sid not in completed
+    )
+    if completed:
         logger.info(
-            f"Grading student {student_id} ({graded_count + 1}/{len(students)})"
+            f"Resuming: {len(students) - len(pending)} students already graded in {checkpoint_file}"
         )
 
-        result = grade_submission(
-            student_data, assignment_spec, grading_system, rubric=rubric
-        )
+    graded_count = 0
+    # Checkpoint lines are written in order by one thread, so that results
+    # are recorded without blocking the event loop on disk I/O
+    writer = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="markmate-checkpoint"
+    )
+    writes: list[Future[None]] = []
+
+    try:
+        with open(checkpoint_file, "ab" if resume else "wb") as checkpoint:
+
+            def write_line(line):
+                checkpoint.write(line)
+                checkpoint.flush()
+
+            def record_result(student_id, result):
+                nonlocal graded_count
+                line = json_utils.dumps_line({student_id: result})
+                writes.append(writer.submit(write_line, line))
+                graded_count += 1
+
+            try:
+                if batch_api:
+                    if students_per_prompt > 1:
+                        logger.warning(
+                            "--students-per-prompt is ignored with --batch-api"
+                        )
+                    logger.info(
+                        "Submitting grading requests through provider batch APIs"
+                    )
+                    await grade_students_batch_async(
+                        pending,
+                        assignment_spec,
+                        grading_system,
+                        rubric=rubric,
+                        on_result=record_result,
+                    )
+                elif students_per_prompt > 1:
+                    logger.info(f"Grading {students_per_prompt} students per prompt")
+                    await grade_student_groups_async(
+                        pending,
+                        assignment_spec,
+                        grading_system,
+                        rubric=rubric,
+                        students_per_prompt=students_per_prompt,
+                        max_concurrency=max_concurrency,
+                        json_mode=json_mode,
+                        on_result=record_result,
+                        stop_event=stop_event,
+                    )
+                else:
+                    logger.info(
+                        f"Grading up to {max_concurrency} students concurrently"
+                    )
+                    await grade_students_async(
+                        pending,
+                        assignment_spec,
+                        grading_system,
+                        rubric=rubric,
+                        max_concurrency=max_concurrency,
+                        on_result=record_result,
+                        stop_event=stop_event,
+                    )
+            finally:
+                # Let queued writes land before the checkpoint file closes.
+                await asyncio.to_thread(writer.shutdown)
+
+            for write in writes:
+                write.result()
+
+    except OSError as e:
+        logger.error(f"Error writing checkpoint {checkpoint_file}: {e}")
+        return 1
 
-        grading_results["results"][student_id] = result
-        graded_count += 1
+    if stop_event is not None and stop_event.is_set():
+        logger.warning(
+            f"Grading cancelled after {graded_count} students; "
+            f"rerun with --resume to continue from {checkpoint_file}"
+        )
+        return 1
 
     # Save results
     try:
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(grading_results, f, indent=2, ensure_ascii=False)
+        total_count, successful_count = await asyncio.to_thread(
+            write_final_results, output_file, grading_session, checkpoint_file
+        )
 
         logger.info("Grading complete!")
         logger.info(f"Graded {graded_count} students")
         logger.info(f"Results saved to: {output_file}")
 
         # Show summary statistics
-        successful_grades = [
-            r for r in grading_results["results"].values() if not r.get("error")
-        ]
-        if successful_grades:
-            logger.info(f"Successfully graded: {len(successful_grades)} students")
+        if successful_count:
+            logger.info(
+                f"Successfully graded: {successful_count}/{total_count} students"
+            )
 
         # Show enhanced grading statistics
         session_summary = grading_system.get_session_summary()
@@ -409,6 +859,11 @@ def main(args) -> int:
             logger.info(
                 f"Processing time: {session_summary['duration_seconds']:.1f} seconds"
             )
+        if result_cache:
+            logger.info(
+                f"Result cache: {result_cache.hits} hits, "
+                f"{result_cache.misses} misses"
+            )
 
         return 0
 
@@ -6,12 +6,17 @@ Scans processed submissions for GitHub repository URLs and creates mapping files
 """
 
 import argparse
+import hashlib
 import logging
 import os
 import re
 import zipfile
 from collections import defaultdict
 from pathlib import Path
+from typing import Any
+
+from ..core.result_cache import default_cache_dir
+from ..utils import json_utils
 
 # Configure logging
 logging.basicConfig(
@@ -19,6 +24,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per-file scan results are kept between runs in this directory, within the
+# cache directory, with one file per submissions folder
+SCAN_CACHE_DIRNAME = "scan_results"
+
 
 def add_parser(subparsers) -> argparse.ArgumentParser:
     """Add scan command parser."""
@@ -44,6 +53,17 @@ def add_parser(subparsers) -> argparse.ArgumentParser:
         help="Text encoding to use when reading files (default: utf-8)",
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for cached scan results (default: ~/.cache/mark_mate)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rescan every file instead of reusing cached results",
+    )
+
     return parser
 
 
@@ -225,13 +245,109 @@ def is_text_file(filename):
     )  # Include files without extensions
 
 
-def scan_submissions_folder(folder_path, encoding="utf-8"):
+def scan_submission(submission_path, encoding="utf-8"):
+    """
+    Scan one consolidated submission for GitHub URLs.
+
+    Args:
+        submission_path: Path to the student's zip file or folder
+        encoding: Text encoding to use
+
+    Returns:
+        List of unique GitHub URLs in the order they were found
+    """
+    if os.path.isdir(submission_path):
+        file_paths = [
+            os.path.join(root, filename)
+            for root, _dirs, files in os.walk(submission_path)
+            for filename in files
+        ]
+    else:
+        file_paths = [submission_path]
+
+    urls = []
+    for file_path in file_paths:
+        if file_path.lower().endswith(".zip"):
+            file_urls = scan_zip_file(file_path, encoding)
+        elif is_text_file(file_path):
+            file_urls = scan_text_file(file_path, encoding)
+        else:
+            continue
+        for url in file_urls:
+            if url not in urls:
+                urls.append(url)
+
+    return urls
+
+
+def scan_cache_path(folder_path, cache_dir=None) -> str:
+    """
+    Get the scan cache file for a submissions folder.
+
+    Args:
+        folder_path: Path to the submissions folder
+        cache_dir: Cache directory; defaults to ``default_cache_dir()``
+
+    Returns:
+        Path of the cache file, named after a hash of the folder's absolute path
+    """
+    folder_key = hashlib.sha256(os.path.abspath(folder_path).encode("utf-8"))
+    directory = Path(cache_dir) if cache_dir else default_cache_dir()
+    return str(directory / SCAN_CACHE_DIRNAME / f"{folder_key.hexdigest()}.json")
+
+
+def load_scan_cache(cache_path, encoding="utf-8") -> dict[str, dict[str, Any]]:
+    """
+    Load per-file scan results saved by a previous scan.
+
+    Args:
+        cache_path: Path to the scan cache file
+        encoding: Text encoding of the current scan; results saved with a
+            different encoding are discarded
+
+    Returns:
+        Dictionary mapping relative file paths to their mtime_ns, size and URLs
+    """
+    try:
+        data = json_utils.load_file(cache_path)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("encoding") != encoding:
+        return {}
+    return data.get("files", {})
+
+
+def save_scan_cache(cache_path, files, encoding="utf-8"):
+    """
+    Save per-file scan results for the next scan.
+
+    Args:
+        cache_path: Path to the scan cache file
+        files: Dictionary mapping relative file paths to their mtime_ns, size and URLs
+        encoding: Text encoding used for the scan
+    """
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            f.write(json_utils.dumps({"encoding": encoding, "files": files}))
+    except OSError as e:
+        logger.warning(f"Could not save scan cache {cache_path}: {e}")
+
+
+def scan_submissions_folder(
+    folder_path, encoding="utf-8", use_cache=False, cache_dir=None
+):
     """
     Scan a folder of student submissions for GitHub URLs.
 
     Args:
         folder_path: Path to the submissions folder
         encoding: Text encoding to use
+        use_cache: Reuse results for files whose modification time and size
+            are unchanged since the last scan, and save results for the next one
+        cache_dir: Directory for cached scan results; defaults to
+            ``default_cache_dir()``
 
     Returns:
         Dictionary mapping student IDs to lists of GitHub URLs
@@ -242,6 +358,11 @@ def scan_submissions_folder(folder_path, encoding="utf-8"):
         logger.error(f"Submissions folder does not exist: {folder_path}")
         return student_urls
 
+    cache_path = scan_cache_path(folder_path, cache_dir)
+    cached_files = load_scan_cache(cache_path, encoding) if use_cache else {}
+    scanned_files: dict[str, dict[str, Any]] = {}
+    cache_hits = 0
+
     # Scan all files in the folder
     for root, _dirs, files in os.walk(folder_path):
         for filename in files:
@@ -252,20 +373,50 @@ def scan_submissions_folder(folder_path, encoding="utf-8"):
             if not student_id:
                 continue
 
-            urls = []
+            is_zip = filename.lower().endswith(".zip")
+            if not is_zip and not is_text_file(filename):
+                continue
 
-            # Handle different file types
-            if filename.lower().endswith(".zip"):
+            relative_path = os.path.relpath(file_path, folder_path)
+            stat = None
+            if use_cache:
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    pass
+
+            cached = cached_files.get(relative_path)
+            if (
+                stat is not None
+                and cached is not None
+                and cached.get("mtime_ns") == stat.st_mtime_ns
+                and cached.get("size") == stat.st_size
+            ):
+                urls = cached.get("urls", [])
+                cache_hits += 1
+            elif is_zip:
                 urls = scan_zip_file(file_path, encoding)
-            elif is_text_file(filename):
+            else:
                 urls = scan_text_file(file_path, encoding)
 
+            if stat is not None:
+                scanned_files[relative_path] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "urls": urls,
+                }
+
             # Add URLs to student's list
             for url in urls:
                 if url not in student_urls[student_id]:
                     student_urls[student_id].append(url)
                     logger.info(f"Found GitHub URL for student {student_id}: {url}")
 
+    if use_cache:
+        if cache_hits:
+            logger.info(f"Reused cached scan results for {cache_hits} files")
+        save_scan_cache(cache_path, scanned_files, encoding)
+
     return student_urls
 
 
@@ -307,7 +458,9 @@ def main(args) -> int:
     logger.info(f"Using encoding: {encoding}")
 
     # Scan for GitHub URLs
-    student_urls = scan_submissions_folder(folder_path, encoding)
+    student_urls = scan_submissions_folder(
+        folder_path, encoding, use_cache=not args.no_cache, cache_dir=args.cache_dir
+    )
 
     if not student_urls:
         logger.warning("No GitHub URLs found in any submissions")
@@ -318,7 +471,7 @@ def main(args) -> int:
 
     logger.info("GitHub URL scanning complete!")
     logger.info(
-        f"Found URLs for {len([s for s, urls in student_urls.items() if urls])} students"
+        f"Found URLs for {sum(1 for urls in student_urls.values() if urls)} students"
     )
     logger.info(f"Total students processed: {len(student_urls)}")
     logger.info(f"URL mappings saved to: {output_file}")
@@ -17,15 +17,15 @@ ASSIGNMENT SPECIFICATION:
 GRADING RUBRIC:
 {rubric}
 
-STUDENT SUBMISSION (Student ID: {student_id}):
-{content_summary}
-
 Please provide your assessment in the following format:
 
 MARK: [numerical mark out of total possible marks]
 FEEDBACK: [detailed constructive feedback explaining the mark, highlighting strengths and areas for improvement]
 
 Be fair, consistent, and constructive in your evaluation. Consider all aspects of the submission including technical implementation, documentation quality, and adherence to requirements.
+
+STUDENT SUBMISSION (Student ID: {student_id}):
+{content_summary}
 """
 
 # Default file type mappings
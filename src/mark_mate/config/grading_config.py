@@ -5,17 +5,24 @@ Handles loading and validation of grading configurations from YAML files.
 
 from __future__ import annotations
 
+import copy
 import logging
 import os
-from dataclasses import dataclass, field
-from typing import Any, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, ClassVar, Iterable, Optional
 
-import yaml
+from ..utils.compat import DATACLASS_SLOTS, safe_yaml_load
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_PROVIDERS: frozenset[str] = frozenset({"anthropic", "openai", "gemini"})
+AVERAGING_METHODS: frozenset[str] = frozenset(
+    {"mean", "median", "weighted_mean", "trimmed_mean"}
+)
+RUNS_MODES: frozenset[str] = frozenset({"parallel", "reflective"})
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class GraderConfig:
     """Configuration for a single grader."""
 
@@ -25,18 +32,25 @@ class GraderConfig:
     weight: float = 1.0
     primary_feedback: bool = False
     rate_limit: Optional[int] = None
+    # Tokens per minute, shared by every grader using the same model
+    token_rate_limit: Optional[int] = None
     system_prompt: Optional[str] = None
     temperature: float = 0.1
     max_tokens: int = 2000
+    # Stop generating once the mark is known; the grader contributes no feedback
+    mark_only: bool = False
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class GradingConfig:
     """Complete grading configuration."""
 
     runs_per_grader: int = 1
     averaging_method: str = "mean"
     parallel_execution: bool = True
+    # "parallel": one API call per run; "reflective": all runs in one call,
+    # each later run being a self-critique and re-score of the previous one
+    runs_mode: str = "parallel"
     graders: list[GraderConfig] = field(default_factory=list)
 
     # Execution settings
@@ -44,6 +58,9 @@ class GradingConfig:
     timeout_per_run: int = 60
     retry_attempts: int = 3
     show_progress: bool = True
+    # Upper bound on LLM calls in flight for one student when
+    # parallel_execution is enabled
+    max_concurrent_requests: int = 10
 
     # Statistical settings
     confidence_threshold: float = 0.7
@@ -85,6 +102,7 @@ class GradingConfigManager:
             "timeout_per_run": 60,
             "retry_attempts": 3,
             "show_progress": True,
+            "max_concurrent_requests": 10,
         },
         "prompts": {
             "default": {
@@ -95,9 +113,6 @@ class GradingConfigManager:
 GRADING RUBRIC:
 {rubric}
 
-STUDENT SUBMISSION (Student ID: {student_id}):
-{content_summary}
-
 GRADING INSTRUCTIONS:
 1. Evaluate the submission against each criterion in the rubric
 2. Provide a mark out of {max_mark}
@@ -105,7 +120,10 @@ GRADING INSTRUCTIONS:
 4. Consider both technical implementation and documentation quality
 {additional_instructions}
 
-{output_format}""",
+{output_format}
+
+STUDENT SUBMISSION (Student ID: {student_id}):
+{content_summary}""",
             },
             "wordpress": {
                 "system": "You are an expert WordPress developer and educator evaluating student work.",
@@ -115,9 +133,6 @@ GRADING INSTRUCTIONS:
 GRADING RUBRIC:
 {rubric}
 
-STUDENT WORDPRESS SITE (Student ID: {student_id}):
-{content_summary}
-
 WORDPRESS-SPECIFIC EVALUATION:
 - Assess theme customization and design choices
 - Evaluate plugin usage and AI integration
@@ -125,7 +140,10 @@ WORDPRESS-SPECIFIC EVALUATION:
 - Check security configuration
 {additional_instructions}
 
-{output_format}""",
+{output_format}
+
+STUDENT WORDPRESS SITE (Student ID: {student_id}):
+{content_summary}""",
             },
         },
         "prompt_sections": {
@@ -160,10 +178,31 @@ IMPORTANT:
         },
     }
 
+    # Parsed DEFAULT_CONFIG, shared by all instances and built on first use
+    _default_parsed: ClassVar[Optional[GradingConfig]] = None
+
+    # Parsed configuration files by absolute path, with the modification
+    # time and size they were parsed at
+    _file_cache: ClassVar[dict[str, tuple[int, int, GradingConfig]]] = {}
+
     def __init__(self) -> None:
         """Initialize the configuration manager."""
         pass
 
+    def default_config(self) -> GradingConfig:
+        """Get the default configuration as a GradingConfig.
+
+        DEFAULT_CONFIG is parsed once per process; every caller receives its
+        own deep copy, so changes never leak back into the shared default.
+
+        Returns:
+            GradingConfig built from DEFAULT_CONFIG.
+        """
+        cls = type(self)
+        if cls._default_parsed is None:
+            cls._default_parsed = self._parse_config(copy.deepcopy(self.DEFAULT_CONFIG))
+        return copy.deepcopy(cls._default_parsed)
+
     def load_config(self, config_path: Optional[str] = None) -> GradingConfig:
         """Load grading configuration from file or use defaults.
 
@@ -172,22 +211,34 @@ IMPORTANT:
 
         Returns:
             GradingConfig object with loaded configuration.
+
+        A file is parsed again only when its modification time or size has
+        changed; every caller receives its own deep copy.
         """
         if config_path and os.path.exists(config_path):
+            path = os.path.abspath(config_path)
             try:
+                stat = os.stat(path)
+                cached = self._file_cache.get(path)
+                if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                    logger.debug(f"Using parsed configuration for {config_path}")
+                    return copy.deepcopy(cached[2])
+
                 with open(config_path) as f:
-                    config_data = yaml.safe_load(f)
+                    config_data = safe_yaml_load(f)
                 logger.info(f"Loaded grading configuration from {config_path}")
             except Exception as e:
                 logger.error(f"Error loading config from {config_path}: {e}")
                 logger.info("Using default configuration")
-                config_data = self.DEFAULT_CONFIG
+                return self.default_config()
         else:
             if config_path:
                 logger.warning(f"Config file {config_path} not found, using defaults")
-            config_data = self.DEFAULT_CONFIG
+            return self.default_config()
 
-        return self._parse_config(config_data)
+        config = self._parse_config(config_data)
+        self._file_cache[path] = (stat.st_mtime_ns, stat.st_size, config)
+        return copy.deepcopy(config)
 
     def _parse_config(self, config_data: dict[str, Any]) -> GradingConfig:
         """Parse configuration data into GradingConfig object.
@@ -212,9 +263,11 @@ IMPORTANT:
                 weight=grader_data.get("weight", 1.0),
                 primary_feedback=grader_data.get("primary_feedback", False),
                 rate_limit=grader_data.get("rate_limit"),
+                token_rate_limit=grader_data.get("token_rate_limit"),
                 system_prompt=grader_data.get("system_prompt"),
                 temperature=grader_data.get("temperature", 0.1),
                 max_tokens=grader_data.get("max_tokens", 2000),
+                mark_only=grader_data.get("mark_only", False),
             )
             graders.append(grader)
 
@@ -223,11 +276,15 @@ IMPORTANT:
             runs_per_grader=grading_settings.get("runs_per_grader", 1),
             averaging_method=grading_settings.get("averaging_method", "mean"),
             parallel_execution=grading_settings.get("parallel_execution", True),
+            runs_mode=grading_settings.get("runs_mode", "parallel"),
             graders=graders,
             max_cost_per_student=execution_settings.get("max_cost_per_student", 0.50),
             timeout_per_run=execution_settings.get("timeout_per_run", 60),
             retry_attempts=execution_settings.get("retry_attempts", 3),
             show_progress=execution_settings.get("show_progress", True),
+            max_concurrent_requests=execution_settings.get(
+                "max_concurrent_requests", 10
+            ),
             prompts=config_data.get("prompts", {}),
             prompt_sections=config_data.get("prompt_sections", {}),
         )
@@ -252,26 +309,36 @@ IMPORTANT:
         if config.runs_per_grader < 1:
             raise ValueError("runs_per_grader must be at least 1")
 
-        if config.averaging_method not in [
-            "mean",
-            "median",
-            "weighted_mean",
-            "trimmed_mean",
-        ]:
+        if config.averaging_method not in AVERAGING_METHODS:
             raise ValueError(f"Invalid averaging_method: {config.averaging_method}")
 
+        if config.runs_mode not in RUNS_MODES:
+            raise ValueError(f"Invalid runs_mode: {config.runs_mode}")
+
+        if config.max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
+
         # Validate graders
         provider_counts: dict[str, int] = {}
         primary_feedback_count = 0
 
         for grader in config.graders:
-            if grader.provider not in ["anthropic", "openai", "gemini"]:
+            if grader.provider not in SUPPORTED_PROVIDERS:
                 raise ValueError(f"Invalid provider: {grader.provider}")
 
             if grader.weight <= 0:
                 raise ValueError(f"Grader {grader.name} weight must be positive")
 
+            if grader.token_rate_limit is not None and grader.token_rate_limit <= 0:
+                raise ValueError(
+                    f"Grader {grader.name} token_rate_limit must be positive"
+                )
+
             if grader.primary_feedback:
+                if grader.mark_only:
+                    raise ValueError(
+                        f"Grader {grader.name} cannot be both primary_feedback and mark_only"
+                    )
                 primary_feedback_count += 1
 
             provider_counts[grader.provider] = (
@@ -293,8 +360,16 @@ IMPORTANT:
         Args:
             output_path: Path where to save the configuration file.
         """
+        import yaml
+
         with open(output_path, "w") as f:
-            yaml.dump(self.DEFAULT_CONFIG, f, default_flow_style=False, indent=2)
+            yaml.dump(
+                self.DEFAULT_CONFIG,
+                f,
+                Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                default_flow_style=False,
+                indent=2,
+            )
         logger.info(f"Default configuration saved to {output_path}")
 
     def create_gemini_config(self) -> dict[str, Any]:
@@ -303,7 +378,7 @@ IMPORTANT:
         Returns:
             Configuration dictionary with Gemini grader included.
         """
-        config = self.DEFAULT_CONFIG.copy()
+        config = copy.deepcopy(self.DEFAULT_CONFIG)
 
         # Add Gemini grader
         gemini_grader = {
@@ -362,13 +437,13 @@ IMPORTANT:
         return list(providers)
 
     def filter_graders_by_availability(
-        self, config: GradingConfig, available_providers: list[str]
+        self, config: GradingConfig, available_providers: Iterable[str]
     ) -> GradingConfig:
         """Filter graders based on available providers.
         
         Args:
             config: Original grading configuration.
-            available_providers: List of available provider names.
+            available_providers: Available provider names.
             
         Returns:
             New configuration with only available graders.
@@ -376,26 +451,16 @@ IMPORTANT:
         Raises:
             ValueError: If no graders are available.
         """
+        providers = frozenset(available_providers)
         filtered_graders = [
-            grader
-            for grader in config.graders
-            if grader.provider in available_providers
+            grader for grader in config.graders if grader.provider in providers
         ]
 
         if not filtered_graders:
             raise ValueError("No graders available with current API key configuration")
 
-        # Create new config with filtered graders
-        new_config = GradingConfig(
-            runs_per_grader=config.runs_per_grader,
-            averaging_method=config.averaging_method,
-            parallel_execution=config.parallel_execution,
-            graders=filtered_graders,
-            max_cost_per_student=config.max_cost_per_student,
-            timeout_per_run=config.timeout_per_run,
-            retry_attempts=config.retry_attempts,
-            show_progress=config.show_progress,
-        )
+        # Copy every other setting, including prompts and thresholds
+        new_config = replace(config, graders=filtered_graders)
 
         logger.info(f"Filtered to {len(filtered_graders)} available graders")
         return new_config
@@ -9,6 +9,8 @@ import os
 from pathlib import Path
 from typing import Any, Optional
 
+from ..utils.compat import safe_yaml_load
+
 # Default configuration
 DEFAULT_CONFIG: dict[str, Any] = {
     "processing": {
@@ -198,9 +200,7 @@ def load_config_file(config_path: str) -> Config:
     with open(config_path_obj) as f:
         if config_path_obj.suffix.lower() in [".yml", ".yaml"]:
             try:
-                import yaml
-
-                custom_config = yaml.safe_load(f)
+                custom_config = safe_yaml_load(f)
             except ImportError as e:
                 raise ImportError("PyYAML required for YAML configuration files") from e
         else:
@@ -209,6 +209,17 @@ def load_config_file(config_path: str) -> Config:
     return Config(custom_config)
 
 
+# Environment variables holding each provider's API key, in order of preference
+PROVIDER_API_KEY_ENVS: dict[str, tuple[str, ...]] = {
+    "anthropic": ("ANTHROPIC_API_KEY",),
+    "openai": ("OPENAI_API_KEY",),
+    "gemini": ("GEMINI_API_KEY", "GOOGLE_API_KEY"),
+}
+
+# Alternative provider names accepted on the command line
+PROVIDER_ALIASES: dict[str, str] = {"claude": "anthropic"}
+
+
 def get_api_keys() -> dict[str, Optional[str]]:
     """Get API keys from environment variables.
 
@@ -216,11 +227,20 @@ def get_api_keys() -> dict[str, Optional[str]]:
         Dictionary of API keys.
     """
     return {
-        "anthropic": os.getenv("ANTHROPIC_API_KEY"),
-        "openai": os.getenv("OPENAI_API_KEY"),
+        provider: next(filter(None, map(os.getenv, envs)), None)
+        for provider, envs in PROVIDER_API_KEY_ENVS.items()
     }
 
 
+def available_providers() -> list[str]:
+    """Get the providers that have an API key set.
+
+    Returns:
+        Provider names in ``PROVIDER_API_KEY_ENVS`` order.
+    """
+    return [provider for provider, key in get_api_keys().items() if key]
+
+
 def validate_api_keys(required_providers: list[str]) -> dict[str, bool]:
     """Validate that required API keys are available.
 
@@ -231,14 +251,7 @@ def validate_api_keys(required_providers: list[str]) -> dict[str, bool]:
         Dictionary indicating which providers are available.
     """
     api_keys = get_api_keys()
-
-    availability: dict[str, bool] = {}
-    for provider in required_providers:
-        if provider == "claude":
-            availability["claude"] = bool(api_keys["anthropic"])
-        elif provider == "openai":
-            availability["openai"] = bool(api_keys["openai"])
-        else:
-            availability[provider] = False
-
-    return availability
+    return {
+        provider: bool(api_keys.get(PROVIDER_ALIASES.get(provider, provider)))
+        for provider in required_providers
+    }
@@ -0,0 +1,304 @@
+"""MarkMate Provider Batch API Support.
+
+Submits many grading requests at once through the OpenAI Batch API and the
+Anthropic Message Batches API. Batched requests are billed at roughly half the
+price of synchronous calls, in exchange for results arriving asynchronously
+(usually within minutes, at most 24 hours).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional, cast
+
+try:
+    import anthropic
+except ImportError:
+    anthropic = None  # type: ignore[assignment]
+
+try:
+    import openai
+except ImportError:
+    openai = None  # type: ignore[assignment]
+
+from .llm_provider import cacheable_content
+
+if TYPE_CHECKING:
+    from anthropic.types.messages.batch_create_params import Request
+
+logger = logging.getLogger(__name__)
+
+# Providers that expose a batch endpoint
+BATCH_PROVIDERS: frozenset[str] = frozenset({"anthropic", "openai"})
+
+# Fraction of the synchronous price charged for batched requests
+BATCH_COST_FACTOR: float = 0.5
+
+_OPENAI_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+@dataclass
+class BatchRequest:
+    """A single chat completion request inside a provider batch."""
+
+    custom_id: str
+    model: str
+    prompt: str
+    system_prompt: Optional[str] = None
+    temperature: float = 0.1
+    max_tokens: int = 2000
+    prompt_prefix: Optional[str] = None
+
+
+def submit_batch(
+    provider: str,
+    requests: list[BatchRequest],
+    poll_interval: float = 10.0,
+    max_poll_interval: float = 300.0,
+) -> dict[str, dict[str, Any]]:
+    """Submit requests as one provider batch and wait for the results.
+
+    Args:
+        provider: Provider name (anthropic or openai).
+        requests: Requests to include in the batch.
+        poll_interval: Initial delay between status checks, in seconds.
+        max_poll_interval: Upper bound for the exponential polling backoff.
+
+    Returns:
+        Dictionary mapping custom_id to a result with ``success``, ``content``,
+        ``input_tokens``, ``output_tokens`` and, on failure, ``error``.
+
+    Raises:
+        ValueError: If the provider has no batch support.
+        ImportError: If the provider SDK is not installed.
+    """
+    if not requests:
+        return {}
+
+    if provider == "openai":
+        return _submit_openai_batch(requests, poll_interval, max_poll_interval)
+    if provider == "anthropic":
+        return _submit_anthropic_batch(requests, poll_interval, max_poll_interval)
+
+    raise ValueError(f"Provider {provider} does not support batch grading")
+
+
+def _wait_for_batch(
+    retrieve: Callable[[], Any],
+    is_done: Callable[[Any], bool],
+    poll_interval: float,
+    max_poll_interval: float,
+) -> Any:
+    """Poll a batch until it reaches a terminal state, backing off exponentially.
+
+    Args:
+        retrieve: Callable returning the current batch object.
+        is_done: Predicate telling whether the batch has finished.
+        poll_interval: Initial delay between status checks.
+        max_poll_interval: Maximum delay between status checks.
+
+    Returns:
+        The final batch object.
+    """
+    delay = poll_interval
+    batch = retrieve()
+    while not is_done(batch):
+        logger.info(
+            f"Batch {batch.id} still processing, checking again in {delay:.0f}s"
+        )
+        time.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
+        batch = retrieve()
+    return batch
+
+
+def _submit_openai_batch(
+    requests: list[BatchRequest], poll_interval: float, max_poll_interval: float
+) -> dict[str, dict[str, Any]]:
+    """Run requests through the OpenAI Batch API.
+
+    Args:
+        requests: Requests to include in the batch.
+        poll_interval: Initial delay between status checks.
+        max_poll_interval: Maximum delay between status checks.
+
+    Returns:
+        Dictionary mapping custom_id to result.
+    """
+    if openai is None:
+        raise ImportError(
+            "OpenAI SDK is required for batch grading: pip install openai"
+        )
+
+    client = openai.OpenAI()
+
+    lines: list[str] = []
+    for request in requests:
+        messages: list[dict[str, str]] = []
+        if request.system_prompt:
+            messages.append({"role": "system", "content": request.system_prompt})
+        messages.append({"role": "user", "content": request.prompt})
+
+        lines.append(
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": request.model,
+                        "messages": messages,
+                        "temperature": request.temperature,
+                        "max_tokens": request.max_tokens,
+                    },
+                },
+                ensure_ascii=False,
+            )
+        )
+
+    batch_file = client.files.create(
+        file=("mark_mate_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    logger.info(f"Submitted OpenAI batch {batch.id} with {len(requests)} requests")
+
+    batch = _wait_for_batch(
+        lambda: client.batches.retrieve(batch.id),
+        lambda b: b.status in _OPENAI_TERMINAL_STATUSES,
+        poll_interval,
+        max_poll_interval,
+    )
+    logger.info(f"OpenAI batch {batch.id} finished with status: {batch.status}")
+
+    results: dict[str, dict[str, Any]] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                results[entry["custom_id"]] = _parse_openai_entry(entry)
+
+    return _fill_missing(
+        requests, results, f"OpenAI batch ended with status {batch.status}"
+    )
+
+
+def _parse_openai_entry(entry: dict[str, Any]) -> dict[str, Any]:
+    """Convert one line of an OpenAI batch output file into a result.
+
+    Args:
+        entry: Parsed JSONL line from the output or error file.
+
+    Returns:
+        Result dictionary.
+    """
+    response = entry.get("response") or {}
+    body = response.get("body") or {}
+
+    if entry.get("error") or response.get("status_code") != 200:
+        error = entry.get("error") or body.get("error") or "Unknown batch error"
+        return {"success": False, "error": str(error)}
+
+    usage = body.get("usage", {})
+    return {
+        "success": True,
+        "content": body["choices"][0]["message"]["content"],
+        "input_tokens": usage.get("prompt_tokens", 0),
+        "output_tokens": usage.get("completion_tokens", 0),
+    }
+
+
+def _submit_anthropic_batch(
+    requests: list[BatchRequest], poll_interval: float, max_poll_interval: float
+) -> dict[str, dict[str, Any]]:
+    """Run requests through the Anthropic Message Batches API.
+
+    Args:
+        requests: Requests to include in the batch.
+        poll_interval: Initial delay between status checks.
+        max_poll_interval: Maximum delay between status checks.
+
+    Returns:
+        Dictionary mapping custom_id to result.
+    """
+    if anthropic is None:
+        raise ImportError(
+            "Anthropic SDK is required for batch grading: pip install anthropic"
+        )
+
+    client = anthropic.Anthropic()
+
+    batch_requests: list[dict[str, Any]] = []
+    for request in requests:
+        params: dict[str, Any] = {
+            "model": request.model,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            "messages": [{"role": "user", "content": request.prompt}],
+        }
+        if request.prompt_prefix and request.prompt.startswith(request.prompt_prefix):
+            params["messages"][0]["content"] = cacheable_content(
+                request.prompt, request.prompt_prefix
+            )
+        if request.system_prompt:
+            params["system"] = request.system_prompt
+        batch_requests.append({"custom_id": request.custom_id, "params": params})
+
+    batch = client.messages.batches.create(
+        requests=cast("list[Request]", batch_requests)
+    )
+    logger.info(f"Submitted Anthropic batch {batch.id} with {len(requests)} requests")
+
+    batch = _wait_for_batch(
+        lambda: client.messages.batches.retrieve(batch.id),
+        lambda b: b.processing_status == "ended",
+        poll_interval,
+        max_poll_interval,
+    )
+    logger.info(f"Anthropic batch {batch.id} finished")
+
+    results: dict[str, dict[str, Any]] = {}
+    for entry in client.messages.batches.results(batch.id):
+        result = entry.result
+        if result.type == "succeeded":
+            message = result.message
+            results[entry.custom_id] = {
+                "success": True,
+                "content": "".join(
+                    block.text for block in message.content if block.type == "text"
+                ),
+                "input_tokens": message.usage.input_tokens,
+                "output_tokens": message.usage.output_tokens,
+            }
+        else:
+            error = getattr(result, "error", None) or result.type
+            results[entry.custom_id] = {"success": False, "error": str(error)}
+
+    return _fill_missing(requests, results, "Anthropic batch returned no result")
+
+
+def _fill_missing(
+    requests: list[BatchRequest], results: dict[str, dict[str, Any]], error: str
+) -> dict[str, dict[str, Any]]:
+    """Mark requests that are absent from the batch output as failed.
+
+    Args:
+        requests: Requests that were submitted.
+        results: Results returned by the provider.
+        error: Error message for requests without a result.
+
+    Returns:
+        Results covering every submitted request.
+    """
+    for request in requests:
+        results.setdefault(request.custom_id, {"success": False, "error": error})
+    return results
@@ -7,32 +7,157 @@ and comprehensive error handling using LiteLLM unified interface.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import random
 import re
 import time
+from collections import defaultdict, deque
 from datetime import datetime
-from statistics import mean, median, stdev
-from typing import Any, Optional
-
-from ..config.grading_config import GraderConfig, GradingConfigManager
+from typing import Any, Callable, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from ..config.grading_config import (
+    GraderConfig,
+    GradingConfig,
+    GradingConfigManager,
+)
+from .aggregation import Aggregator, get_aggregator, sample_std, to_array
+from .batch_api import (
+    BATCH_COST_FACTOR,
+    BATCH_PROVIDERS,
+    BatchRequest,
+    submit_batch,
+)
 from .llm_provider import LLMProvider
 from .prompt_manager import PromptManager
+from .response_schema import GradingResponse, build_response_schema
+from .result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
+# Rubric and maximum-mark keywords in priority order. Each combined pattern
+# is a lookahead, so one pass over the spec finds every keyword occurrence
+# (including overlapping ones) and the highest-priority keyword still wins
+_RUBRIC_KEYWORDS: tuple[str, ...] = (
+    "rubric",
+    "assessment criteria",
+    "marking scheme",
+    "grading",
+)
+_RUBRIC_PATTERN: re.Pattern[str] = re.compile(
+    r"(?i)(?=(rubric|assessment criteria|marking scheme|grading)[:\s]*(.*?)(?=\n\n|\Z))",
+    re.DOTALL,
+)
+
+# Patterns like "Total: 100", "out of 50", "marks: 30"
+_MAX_MARK_KEYWORDS: tuple[str, ...] = ("total", "out of", "mark", "point")
+_MAX_MARK_PATTERN: re.Pattern[str] = re.compile(
+    r"(?i)(?=(total|out of|mark|point)s?[:\s]*(\d+))"
+)
+
+
+def _search_by_priority(
+    pattern: re.Pattern[str], text: str, keywords: tuple[str, ...]
+) -> Optional[str]:
+    """Find the value following the highest-priority keyword in one scan.
+
+    Args:
+        pattern: Combined pattern capturing the keyword and its value.
+        text: Text to search.
+        keywords: Lower-case keywords, highest priority first.
+
+    Returns:
+        Value captured after the earliest occurrence of the best keyword, or
+        None if no keyword matches.
+    """
+    best_rank: int = len(keywords)
+    best_value: Optional[str] = None
+    for match in pattern.finditer(text):
+        rank = keywords.index(match.group(1).lower())
+        if rank < best_rank:
+            best_rank, best_value = rank, match.group(2)
+            if rank == 0:
+                break
+    return best_value
+
+
+# Legacy plain-text response format
+_RESPONSE_MARK_PATTERN: re.Pattern[str] = re.compile(
+    r"MARK[:\s]*(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+_RESPONSE_FEEDBACK_PATTERN: re.Pattern[str] = re.compile(
+    r"FEEDBACK[:\s]*(.*?)(?=\n\n|\Z)", re.IGNORECASE | re.DOTALL
+)
+
+# A complete mark in a partial JSON ('"mark": 85,') or legacy ("MARK: 85/100",
+# "MARK: 85 out of 100", "MARK: 85.") response. The lookahead needs a
+# character after the number that cannot continue it, so a stream cut at "8"
+# of "85" or at "85." of "85.5" does not match; the lookbehind skips "max_mark"
+_STREAMED_MARK_PATTERN: re.Pattern[str] = re.compile(
+    r'(?<!\w)"?mark"?[:\s]*(\d+(?:\.\d+)?)(?=[^\d.]|\.\D)', re.IGNORECASE
+)
+
+# Longest exponential backoff between retries, in seconds
+MAX_RETRY_BACKOFF: float = 60.0
+
+# Adaptive output budget: once a grader has produced OUTPUT_HISTORY_MIN
+# responses, max_tokens is lowered to 1.2x the 90th percentile of its recent
+# output lengths (never below OUTPUT_BUDGET_FLOOR or above its configured limit)
+OUTPUT_HISTORY_MIN: int = 3
+OUTPUT_HISTORY_SIZE: int = 100
+OUTPUT_BUDGET_FLOOR: int = 256
+
+
+def _retry_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Seconds to wait before retrying a failed LLM call.
+
+    Exponential backoff capped at ``MAX_RETRY_BACKOFF``, plus up to a second
+    of jitter so that runs rate limited together do not all retry at once.
+
+    Args:
+        attempt: Zero-based number of the attempt that failed.
+        retry_after: Delay requested by the provider, if any.
+
+    Returns:
+        Delay in seconds, never shorter than ``retry_after``.
+    """
+    jitter: float = random.uniform(0, 1)  # noqa: S311 - backoff jitter only
+    delay: float = min(MAX_RETRY_BACKOFF, 2.0**attempt) + jitter
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
 
 class EnhancedGradingSystem:
     """Enhanced grading system with multi-run capability and statistical aggregation."""
 
-    def __init__(self, config_path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        result_cache: Optional[ResultCache] = None,
+        config: Optional[GradingConfig] = None,
+        structured_output: bool = False,
+    ) -> None:
         """Initialize the enhanced grading system.
 
         Args:
             config_path: Path to YAML configuration file.
+            result_cache: Optional on-disk cache of grader results.
+            config: Already parsed configuration; takes precedence over
+                ``config_path``.
+            structured_output: Constrain single-student responses to the
+                grading JSON schema.
         """
+        self.result_cache: Optional[ResultCache] = result_cache
+        self.structured_output: bool = structured_output
         self.config_manager: GradingConfigManager = GradingConfigManager()
-        self.config: Any = self.config_manager.load_config(config_path)
+        self.config: Any = (
+            config if config is not None else self.config_manager.load_config(config_path)
+        )
         self.llm_provider: LLMProvider = LLMProvider()
 
         # Filter graders by available providers
@@ -41,6 +166,22 @@ class EnhancedGradingSystem:
             self.config, available_providers
         )
 
+        # Resolve the averaging method once rather than per student
+        self._aggregate: Aggregator = get_aggregator(self.config.averaging_method)
+        self._primary_feedback_grader: Optional[str] = next(
+            (g.name for g in self.config.graders if g.primary_feedback), None
+        )
+
+        # Recent output token counts per grader, used to size max_tokens
+        self._output_tokens: defaultdict[str, deque[int]] = defaultdict(
+            lambda: deque(maxlen=OUTPUT_HISTORY_SIZE)
+        )
+
+        # Rubric and max mark depend only on the assignment spec, so they are
+        # extracted once per spec instead of once per student and run
+        self._rubric_cache: dict[str, str] = {}
+        self._max_mark_cache: dict[str, int] = {}
+
         # Initialize prompt manager
         prompt_config: dict[str, Any] = {
             "prompts": self.config.prompts,
@@ -59,6 +200,31 @@ class EnhancedGradingSystem:
             "end_time": None,
         }
 
+    @classmethod
+    def from_dict(
+        cls,
+        config_data: dict[str, Any],
+        result_cache: Optional[ResultCache] = None,
+        structured_output: bool = False,
+    ) -> EnhancedGradingSystem:
+        """Create a grading system from an in-memory configuration dictionary.
+
+        Args:
+            config_data: Configuration in the same structure as the YAML file.
+            result_cache: Optional on-disk cache of grader results.
+            structured_output: Constrain single-student responses to the
+                grading JSON schema.
+
+        Returns:
+            Configured EnhancedGradingSystem.
+        """
+        config = GradingConfigManager()._parse_config(config_data)
+        return cls(
+            result_cache=result_cache,
+            config=config,
+            structured_output=structured_output,
+        )
+
     def grade_submission(
         self,
         student_data: dict[str, Any],
@@ -68,6 +234,33 @@ class EnhancedGradingSystem:
     ) -> dict[str, Any]:
         """Grade a single student submission using the enhanced multi-grader system.
 
+        Synchronous wrapper around ``grade_submission_async``; must not be
+        called from inside a running event loop.
+
+        Args:
+            student_data: Extracted content and metadata for the student.
+            assignment_spec: Assignment specification/requirements.
+            rubric: Optional separate rubric.
+            max_cost_override: Override the default max cost per student.
+
+        Returns:
+            Dictionary containing comprehensive grading results.
+        """
+        return asyncio.run(
+            self.grade_submission_async(
+                student_data, assignment_spec, rubric, max_cost_override
+            )
+        )
+
+    async def grade_submission_async(
+        self,
+        student_data: dict[str, Any],
+        assignment_spec: str,
+        rubric: Optional[str] = None,
+        max_cost_override: Optional[float] = None,
+    ) -> dict[str, Any]:
+        """Grade a single student submission without blocking the event loop.
+
         Args:
             student_data: Extracted content and metadata for the student.
             assignment_spec: Assignment specification/requirements.
@@ -82,9 +275,461 @@ class EnhancedGradingSystem:
         if not self.session_stats["start_time"]:
             self.session_stats["start_time"] = datetime.now()
 
-        logger.info(f"Starting enhanced grading for student {student_id}")
+        logger.debug(f"Starting enhanced grading for student {student_id}")
 
-        result: dict[str, Any] = {
+        result: dict[str, Any] = self._new_result(student_id)
+        prompt_data: dict[str, str] = self._build_prompt_data(
+            student_data, assignment_spec, rubric
+        )
+        # Token counting is CPU work; keep it off the event loop
+        max_cost: float = await asyncio.to_thread(
+            self._check_cost_limit, result, prompt_data, max_cost_override
+        )
+
+        # Process all graders, overlapping their LLM calls when allowed
+        start_time: float = time.time()
+        semaphore = asyncio.Semaphore(
+            self.config.max_concurrent_requests
+            if self.config.parallel_execution
+            else 1
+        )
+
+        grader_results: list[dict[str, Any]] = await asyncio.gather(
+            *(
+                self._process_grader_async(
+                    grader, prompt_data, assignment_spec, max_cost, semaphore
+                )
+                for grader in self.config.graders
+            )
+        )
+        for grader, grader_result in zip(self.config.graders, grader_results):
+            result["grader_results"][grader.name] = grader_result
+
+        self._finalize_result(result, assignment_spec, time.time() - start_time)
+        return result
+
+    async def grade_submissions_batch_async(
+        self,
+        students: list[dict[str, Any]],
+        assignment_spec: str,
+        rubric: Optional[str] = None,
+        max_cost_override: Optional[float] = None,
+        poll_interval: float = 10.0,
+    ) -> list[dict[str, Any]]:
+        """Grade many submissions at once using provider batch APIs.
+
+        Every run for graders on a batch-capable provider (see
+        ``BATCH_PROVIDERS``) is collected into a single batch per provider,
+        which is billed at a discount but completes asynchronously. Graders on
+        other providers are graded live as usual.
+
+        Failed batch requests are not retried; the run is recorded as failed.
+        Live calls share one concurrency limit of
+        ``max_concurrent_requests`` across all students.
+
+        Args:
+            students: Student data dictionaries, as passed to ``grade_submission``.
+            assignment_spec: Assignment specification/requirements.
+            rubric: Optional separate rubric.
+            max_cost_override: Override the default max cost per student.
+            poll_interval: Initial delay between batch status checks, in seconds.
+
+        Returns:
+            List of grading results in the same order as ``students``.
+        """
+        if not self.session_stats["start_time"]:
+            self.session_stats["start_time"] = datetime.now()
+
+        start_time: float = time.time()
+
+        results: list[dict[str, Any]] = []
+        prompts: list[dict[str, str]] = []
+        max_costs: list[float] = []
+        for student_data in students:
+            result = self._new_result(student_data.get("student_id", "unknown"))
+            prompt_data = self._build_prompt_data(student_data, assignment_spec, rubric)
+            max_costs.append(
+                await asyncio.to_thread(
+                    self._check_cost_limit, result, prompt_data, max_cost_override
+                )
+            )
+            results.append(result)
+            prompts.append(prompt_data)
+
+        # Collect batch requests per provider. Custom ids are positional because
+        # providers restrict which characters they may contain.
+        batch_requests: dict[str, list[BatchRequest]] = {}
+        request_index: dict[str, tuple[int, Any, int]] = {}
+        live_graders: list[Any] = []
+
+        for grader in self.config.graders:
+            if grader.provider not in BATCH_PROVIDERS:
+                live_graders.append(grader)
+                continue
+
+            model_name: str = self.llm_provider.get_model_name(
+                grader.provider, grader.model
+            )
+            for student_index, prompt_data in enumerate(prompts):
+                cached_result = await self._get_cached_grader_result(
+                    grader, prompt_data
+                )
+                if cached_result is not None:
+                    results[student_index]["grader_results"][grader.name] = (
+                        cached_result
+                    )
+                    continue
+
+                for run_number in range(1, self.config.runs_per_grader + 1):
+                    custom_id = f"req-{len(request_index)}"
+                    request_index[custom_id] = (student_index, grader, run_number)
+                    batch_requests.setdefault(grader.provider, []).append(
+                        BatchRequest(
+                            custom_id=custom_id,
+                            model=model_name,
+                            prompt=prompt_data["user"],
+                            system_prompt=prompt_data.get("system")
+                            or grader.system_prompt,
+                            temperature=grader.temperature,
+                            max_tokens=grader.max_tokens,
+                            prompt_prefix=prompt_data.get("prefix"),
+                        )
+                    )
+
+        async def _run_batch(
+            provider: str, requests: list[BatchRequest]
+        ) -> dict[str, dict[str, Any]]:
+            try:
+                return await asyncio.to_thread(
+                    submit_batch, provider, requests, poll_interval
+                )
+            except Exception as e:
+                logger.error(f"Batch submission failed for {provider}: {e}")
+                return {
+                    request.custom_id: {"success": False, "error": str(e)}
+                    for request in requests
+                }
+
+        live_semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+
+        async def _run_live(student_index: int, grader: Any) -> dict[str, Any]:
+            return await self._process_grader_async(
+                grader,
+                prompts[student_index],
+                assignment_spec,
+                max_costs[student_index],
+                live_semaphore,
+            )
+
+        batch_tasks = [
+            _run_batch(provider, requests)
+            for provider, requests in batch_requests.items()
+        ]
+        live_keys = [
+            (student_index, grader)
+            for student_index in range(len(students))
+            for grader in live_graders
+        ]
+        live_tasks = [_run_live(index, grader) for index, grader in live_keys]
+
+        outcomes = await asyncio.gather(*batch_tasks, *live_tasks)
+        batch_outcomes = outcomes[: len(batch_tasks)]
+        live_outcomes = outcomes[len(batch_tasks) :]
+
+        # Group batch responses into per-grader run lists
+        runs: dict[tuple[int, str], list[dict[str, Any]]] = {}
+        for provider_results in batch_outcomes:
+            for custom_id, batch_result in provider_results.items():
+                student_index, grader, run_number = request_index[custom_id]
+                run_result = self._build_batch_run_result(
+                    grader, batch_result, run_number, assignment_spec
+                )
+                runs.setdefault((student_index, grader.name), []).append(run_result)
+
+        for (student_index, grader), grader_result in zip(live_keys, live_outcomes):
+            results[student_index]["grader_results"][grader.name] = grader_result
+
+        for student_index, result in enumerate(results):
+            for grader in self.config.graders:
+                if (
+                    grader.provider in BATCH_PROVIDERS
+                    and grader.name not in result["grader_results"]
+                ):
+                    grader_runs = sorted(
+                        runs.get((student_index, grader.name), []),
+                        key=lambda run: run["run_number"],
+                    )
+                    grader_result = self._build_grader_result(
+                        grader, grader_runs, assignment_spec
+                    )
+                    await self._store_grader_result(
+                        grader, prompts[student_index], grader_result
+                    )
+                    result["grader_results"][grader.name] = grader_result
+
+            # Keep grader results in configuration order
+            result["grader_results"] = {
+                grader.name: result["grader_results"][grader.name]
+                for grader in self.config.graders
+            }
+
+        processing_time: float = (time.time() - start_time) / max(1, len(students))
+        for result in results:
+            self._finalize_result(result, assignment_spec, processing_time)
+
+        return results
+
+    def grade_submissions_batch(
+        self,
+        students: list[dict[str, Any]],
+        assignment_spec: str,
+        rubric: Optional[str] = None,
+        max_cost_override: Optional[float] = None,
+        poll_interval: float = 10.0,
+    ) -> list[dict[str, Any]]:
+        """Synchronous wrapper around ``grade_submissions_batch_async``.
+
+        Args:
+            students: Student data dictionaries.
+            assignment_spec: Assignment specification/requirements.
+            rubric: Optional separate rubric.
+            max_cost_override: Override the default max cost per student.
+            poll_interval: Initial delay between batch status checks, in seconds.
+
+        Returns:
+            List of grading results in the same order as ``students``.
+        """
+        return asyncio.run(
+            self.grade_submissions_batch_async(
+                students, assignment_spec, rubric, max_cost_override, poll_interval
+            )
+        )
+
+    async def grade_submission_group_async(
+        self,
+        students: list[dict[str, Any]],
+        assignment_spec: str,
+        rubric: Optional[str] = None,
+        max_cost_override: Optional[float] = None,
+        json_mode: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Grade several submissions with one LLM call per grader run.
+
+        The assignment spec and rubric are sent once for the whole group and
+        the model returns one result per student, so API calls and shared
+        prompt tokens are divided by the group size. The cost of each call is
+        split evenly between the students in the group.
+
+        Grouped prompts are not stored in the result cache, since the cached
+        result would depend on which students happened to share a prompt.
+
+        Args:
+            students: Student data dictionaries.
+            assignment_spec: Assignment specification/requirements.
+            rubric: Optional separate rubric.
+            max_cost_override: Override the default max cost per student.
+            json_mode: Ask the provider for JSON-mode output.
+
+        Returns:
+            List of grading results in the same order as ``students``.
+        """
+        if not self.session_stats["start_time"]:
+            self.session_stats["start_time"] = datetime.now()
+
+        start_time: float = time.time()
+
+        student_ids: list[str] = [
+            str(student_data.get("student_id", "unknown")) for student_data in students
+        ]
+        results: list[dict[str, Any]] = [self._new_result(sid) for sid in student_ids]
+
+        if not rubric:
+            rubric = self._extract_rubric(assignment_spec)
+
+        # Only use a type-specific template when the whole group shares the type
+        assignment_types = {self._detect_assignment_type(s) for s in students}
+        prompt_data: dict[str, str] = self.prompt_manager.build_group_grading_prompt(
+            students=students,
+            assignment_spec=assignment_spec,
+            rubric=rubric,
+            max_mark=self._extract_max_mark(assignment_spec),
+            assignment_type=assignment_types.pop()
+            if len(assignment_types) == 1
+            else None,
+        )
+
+        max_cost: float = (
+            max_cost_override or self.config.max_cost_per_student
+        ) * len(students)
+        estimated_cost: float = await asyncio.to_thread(
+            self._estimate_total_cost, prompt_data["user"], prompt_data.get("prefix")
+        )
+        if estimated_cost > max_cost:
+            message = (
+                f"Estimated group cost ${estimated_cost:.4f} exceeds limit ${max_cost:.4f}"
+            )
+            logger.warning(message)
+            for result in results:
+                result["metadata"]["errors"].append(message)
+
+        response_format = {"type": "json_object"} if json_mode else None
+
+        for grader in self.config.graders:
+            runs: list[list[dict[str, Any]]] = [[] for _ in students]
+
+            for run_number in range(1, self.config.runs_per_grader + 1):
+                try:
+                    run_results = await self._call_grader_async(
+                        grader,
+                        prompt_data,
+                        run_number,
+                        lambda llm_result, attempt, run_number=run_number: (
+                            self._build_group_run_results(
+                                llm_result,
+                                student_ids,
+                                run_number,
+                                attempt,
+                                assignment_spec,
+                            )
+                        ),
+                        max_tokens=grader.max_tokens * len(students),
+                        response_format=response_format,
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"All attempts failed for {grader.name} run {run_number}: {e}"
+                    )
+                    run_results = [
+                        self._build_failed_run_result(
+                            run_number, str(e), self.config.retry_attempts
+                        )
+                        for _ in students
+                    ]
+
+                for student_runs, run_result in zip(runs, run_results):
+                    student_runs.append(run_result)
+
+            for result, student_runs in zip(results, runs):
+                result["grader_results"][grader.name] = self._build_grader_result(
+                    grader, student_runs, assignment_spec
+                )
+
+        processing_time: float = (time.time() - start_time) / max(1, len(students))
+        for result in results:
+            self._finalize_result(result, assignment_spec, processing_time)
+
+        return results
+
+    def _extract_json_list(self, response_text: str, key: str) -> list[Any]:
+        """Extract a list of results from a JSON response.
+
+        Accepts either an object holding the list under ``key`` or a bare
+        JSON array, optionally surrounded by other text.
+
+        Args:
+            response_text: Raw response text from LLM.
+            key: Key of the list in a JSON object response.
+
+        Returns:
+            The list of entries.
+
+        Raises:
+            ValueError: If the response does not contain such a list.
+        """
+        content: str = response_text.strip()
+        json_start: int = min(
+            (i for i in (content.find("{"), content.find("[")) if i >= 0), default=-1
+        )
+        if json_start < 0:
+            raise ValueError("Response contains no JSON")
+
+        json_end: int = max(content.rfind("}"), content.rfind("]")) + 1
+        parsed: Any = json.loads(content[json_start:json_end])
+        entries: Any = parsed.get(key) if isinstance(parsed, dict) else parsed
+        if not isinstance(entries, list):
+            raise ValueError(f"Response has no list of {key}")
+        return entries
+
+    def _build_group_run_results(
+        self,
+        llm_result: dict[str, Any],
+        student_ids: list[str],
+        run_number: int,
+        attempt: int,
+        assignment_spec: str,
+    ) -> list[dict[str, Any]]:
+        """Split a grouped grading response into one run result per student.
+
+        Args:
+            llm_result: Successful result from the LLM provider.
+            student_ids: IDs of the students in the prompt, in prompt order.
+            run_number: Current run number.
+            attempt: Attempt that produced the response.
+            assignment_spec: Assignment specification.
+
+        Returns:
+            Run results in the same order as ``student_ids``.
+
+        Raises:
+            ValueError: If the response does not contain a list of results.
+        """
+        entries: list[Any] = self._extract_json_list(llm_result["content"], "results")
+
+        by_id: dict[str, dict[str, Any]] = {
+            str(entry.get("student_id")): entry
+            for entry in entries
+            if isinstance(entry, dict) and "student_id" in entry
+        }
+        # Fall back to position when the model dropped or mangled the IDs
+        if not by_id and len(entries) == len(student_ids):
+            by_id = dict(zip(student_ids, entries))
+
+        # Share the cost and token usage of the call between the students
+        share: int = len(student_ids)
+        usage: dict[str, Any] = llm_result["usage"]
+        student_usage: dict[str, Any] = {
+            "response_time": usage["response_time"],
+            "cost": usage["cost"] / share,
+            "input_tokens": usage["input_tokens"] // share,
+            "output_tokens": usage["output_tokens"] // share,
+        }
+
+        run_results: list[dict[str, Any]] = []
+        for student_id in student_ids:
+            entry = by_id.get(student_id)
+            if entry is None:
+                run_results.append(
+                    self._build_failed_run_result(
+                        run_number, "No result for student in grouped response", attempt
+                    )
+                )
+                continue
+
+            run_results.append(
+                self._build_run_result(
+                    {
+                        "content": json.dumps(entry),
+                        "usage": student_usage,
+                        "timestamp": llm_result["timestamp"],
+                    },
+                    run_number,
+                    attempt,
+                    assignment_spec,
+                )
+            )
+
+        return run_results
+
+    def _new_result(self, student_id: str) -> dict[str, Any]:
+        """Create an empty grading result for a student.
+
+        Args:
+            student_id: Student identifier.
+
+        Returns:
+            Result dictionary with empty grader results and metadata.
+        """
+        return {
             "student_id": student_id,
             "timestamp": datetime.now().isoformat(),
             "config": {
@@ -104,6 +749,22 @@ class EnhancedGradingSystem:
             },
         }
 
+    def _build_prompt_data(
+        self,
+        student_data: dict[str, Any],
+        assignment_spec: str,
+        rubric: Optional[str] = None,
+    ) -> dict[str, str]:
+        """Build the system and user prompts for a student submission.
+
+        Args:
+            student_data: Extracted content and metadata for the student.
+            assignment_spec: Assignment specification/requirements.
+            rubric: Optional separate rubric.
+
+        Returns:
+            Dictionary with "system" and "user" prompts.
+        """
         # Extract rubric if not provided
         if not rubric:
             rubric = self._extract_rubric(assignment_spec)
@@ -115,7 +776,7 @@ class EnhancedGradingSystem:
         max_mark: int = self._extract_max_mark(assignment_spec)
 
         # Build grading prompt using PromptManager
-        prompt_data: dict[str, str] = self.prompt_manager.build_grading_prompt(
+        return self.prompt_manager.build_grading_prompt(
             student_data=student_data,
             assignment_spec=assignment_spec,
             rubric=rubric,
@@ -123,9 +784,26 @@ class EnhancedGradingSystem:
             assignment_type=assignment_type,
         )
 
-        # Check cost constraints
+    def _check_cost_limit(
+        self,
+        result: dict[str, Any],
+        prompt_data: dict[str, str],
+        max_cost_override: Optional[float] = None,
+    ) -> float:
+        """Record a warning if the estimated cost exceeds the per-student limit.
+
+        Args:
+            result: Student result to record the warning in.
+            prompt_data: Prompts for grading.
+            max_cost_override: Override the default max cost per student.
+
+        Returns:
+            The maximum cost allowed for the student.
+        """
         max_cost: float = max_cost_override or self.config.max_cost_per_student
-        estimated_cost: float = self._estimate_total_cost(prompt_data["user"])
+        estimated_cost: float = self._estimate_total_cost(
+            prompt_data["user"], prompt_data.get("prefix")
+        )
 
         if estimated_cost > max_cost:
             logger.warning(
@@ -135,16 +813,19 @@ class EnhancedGradingSystem:
                 f"Estimated cost ${estimated_cost:.4f} exceeds limit ${max_cost:.4f}"
             )
 
-        # Process each grader
-        start_time: float = time.time()
+        return max_cost
 
-        for grader in self.config.graders:
-            grader_result = self._process_grader(
-                grader, prompt_data, assignment_spec, max_cost
-            )
-            result["grader_results"][grader.name] = grader_result
+    def _finalize_result(
+        self, result: dict[str, Any], assignment_spec: str, processing_time: float
+    ) -> None:
+        """Total grader metadata, aggregate marks and update session statistics.
 
-            # Update metadata
+        Args:
+            result: Student result with all grader results filled in.
+            assignment_spec: Assignment specification.
+            processing_time: Time spent grading the student, in seconds.
+        """
+        for grader_result in result["grader_results"].values():
             result["metadata"]["total_runs"] += grader_result["metadata"]["total_runs"]
             result["metadata"]["successful_runs"] += grader_result["metadata"][
                 "successful_runs"
@@ -155,9 +836,7 @@ class EnhancedGradingSystem:
             result["metadata"]["total_cost"] += grader_result["metadata"]["total_cost"]
             result["metadata"]["errors"].extend(grader_result["metadata"]["errors"])
 
-        # Calculate processing time
-        end_time: float = time.time()
-        result["metadata"]["processing_time"] = end_time - start_time
+        result["metadata"]["processing_time"] = processing_time
 
         # Aggregate results
         result["aggregate"] = self._aggregate_all_results(
@@ -177,29 +856,245 @@ class EnhancedGradingSystem:
         self.session_stats["total_api_calls"] += result["metadata"]["total_runs"]
         self.session_stats["total_cost"] += result["metadata"]["total_cost"]
 
-        logger.info(
-            f"Completed grading for student {student_id}: "
+        logger.debug(
+            f"Completed grading for student {result['student_id']}: "
             f"{result['metadata']['successful_runs']}/{result['metadata']['total_runs']} runs, "
             f"${result['metadata']['total_cost']:.4f}"
         )
 
-        return result
-
-    def _process_grader(
+    async def _process_grader_async(
         self,
         grader: Any,
         prompt_data: dict[str, str],
         assignment_spec: str,
         max_cost: float,
+        semaphore: Optional[asyncio.Semaphore] = None,
     ) -> dict[str, Any]:
         """Process multiple runs for a single grader.
-        
+
+        Runs are started together and limited by ``semaphore``; a run that
+        gets its turn once the grader's spent cost plus the estimated cost of
+        runs still in flight reaches ``max_cost`` is skipped.
+
         Args:
             grader: Grader configuration object.
             prompt_data: Prompts for grading.
             assignment_spec: Assignment specification.
             max_cost: Maximum allowed cost.
-            
+            semaphore: Limits concurrent LLM calls; runs one at a time if None.
+
+        Returns:
+            Dictionary containing grader results.
+        """
+        cached_result = await self._get_cached_grader_result(grader, prompt_data)
+        if cached_result is not None:
+            return cached_result
+
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(1)
+
+        if self.config.runs_mode == "reflective" and self.config.runs_per_grader > 1:
+            async with semaphore:
+                runs = await self._execute_reflective_runs_async(
+                    grader, prompt_data, assignment_spec
+                )
+            grader_result = self._build_grader_result(grader, runs, assignment_spec)
+            await self._store_grader_result(grader, prompt_data, grader_result)
+            return grader_result
+
+        total_cost: float = 0.0
+        # Runs still in flight have not added their cost yet, so each one
+        # reserves its estimated cost until it finishes
+        reserved_cost: float = 0.0
+        run_estimate: float = await asyncio.to_thread(
+            self._estimate_run_cost,
+            grader,
+            prompt_data["user"],
+            prompt_data.get("prefix"),
+        )
+
+        async def run(run_number: int) -> Optional[dict[str, Any]]:
+            nonlocal total_cost, reserved_cost
+            async with semaphore:
+                # Check cost constraint
+                if total_cost + reserved_cost >= max_cost:
+                    logger.warning(
+                        f"Cost limit reached for {grader.name}, "
+                        f"skipping run {run_number}"
+                    )
+                    return None
+
+                reserved_cost += run_estimate
+                try:
+                    run_result: dict[str, Any] = (
+                        await self._execute_single_run_async(
+                            grader, prompt_data, run_number, assignment_spec
+                        )
+                    )
+                finally:
+                    reserved_cost -= run_estimate
+                total_cost += run_result.get("cost", 0.0)
+                return run_result
+
+        run_numbers = range(1, self.config.runs_per_grader + 1)
+        run_results = await asyncio.gather(*(run(n) for n in run_numbers))
+        runs: list[dict[str, Any]] = [r for r in run_results if r is not None]
+
+        grader_result = self._build_grader_result(grader, runs, assignment_spec)
+        await self._store_grader_result(grader, prompt_data, grader_result)
+        return grader_result
+
+    def _grader_cache_key(self, grader: Any, prompt_data: dict[str, str]) -> str:
+        """Build the result cache key for a grader and prompt.
+
+        Args:
+            grader: Grader configuration object.
+            prompt_data: Prompts for grading.
+
+        Returns:
+            Cache key covering everything that affects the grader result.
+        """
+        return ResultCache.make_key(
+            prompt_data.get("system") or grader.system_prompt,
+            prompt_data["user"],
+            grader.name,
+            grader.provider,
+            grader.model,
+            grader.temperature,
+            grader.max_tokens,
+            grader.mark_only,
+            self.config.runs_per_grader,
+            self.config.averaging_method,
+        )
+
+    async def _get_cached_grader_result(
+        self, grader: Any, prompt_data: dict[str, str]
+    ) -> Optional[dict[str, Any]]:
+        """Look up a previously stored result for a grader.
+
+        The database is read on a worker thread so that the event loop (which
+        may be the GUI's) is not blocked on disk I/O.
+
+        Args:
+            grader: Grader configuration object.
+            prompt_data: Prompts for grading.
+
+        Returns:
+            The cached grader result with no cost attributed to this session,
+            or None if caching is disabled or nothing is stored.
+        """
+        if self.result_cache is None:
+            return None
+
+        cached_result = await asyncio.to_thread(
+            self.result_cache.get, self._grader_cache_key(grader, prompt_data)
+        )
+        if cached_result is None:
+            return None
+
+        logger.debug(f"Using cached result for {grader.name}")
+        cached_result["metadata"]["cached"] = True
+        cached_result["metadata"]["total_cost"] = 0.0
+        return cached_result
+
+    async def _store_grader_result(
+        self, grader: Any, prompt_data: dict[str, str], grader_result: dict[str, Any]
+    ) -> None:
+        """Store a grader result if every run succeeded, on a worker thread.
+
+        Args:
+            grader: Grader configuration object.
+            prompt_data: Prompts for grading.
+            grader_result: Result to store.
+        """
+        if (
+            self.result_cache is None
+            or grader_result["metadata"]["failed_runs"] > 0
+            or grader_result["metadata"]["successful_runs"] == 0
+        ):
+            return
+
+        try:
+            await asyncio.to_thread(
+                self.result_cache.set,
+                self._grader_cache_key(grader, prompt_data),
+                grader_result,
+            )
+        except Exception as e:
+            logger.warning(f"Could not cache result for {grader.name}: {e}")
+
+    async def _execute_reflective_runs_async(
+        self, grader: Any, prompt_data: dict[str, str], assignment_spec: str
+    ) -> list[dict[str, Any]]:
+        """Produce all runs for a grader in one self-reflective LLM call.
+
+        The model grades once, then critiques and re-scores its own
+        assessment, returning every scoring. Each scoring becomes one run,
+        and the cost of the call is split evenly between them.
+
+        Args:
+            grader: Grader configuration object.
+            prompt_data: Prompts for grading.
+            assignment_spec: Assignment specification.
+
+        Returns:
+            Run results in run order.
+        """
+        runs: int = self.config.runs_per_grader
+        reflective_prompt = self.prompt_manager.add_reflection_instructions(
+            prompt_data, runs
+        )
+
+        def parse(llm_result: dict[str, Any], attempt: int) -> list[dict[str, Any]]:
+            scorings = self._extract_json_list(llm_result["content"], "scorings")[:runs]
+            if not scorings:
+                raise ValueError("Reflective response contains no scorings")
+
+            usage: dict[str, Any] = llm_result["usage"]
+            run_usage: dict[str, Any] = {
+                "response_time": usage["response_time"],
+                "cost": usage["cost"] / len(scorings),
+                "input_tokens": usage["input_tokens"] // len(scorings),
+                "output_tokens": usage["output_tokens"] // len(scorings),
+            }
+            return [
+                self._build_run_result(
+                    {
+                        "content": json.dumps(scoring),
+                        "usage": run_usage,
+                        "timestamp": llm_result["timestamp"],
+                    },
+                    run_number,
+                    attempt,
+                    assignment_spec,
+                )
+                for run_number, scoring in enumerate(scorings, 1)
+            ]
+
+        try:
+            return await self._call_grader_async(
+                grader,
+                reflective_prompt,
+                1,
+                parse,
+                max_tokens=grader.max_tokens * runs,
+            )
+        except Exception as e:
+            logger.error(f"All attempts failed for {grader.name} reflective runs: {e}")
+            return [
+                self._build_failed_run_result(1, str(e), self.config.retry_attempts)
+            ]
+
+    def _build_grader_result(
+        self, grader: Any, runs: list[dict[str, Any]], assignment_spec: str
+    ) -> dict[str, Any]:
+        """Collect the runs of a single grader into a grader result.
+
+        Args:
+            grader: Grader configuration object.
+            runs: Run results in run order.
+            assignment_spec: Assignment specification.
+
         Returns:
             Dictionary containing grader results.
         """
@@ -208,7 +1103,7 @@ class EnhancedGradingSystem:
             "provider": grader.provider,
             "model": grader.model,
             "weight": grader.weight,
-            "runs": [],
+            "runs": runs,
             "aggregated": {},
             "metadata": {
                 "total_runs": 0,
@@ -222,28 +1117,22 @@ class EnhancedGradingSystem:
 
         successful_runs: list[dict[str, Any]] = []
         total_response_time: float = 0.0
+        # Most detailed feedback, tracked while collecting the runs
+        best_feedback: str = ""
 
-        for run_number in range(self.config.runs_per_grader):
-            # Check cost constraint
-            if grader_result["metadata"]["total_cost"] >= max_cost:
-                logger.warning(f"Cost limit reached for {grader.name}, stopping runs")
-                break
-
-            run_result: dict[str, Any] = self._execute_single_run(
-                grader, prompt_data, run_number + 1, assignment_spec
-            )
-
-            grader_result["runs"].append(run_result)
+        for run_result in runs:
             grader_result["metadata"]["total_runs"] += 1
 
             if run_result["success"]:
                 successful_runs.append(run_result)
                 grader_result["metadata"]["successful_runs"] += 1
                 total_response_time += run_result.get("response_time", 0)
+                if len(run_result["feedback"]) > len(best_feedback):
+                    best_feedback = run_result["feedback"]
             else:
                 grader_result["metadata"]["failed_runs"] += 1
                 grader_result["metadata"]["errors"].append(
-                    f"Run {run_number + 1}: {run_result.get('error', 'Unknown error')}"
+                    f"Run {run_result['run_number']}: {run_result.get('error', 'Unknown error')}"
                 )
 
             grader_result["metadata"]["total_cost"] += run_result.get("cost", 0.0)
@@ -257,7 +1146,7 @@ class EnhancedGradingSystem:
         # Aggregate runs for this grader
         if successful_runs:
             grader_result["aggregated"] = self._aggregate_grader_runs(
-                successful_runs, assignment_spec
+                successful_runs, assignment_spec, best_feedback
             )
         else:
             grader_result["aggregated"] = {
@@ -269,7 +1158,108 @@ class EnhancedGradingSystem:
 
         return grader_result
 
-    def _execute_single_run(
+    def _build_run_result(
+        self,
+        llm_result: dict[str, Any],
+        run_number: int,
+        attempt: int,
+        assignment_spec: str,
+        mark_only: bool = False,
+    ) -> dict[str, Any]:
+        """Parse a successful LLM response into a run result.
+
+        Args:
+            llm_result: Successful result from the LLM provider.
+            run_number: Current run number.
+            attempt: Attempt that produced the response.
+            assignment_spec: Assignment specification.
+            mark_only: Whether the response was cut off after the mark.
+
+        Returns:
+            Dictionary containing run results.
+        """
+        parsed_result: dict[str, Any]
+        if mark_only:
+            try:
+                parsed_result = self._parse_streamed_mark(
+                    llm_result["content"], assignment_spec
+                )
+            except ValueError:
+                # A stream the provider finished itself holds the whole
+                # response, which the full parser may still read a mark from
+                if llm_result.get("finish_reason") is None:
+                    raise
+                parsed_result = self._parse_grading_response(
+                    llm_result["content"], assignment_spec
+                )
+                parsed_result["feedback"] = ""
+        else:
+            parsed_result = self._parse_grading_response(
+                llm_result["content"], assignment_spec
+            )
+
+        return {
+            "run_number": run_number,
+            "attempt": attempt,
+            "success": True,
+            "mark": parsed_result["mark"],
+            "feedback": parsed_result["feedback"],
+            "max_mark": parsed_result["max_mark"],
+            "response_time": llm_result["usage"]["response_time"],
+            "cost": llm_result["usage"]["cost"],
+            "token_usage": {
+                "input_tokens": llm_result["usage"]["input_tokens"],
+                "output_tokens": llm_result["usage"]["output_tokens"],
+            },
+            "timestamp": llm_result["timestamp"],
+        }
+
+    def _build_batch_run_result(
+        self,
+        grader: Any,
+        batch_result: dict[str, Any],
+        run_number: int,
+        assignment_spec: str,
+    ) -> dict[str, Any]:
+        """Convert a provider batch response into a run result.
+
+        Args:
+            grader: Grader configuration object.
+            batch_result: Result returned by ``submit_batch`` for one request.
+            run_number: Run number of the request.
+            assignment_spec: Assignment specification.
+
+        Returns:
+            Dictionary containing run results.
+        """
+        if not batch_result["success"]:
+            return self._build_failed_run_result(
+                run_number, batch_result.get("error", "Batch request failed"), 1
+            )
+
+        input_tokens: int = batch_result["input_tokens"]
+        output_tokens: int = batch_result["output_tokens"]
+        cost: float = (
+            self.llm_provider.estimate_cost(
+                grader.provider, grader.model, input_tokens, output_tokens
+            )
+            * BATCH_COST_FACTOR
+        )
+        self.llm_provider.record_usage(grader.provider, input_tokens, output_tokens, cost)
+
+        llm_result: dict[str, Any] = {
+            "content": batch_result["content"],
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "response_time": 0.0,
+                "cost": cost,
+            },
+            "timestamp": datetime.now().isoformat(),
+        }
+        return self._build_run_result(llm_result, run_number, 1, assignment_spec)
+
+    async def _execute_single_run_async(
         self,
         grader: Any,
         prompt_data: dict[str, str],
@@ -287,144 +1277,264 @@ class EnhancedGradingSystem:
         Returns:
             Dictionary containing run results.
         """
+        response_format: Optional[dict[str, Any]] = (
+            build_response_schema(self._extract_max_mark(assignment_spec))
+            if self.structured_output
+            else None
+        )
+        mark_only: bool = grader.mark_only
+
         try:
-            # Add retry logic
-            for attempt in range(self.config.retry_attempts):
+            return await self._call_grader_async(
+                grader,
+                prompt_data,
+                run_number,
+                lambda llm_result, attempt: self._build_run_result(
+                    llm_result, run_number, attempt, assignment_spec, mark_only
+                ),
+                response_format=response_format,
+                stop_pattern=_STREAMED_MARK_PATTERN if mark_only else None,
+            )
+        except Exception as e:
+            logger.error(f"All attempts failed for {grader.name} run {run_number}: {e}")
+            return self._build_failed_run_result(
+                run_number, str(e), self.config.retry_attempts
+            )
+
+    async def _call_grader_async(
+        self,
+        grader: Any,
+        prompt_data: dict[str, str],
+        run_number: int,
+        parse: Callable[[dict[str, Any], int], Any],
+        max_tokens: Optional[int] = None,
+        response_format: Optional[dict[str, Any]] = None,
+        stop_pattern: Optional[re.Pattern[str]] = None,
+    ) -> Any:
+        """Call the LLM for one grading run, retrying with exponential backoff.
+
+        A failed request or a response that ``parse`` rejects both count as a
+        failed attempt. A ``Retry-After`` delay reported by the provider is
+        honoured when it is longer than the backoff.
+
+        Args:
+            grader: Grader configuration object.
+            prompt_data: Prompts for grading.
+            run_number: Current run number.
+            parse: Called with the successful LLM result and attempt number.
+            max_tokens: Override for the grader's max_tokens.
+            response_format: Optional structured output format for the provider.
+            stop_pattern: Stream the response and stop once this matches.
+
+        Returns:
+            The value returned by ``parse``.
+
+        Raises:
+            Exception: The last error once all attempts have failed.
+        """
+        # Use system prompt from prompt data if available, otherwise from grader config
+        system_prompt: str = prompt_data.get("system") or grader.system_prompt
+        llm_kwargs: dict[str, Any] = {}
+        if response_format:
+            llm_kwargs["response_format"] = response_format
+        if stop_pattern is not None:
+            llm_kwargs["stop_pattern"] = stop_pattern
+
+        # Responses are cached per run so that re-grading after a partial
+        # failure only pays for the runs that did not complete
+        cache_key: Optional[str] = None
+        if self.result_cache is not None:
+            cache_key = ResultCache.make_key(
+                "llm_response",
+                grader.provider,
+                grader.model,
+                system_prompt,
+                prompt_data["user"],
+                grader.temperature,
+                max_tokens or grader.max_tokens,
+                response_format,
+                stop_pattern.pattern if stop_pattern is not None else None,
+                run_number,
+            )
+            cached_response = await asyncio.to_thread(self.result_cache.get, cache_key)
+            if cached_response is not None:
                 try:
-                    # Use system prompt from prompt data if available, otherwise from grader config
-                    system_prompt: str = prompt_data.get("system") or grader.system_prompt
-
-                    llm_result: dict[str, Any] = self.llm_provider.grade_submission(
-                        provider=grader.provider,
-                        model=grader.model,
-                        prompt=prompt_data["user"],
-                        system_prompt=system_prompt,
-                        temperature=grader.temperature,
-                        max_tokens=grader.max_tokens,
-                        rate_limit=grader.rate_limit,
-                        timeout=self.config.timeout_per_run,
+                    cached_response["usage"]["cost"] = 0.0
+                    return parse(cached_response, 1)
+                except Exception as e:
+                    logger.warning(f"Ignoring unusable cached response: {e}")
+
+        # Only standard runs have a typical output length to learn from
+        adaptive: bool = max_tokens is None and stop_pattern is None
+
+        for attempt in range(self.config.retry_attempts):
+            retry_after: Optional[float] = None
+            # Retries fall back to the full budget in case the last response
+            # was cut short
+            request_max_tokens: int = (
+                self._output_budget(grader)
+                if adaptive and attempt == 0
+                else max_tokens or grader.max_tokens
+            )
+            try:
+                llm_result: dict[str, Any] = await self.llm_provider.grade_submission_async(
+                    provider=grader.provider,
+                    model=grader.model,
+                    prompt=prompt_data["user"],
+                    system_prompt=system_prompt,
+                    temperature=grader.temperature,
+                    max_tokens=request_max_tokens,
+                    rate_limit=grader.rate_limit,
+                    token_rate_limit=grader.token_rate_limit,
+                    timeout=self.config.timeout_per_run,
+                    prompt_prefix=prompt_data.get("prefix"),
+                    **llm_kwargs,
+                )
+
+                if not llm_result["success"]:
+                    retry_after = llm_result.get("retry_after")
+                    raise Exception(llm_result.get("error", "LLM call failed"))
+
+                if (
+                    llm_result.get("finish_reason") == "length"
+                    and request_max_tokens < grader.max_tokens
+                ):
+                    raise Exception(
+                        f"Response truncated at adaptive max_tokens={request_max_tokens}"
                     )
 
-                    if llm_result["success"]:
-                        # Parse the grading response
-                        parsed_result: dict[str, Any] = self._parse_grading_response(
-                            llm_result["content"], assignment_spec
-                        )
+                parsed: Any = parse(llm_result, attempt + 1)
+                if adaptive:
+                    self._output_tokens[grader.name].append(
+                        llm_result["usage"]["output_tokens"]
+                    )
+                if cache_key is not None:
+                    await self._store_llm_response(cache_key, llm_result)
+                return parsed
+
+            except Exception as e:
+                if attempt == self.config.retry_attempts - 1:
+                    raise
+                logger.warning(
+                    f"Attempt {attempt + 1} failed for {grader.name} run {run_number}, retrying: {e}"
+                )
+                await asyncio.sleep(_retry_delay(attempt, retry_after))
 
-                        return {
-                            "run_number": run_number,
-                            "attempt": attempt + 1,
-                            "success": True,
-                            "mark": parsed_result["mark"],
-                            "feedback": parsed_result["feedback"],
-                            "max_mark": parsed_result["max_mark"],
-                            "response_time": llm_result["usage"]["response_time"],
-                            "cost": llm_result["usage"]["cost"],
-                            "token_usage": {
-                                "input_tokens": llm_result["usage"]["input_tokens"],
-                                "output_tokens": llm_result["usage"]["output_tokens"],
-                            },
-                            "timestamp": llm_result["timestamp"],
-                        }
-                    else:
-                        if attempt == self.config.retry_attempts - 1:
-                            # Last attempt failed
-                            raise Exception(llm_result.get("error", "LLM call failed"))
-                        else:
-                            logger.warning(
-                                f"Attempt {attempt + 1} failed for {grader.name} run {run_number}, retrying..."
-                            )
-                            time.sleep(2**attempt)  # Exponential backoff
+        raise RuntimeError("All retry attempts exhausted")
 
-                except Exception as e:
-                    if attempt == self.config.retry_attempts - 1:
-                        logger.error(
-                            f"All attempts failed for {grader.name} run {run_number}: {e}"
-                        )
-                        return {
-                            "run_number": run_number,
-                            "attempt": attempt + 1,
-                            "success": False,
-                            "error": str(e),
-                            "cost": 0.0,
-                            "timestamp": datetime.now().isoformat(),
-                        }
-                    else:
-                        logger.warning(f"Attempt {attempt + 1} failed, retrying: {e}")
-                        time.sleep(2**attempt)
-
-            # If we reach here, all retry attempts were exhausted without success
-            logger.error(f"All retry attempts exhausted for {grader.name} run {run_number}")
-            return {
-                "run_number": run_number,
-                "attempt": self.config.retry_attempts,
-                "success": False,
-                "error": "All retry attempts exhausted",
-                "cost": 0.0,
-                "timestamp": datetime.now().isoformat(),
-            }
+    def _output_budget(self, grader: Any) -> int:
+        """Choose max_tokens for a grader from its recent output lengths.
 
+        Args:
+            grader: Grader configuration object.
+
+        Returns:
+            The configured max_tokens until enough responses have been seen,
+            then 1.2x the 90th percentile of recent output lengths, clamped
+            to ``[OUTPUT_BUDGET_FLOOR, grader.max_tokens]``.
+        """
+        history: Optional[deque[int]] = self._output_tokens.get(grader.name)
+        if not history or len(history) < OUTPUT_HISTORY_MIN:
+            return grader.max_tokens
+
+        budget: int = int(np.percentile(history, 90) * 1.2)
+        return min(grader.max_tokens, max(OUTPUT_BUDGET_FLOOR, budget))
+
+    async def _store_llm_response(
+        self, cache_key: str, llm_result: dict[str, Any]
+    ) -> None:
+        """Store a parsed LLM response in the result cache, on a worker thread.
+
+        Args:
+            cache_key: Key built in ``_call_grader_async``.
+            llm_result: Successful result from the LLM provider.
+        """
+        if self.result_cache is None:
+            return
+
+        try:
+            await asyncio.to_thread(
+                self.result_cache.set,
+                cache_key,
+                {
+                    "success": True,
+                    "content": llm_result["content"],
+                    "usage": llm_result["usage"],
+                    "finish_reason": llm_result.get("finish_reason"),
+                    "timestamp": llm_result["timestamp"],
+                },
+            )
         except Exception as e:
-            logger.error(f"Unexpected error in {grader.name} run {run_number}: {e}")
-            return {
-                "run_number": run_number,
-                "success": False,
-                "error": str(e),
-                "cost": 0.0,
-                "timestamp": datetime.now().isoformat(),
-            }
+            logger.warning(f"Could not cache LLM response: {e}")
+
+    def _build_failed_run_result(
+        self, run_number: int, error: str, attempt: int
+    ) -> dict[str, Any]:
+        """Build the result of a run that produced no mark.
+
+        Args:
+            run_number: Current run number.
+            error: Error message.
+            attempt: Number of attempts made.
+
+        Returns:
+            Dictionary containing run results.
+        """
+        return {
+            "run_number": run_number,
+            "attempt": attempt,
+            "success": False,
+            "error": error,
+            "cost": 0.0,
+            "timestamp": datetime.now().isoformat(),
+        }
 
     def _aggregate_grader_runs(
-        self, successful_runs: list[dict[str, Any]], assignment_spec: str
+        self,
+        successful_runs: list[dict[str, Any]],
+        assignment_spec: str,
+        best_feedback: Optional[str] = None,
     ) -> dict[str, Any]:
         """Aggregate multiple runs from a single grader.
         
         Args:
             successful_runs: List of successful run results.
             assignment_spec: Assignment specification.
+            best_feedback: Most detailed feedback among the runs, if the
+                caller already found it.
             
         Returns:
             Dictionary containing aggregated results.
         """
         marks: list[float] = [run["mark"] for run in successful_runs]
-        feedbacks: list[str] = [run["feedback"] for run in successful_runs]
-
-        # Calculate aggregated mark
-        aggregated_mark: float
-        if self.config.averaging_method == "mean":
-            aggregated_mark = mean(marks)
-        elif self.config.averaging_method == "median":
-            aggregated_mark = median(marks)
-        elif self.config.averaging_method == "trimmed_mean":
-            # Remove highest and lowest, then take mean
-            if len(marks) > 2:
-                sorted_marks: list[float] = sorted(marks)
-                trimmed_marks: list[float] = sorted_marks[1:-1]
-                aggregated_mark = mean(trimmed_marks) if trimmed_marks else mean(marks)
-            else:
-                aggregated_mark = mean(marks)
-        else:  # Default to mean
-            aggregated_mark = mean(marks)
+        mark_array = to_array(marks)
+        max_mark: int = self._extract_max_mark(assignment_spec)
+
+        # Calculate aggregated mark (runs of one grader are unweighted)
+        aggregated_mark: float = self._aggregate(mark_array, None)
+        mark_std: float = sample_std(mark_array)
 
         # Calculate confidence based on consistency
         confidence: float
         if len(marks) > 1:
-            mark_std: float = stdev(marks)
-            max_mark: int = self._extract_max_mark(assignment_spec)
             confidence = max(0.1, 1.0 - (mark_std / max_mark))
         else:
             confidence = 0.7  # Lower confidence for single run
 
         # Combine feedback (use most detailed one)
-        primary_feedback: str = max(feedbacks, key=len)
+        primary_feedback: str = (
+            best_feedback
+            if best_feedback is not None
+            else max((run["feedback"] for run in successful_runs), key=len)
+        )
 
         return {
             "mark": round(aggregated_mark, 1),
             "feedback": primary_feedback,
             "confidence": round(confidence, 3),
-            "max_mark": self._extract_max_mark(assignment_spec),
+            "max_mark": max_mark,
             "run_marks": marks,
-            "mark_std_dev": round(stdev(marks), 2) if len(marks) > 1 else 0.0,
+            "mark_std_dev": round(mark_std, 2),
             "runs_used": len(successful_runs),
         }
 
@@ -440,6 +1550,8 @@ class EnhancedGradingSystem:
         Returns:
             Dictionary containing final aggregated results.
         """
+        max_mark: int = self._extract_max_mark(assignment_spec)
+
         # Extract aggregated results from each grader
         grader_aggregates: list[dict[str, Any]] = []
         weights: list[float] = []
@@ -454,33 +1566,19 @@ class EnhancedGradingSystem:
                 "mark": 0,
                 "feedback": "No successful grading runs",
                 "confidence": 0.0,
-                "max_mark": self._extract_max_mark(assignment_spec),
+                "max_mark": max_mark,
                 "grader_marks": [],
                 "final_method": "failed",
             }
 
         # Calculate weighted average
         marks: list[float] = [result["mark"] for result in grader_aggregates]
+        mark_array = to_array(marks)
 
-        final_mark: float
-        if self.config.averaging_method == "weighted_mean":
-            weighted_sum: float = sum(mark * weight for mark, weight in zip(marks, weights))
-            total_weight: float = sum(weights)
-            final_mark = weighted_sum / total_weight
-        else:
-            # Use the same method as individual grader aggregation
-            if self.config.averaging_method == "median":
-                final_mark = median(marks)
-            elif self.config.averaging_method == "trimmed_mean" and len(marks) > 2:
-                sorted_marks: list[float] = sorted(marks)
-                trimmed_marks: list[float] = sorted_marks[1:-1]
-                final_mark = mean(trimmed_marks) if trimmed_marks else mean(marks)
-            else:
-                final_mark = mean(marks)
+        final_mark: float = self._aggregate(mark_array, to_array(weights))
 
         # Calculate overall confidence
-        mark_std: float = stdev(marks) if len(marks) > 1 else 0
-        max_mark: int = self._extract_max_mark(assignment_spec)
+        mark_std: float = sample_std(mark_array)
         base_confidence: float = max(0.3, 1.0 - (mark_std / max_mark))
 
         # Boost confidence based on number of successful graders
@@ -489,17 +1587,11 @@ class EnhancedGradingSystem:
 
         # Get primary feedback (from primary_feedback grader if available)
         primary_feedback: str = ""
-        for grader_name, grader_result in grader_results.items():
-            grader_config: Optional[Any] = next(
-                (g for g in self.config.graders if g.name == grader_name), None
-            )
-            if (
-                grader_config
-                and grader_config.primary_feedback
-                and grader_result["metadata"]["successful_runs"] > 0
-            ):
-                primary_feedback = grader_result["aggregated"]["feedback"]
-                break
+        primary_result: Optional[dict[str, Any]] = grader_results.get(
+            self._primary_feedback_grader or ""
+        )
+        if primary_result and primary_result["metadata"]["successful_runs"] > 0:
+            primary_feedback = primary_result["aggregated"]["feedback"]
 
         # If no primary feedback grader, use the most detailed feedback
         if not primary_feedback and grader_aggregates:
@@ -567,21 +1659,19 @@ class EnhancedGradingSystem:
         Returns:
             Extracted rubric text.
         """
-        # Look for common rubric patterns
-        rubric_patterns: list[str] = [
-            r"(?i)rubric[:\s]*(.*?)(?=\n\n|\Z)",
-            r"(?i)assessment criteria[:\s]*(.*?)(?=\n\n|\Z)",
-            r"(?i)marking scheme[:\s]*(.*?)(?=\n\n|\Z)",
-            r"(?i)grading[:\s]*(.*?)(?=\n\n|\Z)",
-        ]
-
-        for pattern in rubric_patterns:
-            match: Optional[re.Match[str]] = re.search(pattern, assignment_spec, re.DOTALL)
-            if match:
-                return match.group(1).strip()
+        cached: Optional[str] = self._rubric_cache.get(assignment_spec)
+        if cached is not None:
+            return cached
+
+        # Look for common rubric patterns; if no specific rubric is found,
+        # use the whole assignment spec
+        found: Optional[str] = _search_by_priority(
+            _RUBRIC_PATTERN, assignment_spec, _RUBRIC_KEYWORDS
+        )
+        rubric: str = found.strip() if found is not None else assignment_spec
 
-        # If no specific rubric found, return the whole assignment spec
-        return assignment_spec
+        self._rubric_cache[assignment_spec] = rubric
+        return rubric
 
     def _extract_max_mark(self, assignment_spec: str) -> int:
         """Extract maximum mark from assignment specification.
@@ -592,21 +1682,18 @@ class EnhancedGradingSystem:
         Returns:
             Maximum mark value.
         """
-        # Look for patterns like "Total: 100", "out of 50", "marks: 30"
-        mark_patterns: list[str] = [
-            r"(?i)total[:\s]*(\d+)",
-            r"(?i)out of[:\s]*(\d+)",
-            r"(?i)marks?[:\s]*(\d+)",
-            r"(?i)points?[:\s]*(\d+)",
-        ]
-
-        for pattern in mark_patterns:
-            match: Optional[re.Match[str]] = re.search(pattern, assignment_spec)
-            if match:
-                return int(match.group(1))
+        cached: Optional[int] = self._max_mark_cache.get(assignment_spec)
+        if cached is not None:
+            return cached
 
         # Default to 100 if no max mark found
-        return 100
+        found: Optional[str] = _search_by_priority(
+            _MAX_MARK_PATTERN, assignment_spec, _MAX_MARK_KEYWORDS
+        )
+        max_mark: int = int(found) if found is not None else 100
+
+        self._max_mark_cache[assignment_spec] = max_mark
+        return max_mark
 
     def _parse_grading_response(
         self, response_text: str, assignment_spec: str
@@ -620,16 +1707,27 @@ class EnhancedGradingSystem:
         Returns:
             Dictionary containing parsed grading results.
         """
+        max_mark: int = self._extract_max_mark(assignment_spec)
         result: dict[str, Any] = {
             "mark": 0,
             "feedback": "",
-            "max_mark": self._extract_max_mark(assignment_spec),
-            "timestamp": datetime.now().isoformat(),
+            "max_mark": max_mark,
             "strengths": [],
             "improvements": [],
             "confidence": 0.8,
         }
 
+        # Structured output responses are plain JSON matching the schema
+        if self.structured_output:
+            try:
+                parsed: GradingResponse = GradingResponse.model_validate_json(
+                    response_text
+                )
+                result.update(parsed.model_dump(exclude_none=True))
+                return result
+            except ValidationError as e:
+                logger.warning(f"Response does not match grading schema: {e}")
+
         # Try to parse as JSON first (new prompt format)
         try:
             # Clean up response to extract JSON
@@ -646,9 +1744,7 @@ class EnhancedGradingSystem:
                 # Extract fields from JSON
                 result["mark"] = float(parsed_json.get("mark", 0))
                 result["feedback"] = parsed_json.get("feedback", "")
-                result["max_mark"] = int(
-                    parsed_json.get("max_mark", self._extract_max_mark(assignment_spec))
-                )
+                result["max_mark"] = int(parsed_json.get("max_mark", max_mark))
                 result["strengths"] = parsed_json.get("strengths", [])
                 result["improvements"] = parsed_json.get("improvements", [])
                 result["confidence"] = float(parsed_json.get("confidence", 0.8))
@@ -662,15 +1758,15 @@ class EnhancedGradingSystem:
 
         # Fallback to legacy text parsing
         # Extract mark
-        mark_match: Optional[re.Match[str]] = re.search(
-            r"MARK[:\s]*(\d+(?:\.\d+)?)", response_text, re.IGNORECASE
+        mark_match: Optional[re.Match[str]] = _RESPONSE_MARK_PATTERN.search(
+            response_text
         )
         if mark_match:
             result["mark"] = float(mark_match.group(1))
 
         # Extract feedback
-        feedback_match: Optional[re.Match[str]] = re.search(
-            r"FEEDBACK[:\s]*(.*?)(?=\n\n|\Z)", response_text, re.IGNORECASE | re.DOTALL
+        feedback_match: Optional[re.Match[str]] = _RESPONSE_FEEDBACK_PATTERN.search(
+            response_text
         )
         if feedback_match:
             result["feedback"] = feedback_match.group(1).strip()
@@ -680,29 +1776,81 @@ class EnhancedGradingSystem:
 
         return result
 
-    def _estimate_total_cost(self, prompt: str) -> float:
+    def _parse_streamed_mark(
+        self, response_text: str, assignment_spec: str
+    ) -> dict[str, Any]:
+        """Parse a response that was cut off as soon as the mark was complete.
+
+        Args:
+            response_text: Partial response text from LLM.
+            assignment_spec: Assignment specification.
+
+        Returns:
+            Dictionary containing the mark, with empty feedback.
+
+        Raises:
+            ValueError: If the response does not contain a complete mark.
+        """
+        mark_match: Optional[re.Match[str]] = _STREAMED_MARK_PATTERN.search(
+            response_text
+        )
+        if not mark_match:
+            raise ValueError("No mark found in streamed response")
+
+        return {
+            "mark": float(mark_match.group(1)),
+            "feedback": "",
+            "max_mark": self._extract_max_mark(assignment_spec),
+            "strengths": [],
+            "improvements": [],
+            "confidence": 0.8,
+        }
+
+    def _estimate_total_cost(
+        self, prompt: str, prompt_prefix: Optional[str] = None
+    ) -> float:
         """Estimate total cost for all grading runs.
         
         Args:
             prompt: Grading prompt text.
+            prompt_prefix: Optional leading part of ``prompt`` shared by
+                every student, tokenized once per model.
             
         Returns:
             Estimated total cost.
         """
         total_cost: float = 0.0
 
-        # Rough token estimation (characters / 4)
-        input_tokens: int = len(prompt) // 4
-        output_tokens: int = 500  # Estimated output
-
         for grader in self.config.graders:
-            grader_cost: float = self.llm_provider.estimate_cost(
-                grader.provider, grader.model, input_tokens, output_tokens
+            total_cost += (
+                self._estimate_run_cost(grader, prompt, prompt_prefix)
+                * self.config.runs_per_grader
             )
-            total_cost += grader_cost * self.config.runs_per_grader
 
         return total_cost
 
+    def _estimate_run_cost(
+        self, grader: Any, prompt: str, prompt_prefix: Optional[str] = None
+    ) -> float:
+        """Estimate the cost of a single grading run.
+
+        Args:
+            grader: Grader configuration object.
+            prompt: Grading prompt text.
+            prompt_prefix: Optional leading part of ``prompt`` shared by
+                every student, tokenized once per model.
+
+        Returns:
+            Estimated cost of one run.
+        """
+        output_tokens: int = 500  # Estimated output
+        input_tokens: int = self.llm_provider.count_tokens(
+            grader.provider, grader.model, prompt, prompt_prefix
+        )
+        return self.llm_provider.estimate_cost(
+            grader.provider, grader.model, input_tokens, output_tokens
+        )
+
     def get_session_summary(self) -> dict[str, Any]:
         """Get summary of the current grading session.
         
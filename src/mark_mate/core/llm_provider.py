@@ -6,15 +6,23 @@ Supports Claude (Anthropic), OpenAI, and Gemini with consistent API.
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import os
+import re
 import time
-from datetime import datetime
-from typing import Any, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Optional, cast
+
+from ..config.settings import get_api_keys
+from .rate_limiter import AsyncTokenBucket, TokenBudget
+
+if TYPE_CHECKING:
+    from litellm import CustomStreamWrapper
 
 try:
     import litellm
-    from litellm import completion
+    from litellm import acompletion, completion
     from litellm.cost_calculator import completion_cost
 
     _litellm_available = True
@@ -22,12 +30,36 @@ except ImportError:
     _litellm_available = False
     # Define dummy functions for type checking
     litellm = None  # type: ignore[assignment]
+    acompletion = None  # type: ignore[assignment]
     completion = None  # type: ignore[assignment] 
     completion_cost = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
 
+def cacheable_content(prompt: str, prompt_prefix: str) -> list[dict[str, Any]]:
+    """Split a prompt into Anthropic content blocks with a cached prefix.
+
+    Args:
+        prompt: The full prompt text, starting with ``prompt_prefix``.
+        prompt_prefix: Leading part of the prompt to mark as cacheable.
+
+    Returns:
+        List of text content blocks.
+    """
+    blocks: list[dict[str, Any]] = [
+        {
+            "type": "text",
+            "text": prompt_prefix,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+    suffix = prompt[len(prompt_prefix) :]
+    if suffix:
+        blocks.append({"type": "text", "text": suffix})
+    return blocks
+
+
 class LLMProvider:
     """Unified LLM provider using LiteLLM for consistent API across providers."""
 
@@ -71,6 +103,13 @@ class LLMProvider:
 
         # Rate limiting tracking
         self.last_request_time: dict[str, float] = {}
+        # Requests-per-minute limits apply per model, keyed "provider:model"
+        self.rate_limiters: dict[str, AsyncTokenBucket] = {}
+        # Tokens-per-minute limits apply per model, keyed "provider:model"
+        self.token_budgets: dict[str, TokenBudget] = {}
+        # Token counts of shared prompt prefixes, keyed by model and prefix;
+        # there is one prefix per assignment, so each is tokenized once
+        self._prefix_tokens: dict[tuple[str, str], int] = {}
 
         # Validate API keys
         _ = self._validate_api_keys()
@@ -82,9 +121,7 @@ class LLMProvider:
             Dictionary mapping provider names to availability status.
         """
         providers_available = {
-            "anthropic": bool(os.getenv("ANTHROPIC_API_KEY")),
-            "openai": bool(os.getenv("OPENAI_API_KEY")),
-            "gemini": bool(os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")),
+            provider: bool(key) for provider, key in get_api_keys().items()
         }
 
         logger.info(
@@ -115,6 +152,45 @@ class LLMProvider:
 
         return self.PROVIDER_CONFIGS[provider][model_short_name]
 
+    def count_tokens(
+        self, provider: str, model: str, text: str, prefix: Optional[str] = None
+    ) -> int:
+        """Count the tokens in a text for a model.
+
+        When ``text`` starts with ``prefix`` the prefix is counted once per
+        model and only the rest of the text is tokenized on later calls.
+
+        Args:
+            provider: Provider name.
+            model: Model short name.
+            text: Text to tokenize.
+            prefix: Optional leading part of ``text`` shared by many prompts.
+
+        Returns:
+            Token count from LiteLLM's tokenizer for the model, or a rough
+            estimate (characters / 4) if the model cannot be tokenized.
+        """
+        try:
+            full_model_name = self.get_model_name(provider, model)
+            if not prefix or not text.startswith(prefix):
+                return litellm.token_counter(model=full_model_name, text=text)
+
+            key = (full_model_name, prefix)
+            prefix_tokens = self._prefix_tokens.get(key)
+            if prefix_tokens is None:
+                prefix_tokens = self._prefix_tokens[key] = litellm.token_counter(
+                    model=full_model_name, text=prefix
+                )
+            suffix = text[len(prefix) :]
+            if not suffix:
+                return prefix_tokens
+            return prefix_tokens + litellm.token_counter(
+                model=full_model_name, text=suffix
+            )
+        except Exception as e:
+            logger.debug(f"Could not count tokens for {provider} {model}: {e}")
+            return len(text) // 4
+
     def _respect_rate_limit(self, provider: str, rate_limit: Optional[int] = None) -> None:
         """Ensure rate limits are respected for the provider.
         
@@ -139,6 +215,87 @@ class LLMProvider:
 
         self.last_request_time[provider] = time.time()
 
+    async def _respect_rate_limit_async(
+        self, provider: str, model: str, rate_limit: Optional[int] = None
+    ) -> None:
+        """Async variant of ``_respect_rate_limit`` for concurrent grading.
+
+        Each provider's model gets its own ``AsyncTokenBucket``, shared by
+        every grader using that model. If those graders configure different
+        limits, the lowest one applies.
+
+        Args:
+            provider: Provider name.
+            model: Model short name.
+            rate_limit: Requests per minute limit.
+        """
+        if not rate_limit:
+            return
+
+        key = f"{provider}:{model}"
+        bucket = self.rate_limiters.get(key)
+        if bucket is None:
+            bucket = self.rate_limiters[key] = AsyncTokenBucket(rate_limit, name=key)
+        elif rate_limit < bucket.rpm:
+            bucket.rpm = rate_limit
+
+        await bucket.acquire()
+
+    def _token_budget(
+        self, provider: str, model: str, token_rate_limit: int
+    ) -> TokenBudget:
+        """Get the shared tokens-per-minute budget for a provider's model.
+
+        Args:
+            provider: Provider name.
+            model: Model short name.
+            token_rate_limit: Tokens per minute limit.
+
+        Returns:
+            Token budget shared by every grader using this model.
+        """
+        key = f"{provider}:{model}"
+        budget = self.token_budgets.get(key)
+        if budget is None:
+            budget = self.token_budgets[key] = TokenBudget(token_rate_limit, name=key)
+        elif budget.tpm != token_rate_limit:
+            budget.tpm = token_rate_limit
+        return budget
+
+    def _estimate_request_tokens(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        prompt_prefix: Optional[str] = None,
+    ) -> int:
+        """Estimate the tokens a request counts against a per-minute limit.
+
+        Providers reserve ``max_tokens`` of output up front, so it is added
+        to the input token count. The system prompt and the shared prompt
+        prefix are the same for every student and are tokenized once.
+
+        Args:
+            provider: Provider name.
+            model: Model short name.
+            prompt: The grading prompt.
+            system_prompt: Optional system prompt.
+            max_tokens: Maximum tokens in response.
+            prompt_prefix: Optional leading part of ``prompt`` shared by
+                every student.
+
+        Returns:
+            Estimated token count.
+        """
+        input_tokens = self.count_tokens(provider, model, prompt, prompt_prefix)
+        if system_prompt:
+            input_tokens += self.count_tokens(
+                provider, model, system_prompt, system_prompt
+            )
+        return input_tokens + max_tokens
+
     def grade_submission(
         self,
         provider: str,
@@ -149,6 +306,9 @@ class LLMProvider:
         max_tokens: int = 2000,
         rate_limit: Optional[int] = None,
         timeout: int = 60,
+        token_rate_limit: Optional[int] = None,
+        prompt_prefix: Optional[str] = None,
+        response_format: Optional[dict[str, Any]] = None,
     ) -> dict[str, Any]:
         """Grade a submission using the specified provider and model.
 
@@ -161,26 +321,32 @@ class LLMProvider:
             max_tokens: Maximum tokens in response.
             rate_limit: Requests per minute limit.
             timeout: Request timeout in seconds.
+            token_rate_limit: Tokens per minute limit for the model.
+            prompt_prefix: Leading part of the prompt shared by every student,
+                marked as cacheable for providers with explicit prompt caching.
+            response_format: Optional structured output format, e.g.
+                ``{"type": "json_object"}`` for JSON mode.
 
         Returns:
             Dictionary containing response, token usage, and metadata.
         """
         # Respect rate limits
         self._respect_rate_limit(provider, rate_limit)
+        if token_rate_limit:
+            delay = self._token_budget(provider, model, token_rate_limit).reserve(
+                self._estimate_request_tokens(
+                    provider, model, prompt, system_prompt, max_tokens, prompt_prefix
+                )
+            )
+            if delay > 0:
+                logger.debug(f"Token limiting {provider}: sleeping {delay:.2f}s")
+                time.sleep(delay)
 
         # Get full model name for LiteLLM
         full_model_name = self.get_model_name(provider, model)
-
-        # Prepare messages
-        messages: list[dict[str, str]] = []
-        if system_prompt and provider in ["openai", "anthropic"]:
-            messages.append({"role": "system", "content": system_prompt})
-
-        # For providers without system prompt support, prepend to user message
-        if system_prompt and provider == "gemini":
-            prompt = f"{system_prompt}\n\n{prompt}"
-
-        messages.append({"role": "user", "content": prompt})
+        messages = self._build_messages(
+            provider, prompt, system_prompt, prompt_prefix
+        )
 
         try:
             start_time = time.time()
@@ -189,68 +355,338 @@ class LLMProvider:
             if completion is None:
                 raise RuntimeError("LiteLLM completion function not available")
                 
+            extra_params: dict[str, Any] = {}
+            if response_format:
+                extra_params["response_format"] = response_format
+
             response = completion(
                 model=full_model_name,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 timeout=timeout,
+                **extra_params,
             )
 
-            end_time = time.time()
-
-            # Extract response content
-            response_content = response.choices[0].message.content
-
-            # Track token usage and cost
-            usage_info = {
-                "input_tokens": response.usage.prompt_tokens
-                if hasattr(response.usage, "prompt_tokens")
-                else response.usage.input_tokens,
-                "output_tokens": response.usage.completion_tokens
-                if hasattr(response.usage, "completion_tokens")
-                else response.usage.output_tokens,
-                "total_tokens": response.usage.total_tokens,
-                "response_time": end_time - start_time,
-            }
+            return self._build_success_result(
+                response, provider, model, full_model_name, time.time() - start_time
+            )
 
-            # Calculate cost using LiteLLM
-            try:
-                if completion_cost is not None:
-                    cost = completion_cost(completion_response=response)
-                    usage_info["cost"] = cost
-                else:
-                    usage_info["cost"] = 0.0
-            except Exception as e:
-                logger.warning(f"Could not calculate cost for {provider}: {e}")
-                usage_info["cost"] = 0.0
+        except Exception as e:
+            return self._build_error_result(e, provider, model, full_model_name)
 
-            # Update global usage tracking
-            self.token_usage[provider]["input_tokens"] += usage_info["input_tokens"]
-            self.token_usage[provider]["output_tokens"] += usage_info["output_tokens"]
-            self.token_usage[provider]["cost"] += usage_info["cost"]
-
-            return {
-                "content": response_content,
-                "usage": usage_info,
-                "provider": provider,
-                "model": model,
-                "full_model_name": full_model_name,
-                "timestamp": datetime.now().isoformat(),
-                "success": True,
-            }
+    async def grade_submission_async(
+        self,
+        provider: str,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.1,
+        max_tokens: int = 2000,
+        rate_limit: Optional[int] = None,
+        timeout: int = 60,
+        token_rate_limit: Optional[int] = None,
+        prompt_prefix: Optional[str] = None,
+        response_format: Optional[dict[str, Any]] = None,
+        stop_pattern: Optional[re.Pattern[str]] = None,
+    ) -> dict[str, Any]:
+        """Async variant of ``grade_submission`` using ``litellm.acompletion``.
+
+        Takes the same arguments and returns the same structure as
+        ``grade_submission``, but does not block the event loop while waiting
+        on the provider, so many submissions can be graded concurrently.
+
+        When ``stop_pattern`` is given the response is streamed and the
+        request is closed as soon as the text received so far matches it, so
+        the provider stops generating (and billing) the rest. ``content`` is
+        then the partial response.
+        """
+        await self._respect_rate_limit_async(provider, model, rate_limit)
+        if token_rate_limit:
+            # Tokenizing the submission is CPU work; keep it off the event loop
+            request_tokens = await asyncio.to_thread(
+                self._estimate_request_tokens,
+                provider,
+                model,
+                prompt,
+                system_prompt,
+                max_tokens,
+                prompt_prefix,
+            )
+            await self._token_budget(provider, model, token_rate_limit).acquire(
+                request_tokens
+            )
+
+        full_model_name = self.get_model_name(provider, model)
+        messages = self._build_messages(
+            provider, prompt, system_prompt, prompt_prefix
+        )
+
+        try:
+            start_time = time.time()
+
+            if acompletion is None:
+                raise RuntimeError("LiteLLM acompletion function not available")
+
+            extra_params: dict[str, Any] = {}
+            if response_format:
+                extra_params["response_format"] = response_format
+
+            if stop_pattern is not None:
+                response = await self._stream_until(
+                    stop_pattern,
+                    model=full_model_name,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout,
+                    **extra_params,
+                )
+            else:
+                response = await acompletion(
+                    model=full_model_name,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout,
+                    **extra_params,
+                )
+
+            return self._build_success_result(
+                response, provider, model, full_model_name, time.time() - start_time
+            )
 
         except Exception as e:
-            logger.error(f"Error calling {provider} {model}: {e}")
-            return {
-                "content": "",
-                "error": str(e),
-                "provider": provider,
-                "model": model,
-                "full_model_name": full_model_name,
-                "timestamp": datetime.now().isoformat(),
-                "success": False,
-            }
+            return self._build_error_result(e, provider, model, full_model_name)
+
+    async def _stream_until(
+        self, stop_pattern: re.Pattern[str], **completion_params: Any
+    ) -> Any:
+        """Stream a completion until its text matches ``stop_pattern``.
+
+        Args:
+            stop_pattern: Pattern that ends the stream once it matches.
+            **completion_params: Arguments for ``litellm.acompletion``.
+
+        Returns:
+            Completion response rebuilt from the chunks received, with usage
+            counted for the partial output. Its ``finish_reason`` is None when
+            the stream was cut off by ``stop_pattern`` rather than finished
+            by the provider.
+        """
+        stream = cast(
+            "CustomStreamWrapper",
+            await acompletion(
+                stream=True,
+                stream_options={"include_usage": True},
+                **completion_params,
+            ),
+        )
+
+        chunks: list[Any] = []
+        text: str = ""
+        stopped: bool = False
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text += chunk.choices[0].delta.content
+                    if stop_pattern.search(text):
+                        stopped = True
+                        break
+        finally:
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+
+        response = litellm.stream_chunk_builder(
+            chunks, messages=completion_params["messages"]
+        )
+        if stopped and response is not None and response.choices:
+            # The chunk builder reports "stop" even for a stream cut short
+            response.choices[0].finish_reason = None
+        return response
+
+    def _build_messages(
+        self,
+        provider: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        prompt_prefix: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Build the chat message list for a grading request.
+
+        The system prompt always comes first and the shared prompt prefix is
+        kept at the start of the user message, so the leading tokens are
+        identical across students. OpenAI and Gemini cache such prefixes
+        automatically; Anthropic needs an explicit ``cache_control`` marker.
+
+        Args:
+            provider: Provider name.
+            prompt: The grading prompt.
+            system_prompt: Optional system prompt.
+            prompt_prefix: Optional leading part of ``prompt`` to cache.
+
+        Returns:
+            List of chat messages for LiteLLM.
+        """
+        messages: list[dict[str, Any]] = []
+        if system_prompt and provider in ["openai", "anthropic"]:
+            messages.append({"role": "system", "content": system_prompt})
+
+        # For providers without system prompt support, prepend to user message
+        if system_prompt and provider == "gemini":
+            prompt = f"{system_prompt}\n\n{prompt}"
+
+        if provider == "anthropic" and prompt_prefix and prompt.startswith(
+            prompt_prefix
+        ):
+            messages.append(
+                {
+                    "role": "user",
+                    "content": cacheable_content(prompt, prompt_prefix),
+                }
+            )
+            return messages
+
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _build_success_result(
+        self,
+        response: Any,
+        provider: str,
+        model: str,
+        full_model_name: str,
+        response_time: float,
+    ) -> dict[str, Any]:
+        """Extract content and usage from a completion and update usage tracking.
+
+        Args:
+            response: LiteLLM completion response.
+            provider: Provider name.
+            model: Model short name.
+            full_model_name: Full LiteLLM model name.
+            response_time: Request duration in seconds.
+
+        Returns:
+            Dictionary containing response, token usage, and metadata.
+        """
+        # Extract response content
+        response_content = response.choices[0].message.content
+
+        # Track token usage and cost
+        usage_info = {
+            "input_tokens": response.usage.prompt_tokens
+            if hasattr(response.usage, "prompt_tokens")
+            else response.usage.input_tokens,
+            "output_tokens": response.usage.completion_tokens
+            if hasattr(response.usage, "completion_tokens")
+            else response.usage.output_tokens,
+            "total_tokens": response.usage.total_tokens,
+            "response_time": response_time,
+        }
+
+        # Calculate cost using LiteLLM
+        try:
+            if completion_cost is not None:
+                cost = completion_cost(completion_response=response)
+                usage_info["cost"] = cost
+            else:
+                usage_info["cost"] = 0.0
+        except Exception as e:
+            logger.warning(f"Could not calculate cost for {provider}: {e}")
+            usage_info["cost"] = 0.0
+
+        # Update global usage tracking
+        self.record_usage(
+            provider,
+            int(usage_info["input_tokens"]),
+            int(usage_info["output_tokens"]),
+            usage_info["cost"],
+        )
+
+        return {
+            "content": response_content,
+            "usage": usage_info,
+            "provider": provider,
+            "model": model,
+            "full_model_name": full_model_name,
+            "finish_reason": getattr(response.choices[0], "finish_reason", None),
+            "timestamp": datetime.now().isoformat(),
+            "success": True,
+        }
+
+    def _build_error_result(
+        self, error: Exception, provider: str, model: str, full_model_name: str
+    ) -> dict[str, Any]:
+        """Build the failure result for a grading request.
+
+        Args:
+            error: Exception raised by the request.
+            provider: Provider name.
+            model: Model short name.
+            full_model_name: Full LiteLLM model name.
+
+        Returns:
+            Dictionary describing the failed request.
+        """
+        logger.error(f"Error calling {provider} {model}: {error}")
+        return {
+            "content": "",
+            "error": str(error),
+            "retry_after": self._retry_after(error),
+            "provider": provider,
+            "model": model,
+            "full_model_name": full_model_name,
+            "timestamp": datetime.now().isoformat(),
+            "success": False,
+        }
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Read the ``Retry-After`` delay from a failed request, if present.
+
+        Args:
+            error: Exception raised by the request.
+
+        Returns:
+            Seconds the provider asked to wait, or None if not given.
+        """
+        headers: Any = getattr(error, "litellm_response_headers", None)
+        if headers is None:
+            headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+
+        value: Optional[str] = headers.get("retry-after") or headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        # Otherwise an HTTP date
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def record_usage(
+        self, provider: str, input_tokens: int, output_tokens: int, cost: float
+    ) -> None:
+        """Add token usage and cost to the session totals for a provider.
+
+        Args:
+            provider: Provider name.
+            input_tokens: Number of input tokens used.
+            output_tokens: Number of output tokens used.
+            cost: Cost of the request in USD.
+        """
+        self.token_usage[provider]["input_tokens"] += input_tokens
+        self.token_usage[provider]["output_tokens"] += output_tokens
+        self.token_usage[provider]["cost"] += cost
 
     def get_available_providers(self) -> list[str]:
         """Get list of providers with valid API keys.
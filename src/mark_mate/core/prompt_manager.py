@@ -8,13 +8,58 @@ from __future__ import annotations
 
 import logging
 import re
+import string
 from dataclasses import dataclass
 from typing import Any, Optional
 
+from ..utils.compat import DATACLASS_SLOTS
+
 logger = logging.getLogger(__name__)
 
+# A template parsed into (literal text, placeholder name) pairs; the name is
+# None where the template ends without a placeholder
+CompiledTemplate = tuple[tuple[str, Optional[str]], ...]
+
+_FORMATTER = string.Formatter()
+
+# A {placeholder} marker within one template line
+_PLACEHOLDER_PATTERN = re.compile(r"\{([^{}]+)\}")
+
+
+def _count_lines(text: str) -> int:
+    """Count lines like ``len(text.splitlines())`` for LF and CRLF text.
+
+    Counts newlines instead of building a list of every line, which matters
+    for large source files in a submission.
+    """
+    if not text:
+        return 0
+    return text.count("\n") + (not text.endswith("\n"))
+
+
+# Built-in prompt used when the configuration has no "default" prompt
+_FALLBACK_PROMPT: dict[str, str] = {
+    "system": "You are an expert academic grader. Provide detailed, fair, and constructive feedback.",
+    "template": """ASSIGNMENT SPECIFICATION:
+{assignment_spec}
+
+GRADING RUBRIC:
+{rubric}
+
+GRADING INSTRUCTIONS:
+1. Evaluate the submission against each criterion in the rubric
+2. Provide a mark out of {max_mark}
+3. Give specific feedback on strengths and areas for improvement
+4. Consider both technical implementation and documentation quality
+
+{output_format}
+
+STUDENT SUBMISSION (Student ID: {student_id}):
+{content_summary}""",
+}
+
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class PromptTemplate:
     """A grading prompt template with system and user components."""
 
@@ -26,6 +71,59 @@ class PromptTemplate:
 class PromptManager:
     """Manages prompt templates and placeholder substitution for grading."""
 
+    # Placeholders whose values do not depend on the individual submission
+    # (only on the assignment and its detected type), so templates that put
+    # them first get a prompt prefix that providers can cache
+    SHARED_PLACEHOLDERS: frozenset[str] = frozenset(
+        {
+            "assignment_spec",
+            "rubric",
+            "max_mark",
+            "assignment_type",
+            "additional_instructions",
+            "output_format",
+        }
+    )
+
+    # Output format for prompts that grade several students at once
+    GROUP_OUTPUT_FORMAT: str = """REQUIRED OUTPUT FORMAT:
+You MUST respond with a valid JSON object in exactly this format, with one
+entry per student in the order the students were given:
+
+{
+  "results": [
+    {
+      "student_id": "[student ID exactly as given]",
+      "mark": [numeric score out of {max_mark}],
+      "max_mark": {max_mark},
+      "feedback": "[Detailed feedback covering strengths, weaknesses, and specific improvements needed]",
+      "strengths": ["strength 1", "strength 2"],
+      "improvements": ["improvement 1", "improvement 2"],
+      "confidence": [0.0 to 1.0 indicating your confidence in this assessment]
+    }
+  ]
+}
+
+IMPORTANT:
+- Respond ONLY with valid JSON - no additional text before or after
+- Include every student exactly once
+- Ensure each mark is a number between 0 and {max_mark}"""
+
+    # Appended to the grading prompt when all runs are produced in one call
+    REFLECTION_INSTRUCTIONS: str = """SELF-REFLECTION:
+Grade the submission as instructed above. Then critically review your own
+assessment {reflections} more time(s): each time, check it against the rubric,
+correct any mistakes and re-score the submission.
+
+Instead of a single JSON object, respond with a JSON object containing all
+{runs} assessments in order, each in the format described above:
+
+{
+  "scorings": [
+    {"mark": ..., "max_mark": ..., "feedback": "...", "strengths": [...], "improvements": [...], "confidence": ...}
+  ]
+}"""
+
     prompts: dict[str, Any]
     prompt_sections: dict[str, Any]
 
@@ -38,6 +136,15 @@ class PromptManager:
         self.prompts = prompt_config.get("prompts", {})
         self.prompt_sections = prompt_config.get("prompt_sections", {})
 
+        # Shared prompt prefixes are rendered once per template and assignment
+        # and then reused for every student
+        self._prefix_templates: dict[tuple[str, bool], str] = {}
+        self._rendered_prefixes: dict[tuple[str, ...], str] = {}
+        self._rendered_output_formats: dict[tuple[str, str], str] = {}
+
+        # Parsed templates, so that grading a student only fills in values
+        self._compiled_templates: dict[str, CompiledTemplate] = {}
+
         # Ensure we have a default prompt
         if "default" not in self.prompts:
             logger.warning("No default prompt found, using built-in fallback")
@@ -46,31 +153,16 @@ class PromptManager:
         # Validate prompt structure
         self._validate_prompts()
 
+        for prompt_data in self.prompts.values():
+            self._compile_template(prompt_data["template"])
+
     def _get_fallback_prompt(self) -> dict[str, str]:
         """Provide a fallback prompt if none is configured.
         
         Returns:
-            Dictionary containing system and template for fallback prompt.
+            Copy of the built-in fallback prompt's system and template.
         """
-        return {
-            "system": "You are an expert academic grader. Provide detailed, fair, and constructive feedback.",
-            "template": """ASSIGNMENT SPECIFICATION:
-{assignment_spec}
-
-GRADING RUBRIC:
-{rubric}
-
-STUDENT SUBMISSION (Student ID: {student_id}):
-{content_summary}
-
-GRADING INSTRUCTIONS:
-1. Evaluate the submission against each criterion in the rubric
-2. Provide a mark out of {max_mark}
-3. Give specific feedback on strengths and areas for improvement
-4. Consider both technical implementation and documentation quality
-
-{output_format}""",
-        }
+        return dict(_FALLBACK_PROMPT)
 
     def _validate_prompts(self) -> None:
         """Validate prompt structure and required fields.
@@ -142,7 +234,10 @@ GRADING INSTRUCTIONS:
             assignment_type: Type of assignment for prompt selection.
 
         Returns:
-            Dictionary with 'system' and 'user' prompts ready for LLM.
+            Dictionary with 'system' and 'user' prompts ready for LLM, plus
+            'user' split in two: 'prefix', the leading part that is identical
+            for every student (assignment spec, rubric) and suitable for
+            prompt caching, and 'suffix', the part specific to this student.
         """
         # Get the appropriate template
         template = self.get_prompt_template(prompt_name, assignment_type)
@@ -152,10 +247,194 @@ GRADING INSTRUCTIONS:
             student_data, assignment_spec, rubric, max_mark, assignment_type
         )
 
-        # Substitute placeholders in template
-        user_prompt = self._substitute_placeholders(template.template, context)
+        # The shared part is rendered once per assignment and also handed to
+        # providers for prompt caching; only the rest is substituted per student
+        prefix_template = self._split_shared_prefix(template.template)
+        prefix = self._render_shared_prefix(prefix_template, context)
+        suffix = self._substitute_placeholders(
+            template.template[len(prefix_template) :], context
+        )
 
-        return {"system": template.system, "user": user_prompt}
+        return {
+            "system": template.system,
+            "user": prefix + suffix,
+            "prefix": prefix,
+            "suffix": suffix,
+        }
+
+    def build_group_grading_prompt(
+        self,
+        students: list[dict[str, Any]],
+        assignment_spec: str,
+        rubric: str,
+        max_mark: int,
+        prompt_name: str = "default",
+        assignment_type: Optional[str] = None,
+    ) -> dict[str, str]:
+        """Build one prompt that grades several students at once.
+
+        The assignment spec and rubric part of the template appears once,
+        followed by a section per student and a request for a JSON object
+        holding one result per student.
+
+        Args:
+            students: Student submission data, in the order to grade them.
+            assignment_spec: Assignment specification text.
+            rubric: Grading rubric text.
+            max_mark: Maximum possible mark.
+            prompt_name: Name of prompt template to use.
+            assignment_type: Type of assignment for prompt selection.
+
+        Returns:
+            Dictionary with 'system', 'user', 'prefix' and 'suffix' prompts
+            ready for LLM, as returned by ``build_grading_prompt``.
+        """
+        template = self.get_prompt_template(prompt_name, assignment_type)
+
+        context = self._build_prompt_context(
+            {"student_id": "", "content": {}},
+            assignment_spec,
+            rubric,
+            max_mark,
+            assignment_type,
+        )
+
+        prefix_template = self._split_shared_prefix(
+            template.template, assignment_only=True
+        )
+        if not prefix_template:
+            prefix_template = (
+                "ASSIGNMENT SPECIFICATION:\n{assignment_spec}\n\n"
+                "GRADING RUBRIC:\n{rubric}\n\n"
+            )
+        prefix = self._render_shared_prefix(prefix_template, context)
+
+        parts = [
+            prefix,
+            f"Grade each of the following {len(students)} student submissions "
+            "independently against the rubric. Do not compare students with "
+            "each other.\n",
+        ]
+        for student_data in students:
+            parts.append(
+                f"=== STUDENT {student_data.get('student_id', 'unknown')} ===\n"
+                f"{self._generate_content_summary(student_data.get('content', {}))}\n"
+            )
+
+        parts.append(
+            "GRADING INSTRUCTIONS:\n"
+            "1. Evaluate each submission against each criterion in the rubric\n"
+            f"2. Provide a mark out of {max_mark} for each student\n"
+            "3. Give specific feedback on strengths and areas for improvement\n"
+            f"{context.get('additional_instructions', '')}\n"
+        )
+        parts.append(self.GROUP_OUTPUT_FORMAT.replace("{max_mark}", str(max_mark)))
+
+        suffix = "\n" + "\n".join(parts[1:])
+        return {
+            "system": template.system,
+            "user": prefix + suffix,
+            "prefix": prefix,
+            "suffix": suffix,
+        }
+
+    def add_reflection_instructions(
+        self, prompt_data: dict[str, str], runs: int
+    ) -> dict[str, str]:
+        """Extend a grading prompt to produce several self-reflective scorings.
+
+        Args:
+            prompt_data: Prompt dictionary from ``build_grading_prompt``.
+            runs: Total number of scorings to request.
+
+        Returns:
+            New prompt dictionary; the cacheable prefix is unchanged.
+        """
+        instructions = self.REFLECTION_INSTRUCTIONS.replace(
+            "{reflections}", str(runs - 1)
+        ).replace("{runs}", str(runs))
+        extended = {**prompt_data, "user": f"{prompt_data['user']}\n\n{instructions}"}
+        if "suffix" in prompt_data:
+            extended["suffix"] = f"{prompt_data['suffix']}\n\n{instructions}"
+        return extended
+
+    def _split_shared_prefix(
+        self, template: str, assignment_only: bool = False
+    ) -> str:
+        """Get the leading lines of a template that do not depend on the student.
+
+        The template is cut at the start of the first line that contains a
+        student-specific placeholder, so the substituted prefix is the same
+        for every submission graded against the same assignment.
+
+        Args:
+            template: Template string with {placeholder} markers.
+            assignment_only: Stop after the last line holding the assignment
+                spec or rubric (and the blank lines following it), leaving
+                out single-submission instructions and output format.
+
+        Returns:
+            Leading part of the template (possibly empty).
+        """
+        cached = self._prefix_templates.get((template, assignment_only))
+        if cached is not None:
+            return cached
+
+        offset = 0
+        assignment_end = 0
+        for line in template.splitlines(keepends=True):
+            placeholders = _PLACEHOLDER_PATTERN.findall(line)
+            if any(p not in self.SHARED_PLACEHOLDERS for p in placeholders):
+                break
+            offset += len(line)
+            if "assignment_spec" in placeholders or "rubric" in placeholders:
+                assignment_end = offset
+            elif not line.strip() and assignment_end == offset - len(line):
+                assignment_end = offset
+
+        prefix = template[: assignment_end if assignment_only else offset]
+        self._prefix_templates[(template, assignment_only)] = prefix
+        return prefix
+
+    def _render_shared_prefix(
+        self, prefix_template: str, context: dict[str, str]
+    ) -> str:
+        """Substitute a shared prefix template, reusing earlier renderings.
+
+        Args:
+            prefix_template: Template prefix from ``_split_shared_prefix``.
+            context: Placeholder values for the current student.
+
+        Returns:
+            The rendered prefix.
+        """
+        key = (prefix_template,) + tuple(
+            context[name] for name in sorted(self.SHARED_PLACEHOLDERS)
+        )
+        prefix = self._rendered_prefixes.get(key)
+        if prefix is None:
+            prefix = self._substitute_placeholders(prefix_template, context)
+            self._rendered_prefixes[key] = prefix
+        return prefix
+
+    def _render_output_format(self, output_format: str, max_mark: str) -> str:
+        """Substitute {max_mark} in an output format section, once per mark.
+
+        Args:
+            output_format: Output format section in template syntax.
+            max_mark: Maximum possible mark.
+
+        Returns:
+            The rendered output format.
+        """
+        key = (output_format, max_mark)
+        rendered = self._rendered_output_formats.get(key)
+        if rendered is None:
+            rendered = self._substitute_placeholders(
+                output_format, {"max_mark": max_mark}
+            )
+            self._rendered_output_formats[key] = rendered
+        return rendered
 
     def _build_prompt_context(
         self,
@@ -192,14 +471,57 @@ GRADING INSTRUCTIONS:
             student_data.get("content", {})
         )
 
-        # Add prompt sections
+        # Add prompt sections; the output format may refer to {max_mark}
         context.update(self._get_prompt_sections(assignment_type))
+        context["output_format"] = self._render_output_format(
+            context["output_format"], context["max_mark"]
+        )
 
         # Add submission metadata
         context.update(self._get_submission_metadata(student_data))
 
         return context
 
+    def _compile_template(self, template: str) -> CompiledTemplate:
+        """Parse a template into literal text and placeholder names.
+
+        Uses ``str.format`` syntax, so ``{{`` and ``}}`` stand for literal
+        braces. Braced text that is not a valid identifier (such as a JSON
+        example) is kept as literal text.
+
+        Args:
+            template: Template string with {placeholder} markers.
+
+        Returns:
+            Parsed template, cached for later calls.
+        """
+        compiled = self._compiled_templates.get(template)
+        if compiled is not None:
+            return compiled
+
+        try:
+            parts: list[tuple[str, Optional[str]]] = []
+            literal = ""
+            for text, field, format_spec, conversion in _FORMATTER.parse(template):
+                literal += text
+                if field is None:
+                    continue
+                if field.isidentifier() and not format_spec and not conversion:
+                    parts.append((literal, field))
+                    literal = ""
+                else:
+                    conversion = f"!{conversion}" if conversion else ""
+                    format_spec = f":{format_spec}" if format_spec else ""
+                    literal += f"{{{field}{conversion}{format_spec}}}"
+            parts.append((literal, None))
+            compiled = tuple(parts)
+        except ValueError as e:
+            logger.error(f"Placeholder substitution failed: {e}")
+            compiled = ((template, None),)
+
+        self._compiled_templates[template] = compiled
+        return compiled
+
     def _substitute_placeholders(self, template: str, context: dict[str, str]) -> str:
         """Safely substitute placeholders in template.
 
@@ -208,29 +530,22 @@ GRADING INSTRUCTIONS:
             context: Dictionary of placeholder values.
 
         Returns:
-            Template with placeholders substituted.
+            Template with placeholders substituted; placeholders without a
+            value are replaced by "[name not available]".
         """
-        try:
-            # Find all placeholders in template
-            placeholders = re.findall(r"\{([^}]+)\}", template)
-
-            # Check for missing placeholders
-            missing = [p for p in placeholders if p not in context]
-            if missing:
-                logger.warning(f"Missing placeholders in template: {missing}")
-                # Add empty values for missing placeholders
-                for placeholder in missing:
-                    context[placeholder] = f"[{placeholder} not available]"
+        compiled = self._compile_template(template)
 
-            # Perform substitution
-            return template.format(**context)
+        missing = [name for _, name in compiled if name and name not in context]
+        if missing:
+            logger.warning(f"Missing placeholders in template: {missing}")
 
-        except KeyError as e:
-            logger.error(f"Placeholder substitution failed: {e}")
-            return template
-        except Exception as e:
-            logger.error(f"Unexpected error in placeholder substitution: {e}")
-            return template
+        parts: list[str] = []
+        for literal, name in compiled:
+            parts.append(literal)
+            if name is not None:
+                value = context.get(name)
+                parts.append(f"[{name} not available]" if value is None else str(value))
+        return "".join(parts)
 
     def _generate_content_summary(self, content: dict[str, Any]) -> str:
         """Generate a summary of student submission content.
@@ -246,14 +561,14 @@ GRADING INSTRUCTIONS:
         # Document content
         if "documents" in content:
             doc_count = len(content["documents"])
-            total_chars = sum(len(doc.get("text", "")) for doc in content["documents"])
+            char_counts = [len(doc.get("text", "")) for doc in content["documents"]]
             summary_parts.append(
-                f"DOCUMENTS: {doc_count} files, {total_chars:,} characters total"
+                f"DOCUMENTS: {doc_count} files, {sum(char_counts):,} characters total"
             )
 
-            for doc in content["documents"][:3]:  # Show first 3 documents
+            # Show first 3 documents
+            for doc, char_count in zip(content["documents"][:3], char_counts):
                 filename = doc.get("filename", "Unknown")
-                char_count = len(doc.get("text", ""))
                 summary_parts.append(f"  - {filename}: {char_count:,} characters")
 
             if doc_count > 3:
@@ -262,16 +577,15 @@ GRADING INSTRUCTIONS:
         # Code content
         if "code" in content:
             code_count = len(content["code"])
-            total_lines = sum(
-                len(code.get("content", "").splitlines()) for code in content["code"]
-            )
+            line_counts = [
+                _count_lines(code.get("content", "")) for code in content["code"]
+            ]
             summary_parts.append(
-                f"CODE FILES: {code_count} files, {total_lines:,} lines total"
+                f"CODE FILES: {code_count} files, {sum(line_counts):,} lines total"
             )
 
-            for code_file in content["code"][:3]:
+            for code_file, line_count in zip(content["code"][:3], line_counts):
                 filename = code_file.get("filename", "Unknown")
-                line_count = len(code_file.get("content", "").splitlines())
                 file_type = code_file.get("language", "unknown")
                 summary_parts.append(
                     f"  - {filename} ({file_type}): {line_count:,} lines"
@@ -313,13 +627,15 @@ GRADING INSTRUCTIONS:
             )
 
         # WordPress analysis
-        if any(key.startswith("wordpress_") for key in content):
+        wordpress_parts = [
+            f"  - {key.replace('wordpress_', '').replace('_', ' ').title()}: "
+            f"{len(value.get('files_found', []))} files"
+            for key, value in content.items()
+            if key.startswith("wordpress_")
+        ]
+        if wordpress_parts:
             summary_parts.append("WORDPRESS SITE ANALYSIS:")
-            for key, value in content.items():
-                if key.startswith("wordpress_"):
-                    component = key.replace("wordpress_", "").replace("_", " ").title()
-                    file_count = len(value.get("files_found", []))
-                    summary_parts.append(f"  - {component}: {file_count} files")
+            summary_parts.extend(wordpress_parts)
 
         return (
             "\n".join(summary_parts)
@@ -348,14 +664,14 @@ GRADING INSTRUCTIONS:
             sections["output_format"] = """REQUIRED OUTPUT FORMAT:
 You MUST respond with a valid JSON object in exactly this format:
 
-{
+{{
   "mark": [numeric score out of {max_mark}],
   "max_mark": {max_mark},
   "feedback": "[Detailed feedback covering strengths, weaknesses, and specific improvements needed]",
   "strengths": ["strength 1", "strength 2", "strength 3"],
   "improvements": ["improvement 1", "improvement 2", "improvement 3"],
   "confidence": [0.0 to 1.0 indicating your confidence in this assessment]
-}
+}}
 
 IMPORTANT:
 - Respond ONLY with valid JSON - no additional text before or after
@@ -437,7 +753,11 @@ IMPORTANT:
             return False
 
         # Check for common placeholders
-        template_text = template_data["template"]
+        placeholders = {
+            name
+            for _, name in self._compile_template(template_data["template"])
+            if name
+        }
         required_placeholders = [
             "assignment_spec",
             "rubric",
@@ -446,7 +766,7 @@ IMPORTANT:
         ]
 
         for placeholder in required_placeholders:
-            if f"{{{placeholder}}}" not in template_text:
+            if placeholder not in placeholders:
                 logger.warning(
                     f"Template '{template_name}' missing recommended placeholder: {{{placeholder}}}"
                 )
@@ -0,0 +1,140 @@
+"""MarkMate Request Rate Limiting.
+
+Spaces out LLM requests so that concurrent grading stays within each
+provider's requests-per-minute and tokens-per-minute limits instead of
+triggering 429 responses and the retry backoff that follows them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """Async rate limiter that hands out one request slot per interval.
+
+    Each ``acquire`` reserves the next free slot before sleeping, so
+    concurrent callers queue up behind each other instead of all waking at
+    the same time.
+    """
+
+    def __init__(self, rpm: float, name: str = "") -> None:
+        """Create a limiter.
+
+        Args:
+            rpm: Maximum number of requests per minute.
+            name: Label used in log messages.
+        """
+        self.name: str = name
+        # Set through the rpm property, which validates the value
+        self._rpm: float = 0.0
+        self._interval: float = 0.0
+        self.rpm = rpm
+        self._next: float = 0.0
+
+    @property
+    def rpm(self) -> float:
+        """Maximum number of requests per minute."""
+        return self._rpm
+
+    @rpm.setter
+    def rpm(self, value: float) -> None:
+        if value <= 0:
+            raise ValueError(f"Rate limit must be positive, got {value}")
+        self._rpm = value
+        self._interval = 60.0 / value
+
+    async def acquire(self) -> None:
+        """Wait until the next request slot is available."""
+        now = time.monotonic()
+        scheduled = max(now, self._next)
+        self._next = scheduled + self._interval
+
+        if scheduled > now:
+            delay = scheduled - now
+            logger.debug(f"Rate limiting {self.name}: sleeping {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+class TokenBudget:
+    """Sliding-window limiter for tokens per minute.
+
+    Requests are recorded as ``(start time, tokens)`` entries. A request that
+    would take the trailing 60 seconds over budget is scheduled for when
+    enough earlier entries have left the window. As with ``AsyncTokenBucket``
+    the slot is reserved before sleeping, so concurrent callers are served in
+    order.
+    """
+
+    WINDOW: float = 60.0
+
+    def __init__(self, tpm: int, name: str = "") -> None:
+        """Create a token budget.
+
+        Args:
+            tpm: Maximum number of tokens per minute.
+            name: Label used in log messages.
+        """
+        self.name: str = name
+        # Set through the tpm property, which validates the value
+        self._tpm: int = 0
+        self.tpm = tpm
+        self._entries: deque[tuple[float, int]] = deque()
+
+    @property
+    def tpm(self) -> int:
+        """Maximum number of tokens per minute."""
+        return self._tpm
+
+    @tpm.setter
+    def tpm(self, value: int) -> None:
+        if value <= 0:
+            raise ValueError(f"Token limit must be positive, got {value}")
+        self._tpm = value
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve room for a request and return how long to wait for it.
+
+        A single request larger than the whole budget waits for the window
+        to empty and is then let through.
+
+        Args:
+            tokens: Estimated tokens the request will use.
+
+        Returns:
+            Delay in seconds before the request may be sent.
+        """
+        now = time.monotonic()
+        entries = self._entries
+        while entries and entries[0][0] <= now - self.WINDOW:
+            entries.popleft()
+
+        scheduled = max(now, entries[-1][0]) if entries else now
+        in_window = sum(used for _, used in entries)
+        for started, used in entries:
+            if in_window + tokens <= self._tpm:
+                break
+            # Wait for this entry to leave the window
+            in_window -= used
+            scheduled = max(scheduled, started + self.WINDOW)
+
+        entries.append((scheduled, tokens))
+        return scheduled - now
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until ``tokens`` fit within the per-minute budget.
+
+        Args:
+            tokens: Estimated tokens the request will use.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logger.debug(
+                f"Token limiting {self.name}: sleeping {delay:.2f}s for {tokens} tokens"
+            )
+            await asyncio.sleep(delay)
@@ -0,0 +1,72 @@
+"""MarkMate Grading Response Schema.
+
+Pydantic model of a single grader response, used both to validate responses
+and to build a strict JSON schema for providers that support structured
+output (OpenAI ``json_schema``, and Anthropic/Gemini through LiteLLM).
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+RESPONSE_SCHEMA_NAME: str = "grading_response"
+
+
+class GradingResponse(BaseModel):
+    """Grading result returned by an LLM for one submission."""
+
+    mark: float = Field(default=0, description="Mark awarded")
+    max_mark: Optional[int] = Field(default=None, description="Maximum possible mark")
+    feedback: str = Field(default="", description="Detailed feedback")
+    strengths: list[str] = Field(default_factory=list, description="Key strengths")
+    improvements: list[str] = Field(
+        default_factory=list, description="Suggested improvements"
+    )
+    confidence: float = Field(default=0.8, description="Confidence from 0 to 1")
+
+
+# Generated once per maximum mark; every student graded against the same
+# assignment shares one schema
+_SCHEMA_CACHE: dict[int, dict[str, Any]] = {}
+
+
+def build_response_schema(max_mark: int) -> dict[str, Any]:
+    """Build a strict ``response_format`` for grading responses.
+
+    Args:
+        max_mark: Maximum possible mark for the assignment.
+
+    Returns:
+        ``response_format`` value with a JSON schema requiring every field of
+        ``GradingResponse``. The dictionary is shared between callers and
+        must not be modified.
+    """
+    cached = _SCHEMA_CACHE.get(max_mark)
+    if cached is not None:
+        return cached
+
+    schema: dict[str, Any] = copy.deepcopy(GradingResponse.model_json_schema())
+    schema.pop("title", None)
+    properties: dict[str, Any] = schema["properties"]
+    for prop in properties.values():
+        # Strict structured output rejects defaults and titles
+        prop.pop("default", None)
+        prop.pop("title", None)
+    properties["mark"].update(minimum=0, maximum=max_mark)
+    properties["confidence"].update(minimum=0, maximum=1)
+    properties["max_mark"] = {
+        "type": "integer",
+        "description": properties["max_mark"].get("description", ""),
+    }
+    schema["required"] = list(properties)
+    schema["additionalProperties"] = False
+
+    response_format: dict[str, Any] = {
+        "type": "json_schema",
+        "json_schema": {"name": RESPONSE_SCHEMA_NAME, "strict": True, "schema": schema},
+    }
+    _SCHEMA_CACHE[max_mark] = response_format
+    return response_format
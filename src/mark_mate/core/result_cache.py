@@ -0,0 +1,138 @@
+"""MarkMate Grading Result Cache.
+
+Persists grader results on disk so that re-running a grading session (after a
+crash, with different ``--max-students``, or after adding a grader) does not
+pay again for submissions that were already graded with the same prompt and
+grader settings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME: str = "grading_results.sqlite3"
+
+
+def default_cache_dir() -> Path:
+    """Get the default cache directory, honouring ``XDG_CACHE_HOME``.
+
+    Returns:
+        Path to the MarkMate cache directory.
+    """
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "mark_mate"
+
+
+class ResultCache:
+    """Exact-match cache of grader results stored in SQLite."""
+
+    def __init__(
+        self, cache_dir: Optional[str] = None, filename: str = CACHE_FILENAME
+    ) -> None:
+        """Open (or create) the cache database.
+
+        Args:
+            cache_dir: Directory holding the cache database. Defaults to
+                ``default_cache_dir()``.
+            filename: Name of the database file within ``cache_dir``.
+        """
+        directory = Path(cache_dir) if cache_dir else default_cache_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path: Path = directory / filename
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, result_json TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a cache key from JSON-serializable parts.
+
+        Args:
+            *parts: Values that together identify a grading request.
+
+        Returns:
+            Hex SHA-256 digest of the canonical JSON encoding of ``parts``.
+        """
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Look up a cached result.
+
+        Args:
+            key: Cache key from ``make_key``.
+
+        Returns:
+            The cached result, or None on a miss.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result_json FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, result: dict[str, Any]) -> None:
+        """Store a result, replacing any previous entry for the key.
+
+        Args:
+            key: Cache key from ``make_key``.
+            result: JSON-serializable result to store.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, result_json, ts) VALUES (?, ?, ?)",
+                (key, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+            self._connection.commit()
+
+    def set_many(self, items: Iterable[tuple[str, dict[str, Any]]]) -> None:
+        """Store several results in a single transaction.
+
+        Args:
+            items: ``(key, result)`` pairs, as for ``set``.
+        """
+        now = time.time()
+        rows = [
+            (key, json.dumps(result, ensure_ascii=False), now) for key, result in items
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO cache (key, result_json, ts) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
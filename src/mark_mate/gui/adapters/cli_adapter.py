@@ -6,33 +6,146 @@ allowing the GUI to reuse all the core business logic while providing a better u
 """
 
 import asyncio
+import functools
+import importlib
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import ModuleType, SimpleNamespace
 from typing import Any, Callable, Dict, Optional
 from pathlib import Path
 
-from ...cli import consolidate, scan, extract, grade, generate_config
-
 logger = logging.getLogger(__name__)
 
 
+def _load_cli(name: str) -> ModuleType:
+    """Import a CLI command module on first use.
+
+    Importing every command up front would load LiteLLM, YAML and the
+    extractors before the user has picked an operation; ``import_module``
+    returns the cached module on later calls.
+    """
+    return importlib.import_module(f"...cli.{name}", __package__)
+
+
+def _run_cli(name: str, args: Any) -> Any:
+    """Import a CLI command and run its ``main``; called on a worker thread."""
+    return _load_cli(name).main(args)
+
+
 class ProgressCallback:
     """Callback interface for reporting progress from CLI operations."""
-    
+
     def __init__(self, update_fn: Callable[[str, float], None]):
         self.update_fn = update_fn
-    
+
     def update(self, message: str, progress: float):
         """Update progress with message and percentage (0.0 to 1.0)."""
         self.update_fn(message, progress)
 
 
+class ThrottledProgress:
+    """Coalesce progress updates to at most one per interval.
+
+    Updates arriving faster than ``min_interval`` are held back and only the
+    latest is delivered when the interval ends. Start (0%) and finish (100%)
+    updates are always delivered at once. Must be called from the event loop
+    thread.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[str, Optional[float]], None],
+        min_interval: float = 0.1,
+    ):
+        self._callback = callback
+        self.min_interval = min_interval
+        self._last_time = float("-inf")
+        self._pending: Optional[tuple[str, Optional[float]]] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __call__(self, message: str, progress: Optional[float]):
+        elapsed = time.monotonic() - self._last_time
+        if progress in (0.0, 100.0) or elapsed >= self.min_interval:
+            self._fire(message, progress)
+            return
+
+        self._pending = (message, progress)
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(
+                self.min_interval - elapsed, self._flush
+            )
+
+    def _flush(self):
+        self._handle = None
+        if self._pending is not None:
+            self._fire(*self._pending)
+
+    def _fire(self, message: str, progress: Optional[float]):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._pending = None
+        self._last_time = time.monotonic()
+        self._callback(message, progress)
+
+
 class CLIAdapter:
-    """Adapter class to run CLI commands from the GUI with progress reporting."""
-    
-    def __init__(self):
+    """Adapter class to run CLI commands from the GUI with progress reporting.
+
+    The ``*_async`` methods must be awaited from the GUI's running event
+    loop; they use ``asyncio.get_running_loop()`` and never create a loop.
+    """
+
+    def __init__(self, max_workers: int = 4):
         self.current_operation: Optional[str] = None
         self.is_running = False
-    
+        self._task: Optional[asyncio.Task[Any]] = None
+        # Each operation gets its own event, checked by the CLI commands
+        # between students, so starting a new operation cannot un-cancel a
+        # worker thread that is still winding down
+        self._stop_event = threading.Event()
+        # CLI commands are long-running and few at a time, so they share one
+        # small pool instead of the event loop's default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="markmate-cli"
+        )
+        # Progress callbacks may repaint the UI; a single worker runs them in
+        # order without holding up the event loop
+        self._progress_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="markmate-progress"
+        )
+
+    def _emit(
+        self,
+        callback: Callable[[str, Optional[float]], None],
+        message: str,
+        progress: Optional[float],
+    ):
+        """Run a progress callback on the progress thread."""
+        self._progress_executor.submit(callback, message, progress)
+
+    async def _drain_progress(self):
+        """Wait until every queued progress update has been delivered.
+
+        Keeps a late update from overwriting what the caller shows once the
+        operation has returned.
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            self._progress_executor, lambda: None
+        )
+
+    def _progress(
+        self, callback: Optional[Callable[[str, Optional[float]], None]]
+    ) -> Optional[Callable[[str, Optional[float]], None]]:
+        """Wrap a progress callback so it is throttled and run off the loop."""
+        if not callback:
+            return None
+        return ThrottledProgress(functools.partial(self._emit, callback))
+
     async def consolidate_async(
         self, 
         folder_path: str,
@@ -44,7 +157,7 @@ class CLIAdapter:
     ) -> Dict[str, Any]:
         """
         Run consolidate command asynchronously.
-        
+
         Args:
             folder_path: Path to submissions folder
             output_dir: Output directory for processed submissions
@@ -52,60 +165,68 @@ class CLIAdapter:
             wordpress: Enable WordPress processing
             keep_mac_files: Keep Mac system files
             progress_callback: Progress reporting callback
-            
+
         Returns:
             Dictionary with results and statistics
         """
         self.current_operation = "consolidate"
         self.is_running = True
-        
+        self._task = asyncio.current_task()
+        self._stop_event = stop_event = threading.Event()
+        progress_callback = self._progress(progress_callback)
+
         try:
+            loop = asyncio.get_running_loop()
+
             if progress_callback:
                 progress_callback("Starting consolidation...", 10.0)
-            
+
             # Create mock args object for CLI function
-            class MockArgs:
-                def __init__(self):
-                    self.folder_path = folder_path
-                    self.output_dir = output_dir
-                    self.no_zip = no_zip
-                    self.wordpress = wordpress
-                    self.keep_mac_files = keep_mac_files
-            
-            args = MockArgs()
-            
+            args = SimpleNamespace(
+                folder_path=folder_path,
+                output_dir=output_dir,
+                no_zip=no_zip,
+                wordpress=wordpress,
+                keep_mac_files=keep_mac_files,
+                stop_event=stop_event,
+            )
+
             if progress_callback:
                 progress_callback("Processing submissions...", 50.0)
-            
+
             # Run the consolidate command in a thread pool to avoid blocking
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, consolidate.main, args
+            result = await loop.run_in_executor(
+                self._executor, _run_cli, "consolidate", args
             )
-            
+
             if progress_callback:
                 progress_callback("Consolidation complete!", 100.0)
-            
+
             return {
                 "success": True,
                 "result": result,
                 "message": "Consolidation completed successfully",
             }
-            
+
         except Exception as e:
-            logger.error(f"Consolidate operation failed: {e}")
+            err = str(e)
+            logger.exception(f"Consolidate operation failed: {err}")
             if progress_callback:
-                progress_callback(f"Error: {str(e)}", 0.0)
-            
+                progress_callback(f"Error: {err}", 0.0)
+
             return {
                 "success": False,
-                "error": str(e),
-                "message": f"Consolidation failed: {str(e)}",
+                "error": err,
+                "error_type": type(e).__name__,
+                "message": f"Consolidation failed: {err}",
             }
-        
+
         finally:
+            await self._drain_progress()
             self.is_running = False
             self.current_operation = None
-    
+            self._task = None
+
     async def scan_async(
         self,
         submissions_folder: str,
@@ -115,58 +236,64 @@ class CLIAdapter:
     ) -> Dict[str, Any]:
         """
         Run scan command asynchronously.
-        
+
         Args:
             submissions_folder: Path to submissions folder
             output: Output file for GitHub URLs
             encoding: Text encoding to use
             progress_callback: Progress reporting callback
-            
+
         Returns:
             Dictionary with results and statistics
         """
         self.current_operation = "scan"
         self.is_running = True
-        
+        self._task = asyncio.current_task()
+        self._stop_event = threading.Event()
+        progress_callback = self._progress(progress_callback)
+
         try:
+            loop = asyncio.get_running_loop()
+
             if progress_callback:
                 progress_callback("Starting URL scan...", 10.0)
-            
-            class MockArgs:
-                def __init__(self):
-                    self.submissions_folder = submissions_folder
-                    self.output = output
-                    self.encoding = encoding
-            
-            args = MockArgs()
-            
+
+            args = SimpleNamespace(
+                submissions_folder=submissions_folder,
+                output=output,
+                encoding=encoding,
+                cache_dir=None,
+                no_cache=False,
+            )
+
             if progress_callback:
                 progress_callback("Scanning for GitHub URLs...", 50.0)
-            
+
             # Import scan function and run it
             from ...cli.scan import scan_submissions_folder, write_url_mapping
-            
-            # Run the actual scan
-            student_urls = await asyncio.get_event_loop().run_in_executor(
-                None, scan_submissions_folder, submissions_folder, encoding
-            )
-            
-            if progress_callback:
-                progress_callback("Writing results...", 80.0)
-            
-            # Write the mapping file
-            await asyncio.get_event_loop().run_in_executor(
-                None, write_url_mapping, student_urls, output
-            )
-            
+
+            def scan_and_write():
+                # Scan and write back-to-back on one worker thread
+                urls = scan_submissions_folder(
+                    submissions_folder, encoding, use_cache=True
+                )
+                if progress_callback:
+                    loop.call_soon_threadsafe(
+                        progress_callback, "Writing results...", 80.0
+                    )
+                write_url_mapping(urls, output)
+                return urls
+
+            student_urls = await loop.run_in_executor(self._executor, scan_and_write)
+
             if progress_callback:
                 progress_callback("Scan complete!", 100.0)
-            
+
             # Calculate statistics
             total_students = len(student_urls)
-            students_with_urls = len([s for s, urls in student_urls.items() if urls])
+            students_with_urls = sum(1 for urls in student_urls.values() if urls)
             total_urls = sum(len(urls) for urls in student_urls.values())
-            
+
             return {
                 "success": True,
                 "urls_found": total_urls,
@@ -176,22 +303,26 @@ class CLIAdapter:
                 "output_file": output,
                 "message": f"Found {total_urls} URLs for {students_with_urls}/{total_students} students",
             }
-            
+
         except Exception as e:
-            logger.error(f"Scan operation failed: {e}")
+            err = str(e)
+            logger.exception(f"Scan operation failed: {err}")
             if progress_callback:
-                progress_callback(f"Error: {str(e)}", 0.0)
-            
+                progress_callback(f"Error: {err}", 0.0)
+
             return {
                 "success": False,
-                "error": str(e),
-                "message": f"Scan failed: {str(e)}",
+                "error": err,
+                "error_type": type(e).__name__,
+                "message": f"Scan failed: {err}",
             }
-        
+
         finally:
+            await self._drain_progress()
             self.is_running = False
             self.current_operation = None
-    
+            self._task = None
+
     async def extract_async(
         self,
         submissions_folder: str,
@@ -201,10 +332,11 @@ class CLIAdapter:
         dry_run: bool = False,
         max_students: Optional[int] = None,
         progress_callback: Optional[Callable[[str, Optional[float]], None]] = None,
+        no_cache: bool = False,
     ) -> Dict[str, Any]:
         """
         Run extract command asynchronously.
-        
+
         Args:
             submissions_folder: Path to submissions folder
             output: Output JSON file
@@ -212,60 +344,71 @@ class CLIAdapter:
             github_urls: GitHub URL mapping file
             dry_run: Preview without extraction
             max_students: Limit number of students
+            no_cache: Re-extract every submission instead of reusing cached results
             progress_callback: Progress reporting callback
-            
+
         Returns:
             Dictionary with results and statistics
         """
         self.current_operation = "extract"
         self.is_running = True
-        
+        self._task = asyncio.current_task()
+        self._stop_event = stop_event = threading.Event()
+        progress_callback = self._progress(progress_callback)
+
         try:
+            loop = asyncio.get_running_loop()
+
             if progress_callback:
                 progress_callback("Starting content extraction...", 10.0)
-            
-            class MockArgs:
-                def __init__(self):
-                    self.submissions_folder = submissions_folder
-                    self.output = output
-                    self.wordpress = wordpress
-                    self.github_urls = github_urls
-                    self.dry_run = dry_run
-                    self.max_students = max_students
-            
-            args = MockArgs()
-            
+
+            args = SimpleNamespace(
+                submissions_folder=submissions_folder,
+                output=output,
+                wordpress=wordpress,
+                github_urls=github_urls,
+                dry_run=dry_run,
+                max_students=max_students,
+                cache_dir=None,
+                no_cache=no_cache,
+                stop_event=stop_event,
+            )
+
             if progress_callback:
                 progress_callback("Extracting content...", 50.0)
-            
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, extract.main, args
+
+            result = await loop.run_in_executor(
+                self._executor, _run_cli, "extract", args
             )
-            
+
             if progress_callback:
                 progress_callback("Extraction complete!", 100.0)
-            
+
             return {
                 "success": True,
                 "result": result,
                 "message": "Content extraction completed successfully",
             }
-            
+
         except Exception as e:
-            logger.error(f"Extract operation failed: {e}")
+            err = str(e)
+            logger.exception(f"Extract operation failed: {err}")
             if progress_callback:
-                progress_callback(f"Error: {str(e)}", 0.0)
-            
+                progress_callback(f"Error: {err}", 0.0)
+
             return {
                 "success": False,
-                "error": str(e),
-                "message": f"Extraction failed: {str(e)}",
+                "error": err,
+                "error_type": type(e).__name__,
+                "message": f"Extraction failed: {err}",
             }
-        
+
         finally:
+            await self._drain_progress()
             self.is_running = False
             self.current_operation = None
-    
+            self._task = None
+
     async def grade_async(
         self,
         extracted_content: str,
@@ -276,10 +419,14 @@ class CLIAdapter:
         dry_run: bool = False,
         config: Optional[str] = None,
         progress_callback: Optional[Callable[[str, Optional[float]], None]] = None,
+        max_concurrency: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Run grade command asynchronously.
-        
+
+        Students are graded concurrently on the calling event loop, so
+        cancelling the operation also cancels in-flight LLM requests.
+
         Args:
             extracted_content: Path to extracted content JSON
             assignment_spec: Path to assignment specification
@@ -289,60 +436,82 @@ class CLIAdapter:
             dry_run: Preview without API calls
             config: Path to grading configuration
             progress_callback: Progress reporting callback
-            
+            max_concurrency: Maximum number of students graded at the same
+                time (default: the grade command's default)
+
         Returns:
             Dictionary with results and statistics
         """
         self.current_operation = "grade"
         self.is_running = True
-        
+        self._task = asyncio.current_task()
+        self._stop_event = stop_event = threading.Event()
+        progress_callback = self._progress(progress_callback)
+
         try:
+            loop = asyncio.get_running_loop()
+
             if progress_callback:
                 progress_callback("Starting grading process...", 10.0)
-            
-            class MockArgs:
-                def __init__(self):
-                    self.extracted_content = extracted_content
-                    self.assignment_spec = assignment_spec
-                    self.output = output
-                    self.rubric = rubric
-                    self.max_students = max_students
-                    self.dry_run = dry_run
-                    self.config = config
-            
-            args = MockArgs()
-            
+
+            # Importing grade loads LiteLLM, so keep it off the event loop
+            grade = await loop.run_in_executor(
+                self._executor, _load_cli, "grade"
+            )
+
+            args = SimpleNamespace(
+                extracted_content=extracted_content,
+                assignment_spec=assignment_spec,
+                output=output,
+                rubric=rubric,
+                max_students=max_students,
+                dry_run=dry_run,
+                config=config,
+                max_concurrency=max_concurrency or grade.DEFAULT_MAX_CONCURRENCY,
+                override_rpm=None,
+                batch_api=False,
+                students_per_prompt=1,
+                json_mode=False,
+                cache_dir=None,
+                no_cache=False,
+                resume=False,
+                stop_event=stop_event,
+            )
+
             if progress_callback:
                 progress_callback("Running AI grading...", 50.0)
-            
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, grade.main, args
-            )
-            
+
+            # Grading is I/O-bound and already async, so run it on this loop
+            result = await grade.main_async(args)
+
             if progress_callback:
                 progress_callback("Grading complete!", 100.0)
-            
+
             return {
                 "success": True,
                 "result": result,
                 "message": "Grading completed successfully",
             }
-            
+
         except Exception as e:
-            logger.error(f"Grade operation failed: {e}")
+            err = str(e)
+            logger.exception(f"Grade operation failed: {err}")
             if progress_callback:
-                progress_callback(f"Error: {str(e)}", 0.0)
-            
+                progress_callback(f"Error: {err}", 0.0)
+
             return {
                 "success": False,
-                "error": str(e),
-                "message": f"Grading failed: {str(e)}",
+                "error": err,
+                "error_type": type(e).__name__,
+                "message": f"Grading failed: {err}",
             }
-        
+
         finally:
+            await self._drain_progress()
             self.is_running = False
             self.current_operation = None
-    
+            self._task = None
+
     async def generate_config_async(
         self,
         output: str = "grading_config.yaml",
@@ -353,65 +522,307 @@ class CLIAdapter:
     ) -> Dict[str, Any]:
         """
         Run generate-config command asynchronously.
-        
+
         Args:
             output: Output YAML file path
             template: Configuration template type
             provider: Single provider for single-provider template
             force: Overwrite existing file
             progress_callback: Progress reporting callback
-            
+
         Returns:
             Dictionary with results and statistics
         """
         self.current_operation = "generate_config"
         self.is_running = True
-        
+        self._task = asyncio.current_task()
+        self._stop_event = threading.Event()
+        progress_callback = self._progress(progress_callback)
+
         try:
+            loop = asyncio.get_running_loop()
+
             if progress_callback:
                 progress_callback("Generating configuration...", 50.0)
-            
-            class MockArgs:
-                def __init__(self):
-                    self.output = output
-                    self.template = template
-                    self.provider = provider
-                    self.force = force
-            
-            args = MockArgs()
-            
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, generate_config.main, args
+
+            args = SimpleNamespace(
+                output=output,
+                template=template,
+                provider=provider,
+                force=force,
             )
-            
+
+            result = await loop.run_in_executor(
+                self._executor, _run_cli, "generate_config", args
+            )
+
             if progress_callback:
                 progress_callback("Configuration generated!", 100.0)
-            
+
             return {
                 "success": True,
                 "result": result,
                 "message": "Configuration generated successfully",
             }
-            
+
         except Exception as e:
-            logger.error(f"Generate config operation failed: {e}")
+            err = str(e)
+            logger.exception(f"Generate config operation failed: {err}")
             if progress_callback:
-                progress_callback(f"Error: {str(e)}", 0.0)
-            
+                progress_callback(f"Error: {err}", 0.0)
+
             return {
                 "success": False,
-                "error": str(e),
-                "message": f"Configuration generation failed: {str(e)}",
+                "error": err,
+                "error_type": type(e).__name__,
+                "message": f"Configuration generation failed: {err}",
             }
-        
+
         finally:
+            await self._drain_progress()
             self.is_running = False
             self.current_operation = None
-    
+            self._task = None
+
+    async def run_pipeline(
+        self,
+        folder_path: str,
+        output_dir: str = "processed_submissions",
+        github_urls_output: str = "github_urls.txt",
+        extract_output: str = "extracted_content.json",
+        wordpress: bool = False,
+        no_zip: bool = False,
+        keep_mac_files: bool = False,
+        encoding: str = "utf-8",
+        analyze_github: bool = False,
+        no_cache: bool = False,
+        progress_callback: Optional[Callable[[str, Optional[float]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run consolidate, scan and extract as one pipeline.
+
+        Each student moves to the next stage as soon as the previous stage
+        has finished with them, so scanning and extraction overlap with
+        consolidation of the remaining students. A stage that fails stops
+        the others before their next student.
+
+        Args:
+            folder_path: Path to raw submissions folder
+            output_dir: Output directory for processed submissions
+            github_urls_output: Output file for GitHub URL mappings
+            extract_output: Output JSON file for extracted content
+            wordpress: Enable WordPress processing
+            no_zip: Whether to discard zip files
+            keep_mac_files: Keep Mac system files
+            encoding: Text encoding used when scanning for URLs
+            analyze_github: Analyze each student's first GitHub repository
+                during extraction, like ``extract --github-urls``
+            no_cache: Re-extract every submission instead of reusing cached results
+            progress_callback: Progress reporting callback
+
+        Returns:
+            Dictionary with results and statistics
+        """
+        self.current_operation = "pipeline"
+        self.is_running = True
+        self._task = asyncio.current_task()
+        self._stop_event = stop_event = threading.Event()
+        progress_callback = self._progress(progress_callback)
+        result_cache = None
+
+        try:
+            loop = asyncio.get_running_loop()
+
+            if progress_callback:
+                progress_callback("Grouping submissions...", 0.0)
+
+            from ...cli import consolidate, extract, scan
+            from ...core.result_cache import ResultCache
+
+            if not os.path.isdir(folder_path):
+                raise FileNotFoundError(f"Input folder does not exist: {folder_path}")
+            os.makedirs(output_dir, exist_ok=True)
+            student_files, _unmatched = await loop.run_in_executor(
+                self._executor, consolidate.group_student_files, folder_path
+            )
+            total = len(student_files)
+
+            if not no_cache:
+                result_cache = await loop.run_in_executor(
+                    self._executor,
+                    functools.partial(
+                        ResultCache, filename=extract.EXTRACT_CACHE_FILENAME
+                    ),
+                )
+            new_cache_entries: list[tuple[str, Dict[str, Any]]] = []
+
+            # Stages hand students on through unbounded queues; None marks the end
+            consolidated: asyncio.Queue[Optional[tuple[str, str]]] = asyncio.Queue()
+            scanned: asyncio.Queue[Optional[tuple[str, str, Optional[str]]]] = (
+                asyncio.Queue()
+            )
+            student_urls: Dict[str, list[str]] = {}
+            students: Dict[str, Any] = {}
+
+            async def run_stage(stage: Callable[[], Any]) -> None:
+                try:
+                    await stage()
+                except BaseException:
+                    # Stop the other stages before their next student
+                    stop_event.set()
+                    raise
+
+            async def consolidate_worker():
+                try:
+                    for student_id, files in sorted(student_files.items()):
+                        if stop_event.is_set():
+                            break
+                        path = await loop.run_in_executor(
+                            self._executor,
+                            functools.partial(
+                                consolidate.consolidate_student,
+                                files,
+                                student_id,
+                                output_dir,
+                                wordpress=wordpress,
+                                no_zip=no_zip,
+                                keep_mac_files=keep_mac_files,
+                            ),
+                        )
+                        await consolidated.put((student_id, path))
+                finally:
+                    await consolidated.put(None)
+
+            async def scan_worker():
+                try:
+                    while (item := await consolidated.get()) is not None:
+                        if stop_event.is_set():
+                            break
+                        student_id, path = item
+                        urls = await loop.run_in_executor(
+                            self._executor, scan.scan_submission, path, encoding
+                        )
+                        student_urls[student_id] = urls
+                        github_url = urls[0] if urls and analyze_github else None
+                        await scanned.put((student_id, path, github_url))
+                finally:
+                    await scanned.put(None)
+
+            async def extract_worker():
+                while (item := await scanned.get()) is not None:
+                    if stop_event.is_set():
+                        break
+                    student_id, path, github_url = item
+                    students[student_id] = await loop.run_in_executor(
+                        self._executor,
+                        functools.partial(
+                            extract.extract_submission_cached,
+                            path,
+                            student_id,
+                            result_cache,
+                            new_cache_entries,
+                            wordpress=wordpress,
+                            github_url=github_url,
+                        ),
+                    )
+                    if progress_callback:
+                        progress_callback(
+                            f"Processed {len(students)}/{total} students",
+                            90.0 * len(students) / total,
+                        )
+
+            # Let every stage wind down before reporting the failure
+            outcomes = await asyncio.gather(
+                run_stage(consolidate_worker),
+                run_stage(scan_worker),
+                run_stage(extract_worker),
+                return_exceptions=True,
+            )
+            if result_cache and new_cache_entries:
+                await loop.run_in_executor(
+                    self._executor, result_cache.set_many, new_cache_entries
+                )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+
+            if stop_event.is_set():
+                raise RuntimeError(
+                    f"Cancelled after {len(students)}/{total} students"
+                )
+
+            if progress_callback:
+                progress_callback("Writing results...", 95.0)
+
+            extracted_content = {
+                "extraction_session": {
+                    "timestamp": datetime.now().isoformat(),
+                    "total_students": len(students),
+                    "wordpress_mode": wordpress,
+                    "github_analysis": analyze_github,
+                    "submissions_folder": output_dir,
+                },
+                "students": students,
+            }
+
+            def write_results():
+                scan.write_url_mapping(student_urls, github_urls_output)
+                extract.save_extracted_content(extracted_content, extract_output)
+
+            await loop.run_in_executor(self._executor, write_results)
+
+            if progress_callback:
+                progress_callback("Pipeline complete!", 100.0)
+
+            students_with_urls = sum(1 for urls in student_urls.values() if urls)
+            return {
+                "success": True,
+                "students_processed": len(students),
+                "students_with_urls": students_with_urls,
+                "output_dir": output_dir,
+                "github_urls_file": github_urls_output,
+                "output_file": extract_output,
+                "message": f"Processed {len(students)} students; found URLs for {students_with_urls}",
+            }
+
+        except Exception as e:
+            err = str(e)
+            logger.exception(f"Pipeline operation failed: {err}")
+            if progress_callback:
+                progress_callback(f"Error: {err}", 0.0)
+
+            return {
+                "success": False,
+                "error": err,
+                "error_type": type(e).__name__,
+                "message": f"Pipeline failed: {err}",
+            }
+
+        finally:
+            if result_cache:
+                result_cache.close()
+            await self._drain_progress()
+            self.is_running = False
+            self.current_operation = None
+            self._task = None
+
+    async def aclose(self):
+        """Release the worker threads; call when the GUI shuts down."""
+        self._executor.shutdown(wait=False)
+        self._progress_executor.shutdown(wait=False)
+
     def cancel_operation(self):
-        """Cancel the current operation if possible."""
+        """Cancel the current operation if possible.
+
+        Cancels the task awaiting the operation so that the GUI is released at
+        once, and asks consolidate, extract and grade to stop before their next
+        student. Other commands finish in the background.
+        """
         if self.is_running:
             logger.info(f"Canceling operation: {self.current_operation}")
-            # Note: This is a simple flag - more sophisticated cancellation
-            # would require modifying the CLI functions to check for cancellation
+            self._stop_event.set()
+            task = self._task
+            if task is not None and not task.done():
+                # Safe from any thread; Task.cancel must run on the task's loop
+                task.get_loop().call_soon_threadsafe(task.cancel)
             self.is_running = False
\ No newline at end of file
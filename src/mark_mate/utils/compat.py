@@ -0,0 +1,31 @@
+"""Compatibility helpers for the supported Python versions."""
+
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+# Keyword arguments for ``@dataclass`` that give instances ``__slots__`` instead
+# of a per-instance ``__dict__``; ``slots=True`` needs Python 3.10+
+DATACLASS_SLOTS: dict[str, Any] = (
+    {"slots": True} if sys.version_info >= (3, 10) else {}
+)
+
+
+def safe_yaml_load(stream: Any) -> Any:
+    """Parse YAML with PyYAML's safe loader.
+
+    Uses the libyaml-backed ``CSafeLoader`` when PyYAML was built with it.
+    PyYAML is imported on first use so that callers which never read YAML
+    do not load it.
+
+    Args:
+        stream: YAML text or an open file.
+
+    Returns:
+        The parsed document.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(stream, Loader=loader)  # noqa: S506 - always a safe loader
@@ -0,0 +1,80 @@
+"""Fast JSON helpers.
+
+Uses orjson when it is installed (``pip install mark-mate[performance]``) and
+falls back to the standard library ``json`` module otherwise. Output is always
+UTF-8 with non-ASCII characters kept as-is, matching ``ensure_ascii=False``.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document.
+
+    Args:
+        data: JSON text as bytes or str.
+
+    Returns:
+        The decoded Python object.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize an object to a JSON string.
+
+    Args:
+        obj: Object to serialize.
+        indent: Pretty-print with two-space indentation.
+
+    Returns:
+        JSON text.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Serialize an object to one newline-terminated JSON Lines record.
+
+    Returns bytes so that records can be appended to a file opened in binary
+    mode without decoding and re-encoding orjson's output.
+
+    Args:
+        obj: Object to serialize.
+
+    Returns:
+        UTF-8 encoded compact JSON followed by a newline.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def load_file(path: str) -> Any:
+    """Read and parse a JSON file.
+
+    Args:
+        path: Path to the JSON file.
+
+    Returns:
+        The decoded Python object.
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
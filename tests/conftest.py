@@ -0,0 +1,18 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+from mark_mate.config.grading_config import GradingConfigManager
+from mark_mate.core.llm_provider import LLMProvider
+
+
+@pytest.fixture(scope="session")
+def llm_provider():
+    """LLMProvider shared by tests that make no requests."""
+    return LLMProvider()
+
+
+@pytest.fixture(scope="session")
+def config_manager():
+    """GradingConfigManager shared by tests; it keeps no state between calls."""
+    return GradingConfigManager()
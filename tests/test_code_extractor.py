@@ -12,13 +12,13 @@ from pathlib import Path
 from typing import Dict, Any
 
 # Import the module under test
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from mark_mate.extractors.code_extractor import CodeExtractor
 from mark_mate.extractors.models import ExtractionResult, FileInfo
 
 
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
 class TestCodeExtractorBasic:
     """Test basic CodeExtractor functionality."""
 
@@ -365,7 +365,7 @@ class TestCodeExtractorIntegration:
     def setup_method(self):
         """Set up test fixtures."""
         self.extractor = CodeExtractor()
-        self.fixtures_path = Path(__file__).parent / "fixtures"
+        self.fixtures_path = FIXTURES_DIR
 
     def test_with_existing_encoding_fixtures(self):
         """Test with existing encoding test fixtures if they exist."""
@@ -12,13 +12,13 @@ from pathlib import Path
 from typing import Dict, Any
 
 # Import the module under test
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from mark_mate.extractors.office_extractor import OfficeExtractor
 from mark_mate.extractors.models import ExtractionResult, FileInfo
 
 
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
 class TestOfficeExtractorBasic:
     """Test basic OfficeExtractor functionality."""
 
@@ -228,7 +228,7 @@ class TestOfficeExtractorIntegration:
     def setup_method(self):
         """Set up test fixtures."""
         self.extractor = OfficeExtractor()
-        self.fixtures_path = Path(__file__).parent / "fixtures"
+        self.fixtures_path = FIXTURES_DIR
 
     def test_with_existing_encoding_fixtures(self):
         """Test with existing encoding test fixtures if they exist."""
@@ -11,10 +11,6 @@ import json
 from datetime import datetime
 
 # Import the current module
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from mark_mate.analyzers.react_analysis import ReactAnalyzer, TypeScriptAnalyzer, BuildConfigAnalyzer
 
 
@@ -13,9 +13,6 @@ from typing import Dict, Any
 from pathlib import Path
 
 # Import the module under test
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from mark_mate.analyzers.static_analysis import StaticAnalyzer
 
 
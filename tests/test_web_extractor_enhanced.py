@@ -12,13 +12,13 @@ from pathlib import Path
 from typing import Dict, Any
 
 # Import the module under test
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from mark_mate.extractors.web_extractor import WebExtractor
 from mark_mate.extractors.models import ExtractionResult, FileInfo
 
 
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
 class TestWebExtractorEnhancedEncoding:
     """Test enhanced international encoding support."""
 
@@ -516,7 +516,7 @@ class TestWebExtractorIntegration:
     def setup_method(self):
         """Set up test fixtures."""
         self.extractor = WebExtractor()
-        self.fixtures_path = Path(__file__).parent / "fixtures"
+        self.fixtures_path = FIXTURES_DIR
 
     def test_with_existing_web_fixtures(self):
         """Test with existing web test fixtures."""
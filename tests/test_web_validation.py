@@ -8,15 +8,11 @@ web content for the MarkMate workflow.
 
 import pytest
 import tempfile
-import os
 from unittest.mock import Mock, patch, MagicMock
 from typing import Dict, Any
 from pathlib import Path
 
 # Import the module under test
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from mark_mate.analyzers.web_validation import HTMLValidator, CSSAnalyzer, JSAnalyzer
 
 
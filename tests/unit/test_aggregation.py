@@ -0,0 +1,47 @@
+"""Tests for mark aggregation helpers."""
+
+import pytest
+
+from mark_mate.core.aggregation import get_aggregator, sample_std, to_array
+
+
+class TestAggregation:
+    """Test the averaging methods used to combine marks."""
+
+    @pytest.mark.parametrize(
+        ("method", "expected"),
+        [
+            ("mean", 70.0),
+            ("median", 70.0),
+            ("trimmed_mean", 70.0),
+            ("weighted_mean", 74.0),
+            ("unknown", 70.0),
+        ],
+    )
+    def test_methods(self, method, expected):
+        """Test each averaging method on the same marks."""
+        marks = to_array([50, 60, 80, 90])
+        weights = to_array([1, 1, 1, 2])
+
+        assert get_aggregator(method)(marks, weights) == pytest.approx(expected)
+
+    def test_trimmed_mean_drops_extremes(self):
+        """Test that only the single highest and lowest marks are dropped."""
+        marks = to_array([0, 70, 80, 100])
+
+        assert get_aggregator("trimmed_mean")(marks, None) == pytest.approx(75.0)
+
+    def test_trimmed_mean_keeps_small_samples(self):
+        """Test that two marks are averaged without trimming."""
+        assert get_aggregator("trimmed_mean")(to_array([40, 60]), None) == 50.0
+
+    def test_weighted_mean_without_weights_is_mean(self):
+        """Test that weighted_mean falls back to the mean for unweighted runs."""
+        assert get_aggregator("weighted_mean")(to_array([40, 60]), None) == 50.0
+
+    def test_sample_std(self):
+        """Test sample standard deviation and the single-mark case."""
+        marks = to_array([2, 4, 4, 4, 5, 5, 7, 9])
+
+        assert sample_std(marks) == pytest.approx(2.138, rel=1e-3)
+        assert sample_std(to_array([5])) == 0.0
@@ -0,0 +1,57 @@
+"""Tests for provider batch API helpers."""
+
+import pytest
+
+from mark_mate.core import batch_api
+from mark_mate.core.batch_api import BatchRequest
+
+
+class TestBatchApi:
+    """Test batch submission helpers that do not need network access."""
+
+    def test_parse_openai_success_entry(self):
+        """Test that a successful OpenAI output line is converted."""
+        entry = {
+            "custom_id": "req-0",
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"content": "MARK: 5"}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 3},
+                },
+            },
+            "error": None,
+        }
+
+        result = batch_api._parse_openai_entry(entry)
+
+        assert result == {
+            "success": True,
+            "content": "MARK: 5",
+            "input_tokens": 10,
+            "output_tokens": 3,
+        }
+
+    def test_parse_openai_error_entry(self):
+        """Test that a failed OpenAI request is reported as unsuccessful."""
+        entry = {"custom_id": "req-0", "response": None, "error": {"code": "x"}}
+
+        assert batch_api._parse_openai_entry(entry)["success"] is False
+
+    def test_missing_results_are_marked_failed(self):
+        """Test that requests absent from the output are reported as failed."""
+        requests = [
+            BatchRequest("req-0", "gpt-4o", "p"),
+            BatchRequest("req-1", "gpt-4o", "p"),
+        ]
+
+        results = batch_api._fill_missing(
+            requests, {"req-0": {"success": True}}, "expired"
+        )
+
+        assert results["req-1"] == {"success": False, "error": "expired"}
+
+    def test_unsupported_provider_raises(self):
+        """Test that providers without a batch API are rejected."""
+        with pytest.raises(ValueError):
+            batch_api.submit_batch("gemini", [BatchRequest("req-0", "m", "p")])
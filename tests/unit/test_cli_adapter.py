@@ -0,0 +1,315 @@
+"""Tests for the GUI adapter's consolidate-scan-extract pipeline."""
+
+import asyncio
+import importlib
+import json
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+import mark_mate
+from mark_mate.cli import consolidate, extract, scan
+
+STUDENT_IDS = ["101", "102", "103", "104", "105"]
+
+
+@pytest.fixture
+def cli_adapter(monkeypatch):
+    """Import the adapter without running the GUI package's Flet imports."""
+    gui_dir = Path(mark_mate.__file__).parent / "gui"
+    for name, path in (
+        ("mark_mate.gui", gui_dir),
+        ("mark_mate.gui.adapters", gui_dir / "adapters"),
+    ):
+        package = types.ModuleType(name)
+        package.__path__ = [str(path)]
+        monkeypatch.setitem(sys.modules, name, package)
+    module_name = "mark_mate.gui.adapters.cli_adapter"
+    monkeypatch.delitem(sys.modules, module_name, raising=False)
+    return importlib.import_module(module_name)
+
+
+class TestThrottledProgress:
+    """Test that progress updates are coalesced on the event loop."""
+
+    def test_updates_within_interval_are_coalesced(self, cli_adapter):
+        """Test that only the latest held-back update is delivered, once."""
+        delivered = []
+
+        async def run():
+            progress = cli_adapter.ThrottledProgress(
+                lambda message, value: delivered.append((message, value)),
+                min_interval=0.05,
+            )
+            progress("first", 10.0)
+            progress("second", 20.0)
+            progress("third", 30.0)
+            assert delivered == [("first", 10.0)]
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+
+        assert delivered == [("first", 10.0), ("third", 30.0)]
+
+    def test_start_and_finish_are_delivered_at_once(self, cli_adapter):
+        """Test that 0% and 100% bypass the interval and drop held updates."""
+        delivered = []
+
+        async def run():
+            progress = cli_adapter.ThrottledProgress(
+                lambda message, value: delivered.append((message, value)),
+                min_interval=0.05,
+            )
+            progress("start", 0.0)
+            progress("halfway", 50.0)
+            progress("done", 100.0)
+            assert delivered == [("start", 0.0), ("done", 100.0)]
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+
+        assert delivered == [("start", 0.0), ("done", 100.0)]
+
+
+class TestProgressDelivery:
+    """Test that progress callbacks run in order off the event loop."""
+
+    def test_drain_waits_for_queued_updates_in_order(self, cli_adapter):
+        """Test that every emitted update is delivered before drain returns."""
+        delivered = []
+
+        def callback(message, value):
+            time.sleep(0.01)
+            delivered.append((message, threading.current_thread().name))
+
+        adapter = cli_adapter.CLIAdapter()
+
+        async def run():
+            for i in range(5):
+                adapter._emit(callback, f"update {i}", float(i))
+            await adapter._drain_progress()
+            return list(delivered)
+
+        try:
+            drained = asyncio.run(run())
+        finally:
+            asyncio.run(adapter.aclose())
+
+        assert [message for message, _ in drained] == [
+            f"update {i}" for i in range(5)
+        ]
+        assert all(name.startswith("markmate-progress") for _, name in drained)
+
+
+class FakeStages:
+    """Stubbed pipeline stages that record the order in which they ran."""
+
+    def __init__(self, tmp_path, consolidate_delay=0.0):
+        self.output_dir = tmp_path / "processed"
+        self.consolidate_delay = consolidate_delay
+        self.events = []
+        self.lock = threading.Lock()
+        self.on_consolidate = None
+        self.on_scan = None
+
+    def record(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def count(self, stage):
+        return sum(1 for event in self.events if event[0] == stage)
+
+    def consolidate_student(self, files, student_id, output_dir, **kwargs):
+        time.sleep(self.consolidate_delay)
+        path = self.output_dir / f"{student_id}.txt"
+        path.write_text(f"submission {student_id}\n")
+        self.record(("consolidate", student_id))
+        if self.on_consolidate:
+            self.on_consolidate(student_id)
+        return str(path)
+
+    def scan_submission(self, path, encoding="utf-8"):
+        student_id = Path(path).stem
+        self.record(("scan", student_id))
+        if self.on_scan:
+            self.on_scan(student_id)
+        return [f"https://github.com/student/{student_id}"]
+
+    def extract_submission_content(
+        self, path, student_id, wordpress=False, github_url=None
+    ):
+        self.record(("extract", student_id))
+        return {"student_id": student_id, "processed": True, "content": {}}
+
+
+class TestRunPipeline:
+    """Test overlap, failure handling and cancellation of run_pipeline."""
+
+    @pytest.fixture
+    def stages(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        raw = tmp_path / "raw"
+        raw.mkdir()
+        for student_id in STUDENT_IDS:
+            (raw / f"course_{student_id}_essay.txt").write_text(student_id)
+
+        fake = FakeStages(tmp_path, consolidate_delay=0.02)
+        fake.output_dir.mkdir()
+        monkeypatch.setattr(
+            consolidate, "consolidate_student", fake.consolidate_student
+        )
+        monkeypatch.setattr(scan, "scan_submission", fake.scan_submission)
+        monkeypatch.setattr(
+            extract, "extract_submission_content", fake.extract_submission_content
+        )
+        return fake
+
+    def _run(self, adapter, tmp_path):
+        return adapter.run_pipeline(
+            str(tmp_path / "raw"),
+            output_dir=str(tmp_path / "processed"),
+            github_urls_output=str(tmp_path / "urls.txt"),
+            extract_output=str(tmp_path / "extracted.json"),
+        )
+
+    def test_stages_overlap_and_results_are_written(
+        self, cli_adapter, stages, tmp_path
+    ):
+        """Test that extraction starts before consolidation has finished."""
+        adapter = cli_adapter.CLIAdapter()
+
+        result = asyncio.run(self._run(adapter, tmp_path))
+
+        assert result["success"], result
+        assert result["students_processed"] == len(STUDENT_IDS)
+        first_extract = stages.events.index(("extract", STUDENT_IDS[0]))
+        last_consolidate = stages.events.index(("consolidate", STUDENT_IDS[-1]))
+        assert first_extract < last_consolidate
+        output = json.loads((tmp_path / "extracted.json").read_text())
+        assert sorted(output["students"]) == STUDENT_IDS
+        assert (tmp_path / "urls.txt").exists()
+
+    def test_unchanged_submissions_use_extraction_cache(
+        self, cli_adapter, stages, tmp_path
+    ):
+        """Test that a second run reuses the extraction cache."""
+        adapter = cli_adapter.CLIAdapter()
+
+        asyncio.run(self._run(adapter, tmp_path))
+        asyncio.run(self._run(adapter, tmp_path))
+
+        assert stages.count("extract") == len(STUDENT_IDS)
+
+    def test_failed_stage_stops_the_others(self, cli_adapter, stages, tmp_path):
+        """Test that a scan failure stops consolidation of remaining students."""
+
+        def fail(student_id):
+            raise OSError(f"cannot read {student_id}")
+
+        stages.on_scan = fail
+        adapter = cli_adapter.CLIAdapter()
+
+        result = asyncio.run(self._run(adapter, tmp_path))
+
+        assert not result["success"]
+        assert result["error"] == f"cannot read {STUDENT_IDS[0]}"
+        assert stages.count("consolidate") < len(STUDENT_IDS)
+        assert stages.count("extract") == 0
+        assert not (tmp_path / "extracted.json").exists()
+
+    def test_cancel_stops_between_students(self, cli_adapter, stages, tmp_path):
+        """Test that cancelling releases the caller and stops every stage."""
+        adapter = cli_adapter.CLIAdapter()
+        stages.on_consolidate = lambda student_id: adapter.cancel_operation()
+
+        async def run():
+            task = asyncio.create_task(self._run(adapter, tmp_path))
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        assert stages.count("consolidate") == 1
+        assert stages.count("extract") == 0
+        assert not adapter.is_running
+
+
+class TestCancelOperation:
+    """Test cancelling the operation the adapter is running."""
+
+    def test_new_operation_keeps_old_one_cancelled(
+        self, cli_adapter, monkeypatch, tmp_path
+    ):
+        """Test that starting an operation cannot un-cancel a winding-down one."""
+        stop_events = []
+        release = threading.Event()
+
+        def run_cli(name, args):
+            stop_events.append(args.stop_event)
+            release.wait(5)
+
+        monkeypatch.setattr(cli_adapter, "_run_cli", run_cli)
+        adapter = cli_adapter.CLIAdapter()
+
+        async def started(count):
+            while len(stop_events) < count:
+                await asyncio.sleep(0.01)
+
+        async def run():
+            first = asyncio.create_task(adapter.consolidate_async(str(tmp_path)))
+            await started(1)
+            adapter.cancel_operation()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+            second = asyncio.create_task(adapter.consolidate_async(str(tmp_path)))
+            await started(2)
+            try:
+                assert stop_events[0].is_set()
+                assert not stop_events[1].is_set()
+            finally:
+                release.set()
+            assert (await second)["success"]
+
+        try:
+            asyncio.run(run())
+        finally:
+            release.set()
+            asyncio.run(adapter.aclose())
+
+    def test_cancel_from_another_thread_releases_caller(
+        self, cli_adapter, monkeypatch, tmp_path
+    ):
+        """Test that cancelling off the loop cancels the awaiting task."""
+        stop_events = []
+        release = threading.Event()
+
+        def run_cli(name, args):
+            stop_events.append(args.stop_event)
+            release.wait(5)
+
+        monkeypatch.setattr(cli_adapter, "_run_cli", run_cli)
+        adapter = cli_adapter.CLIAdapter()
+
+        async def run():
+            task = asyncio.create_task(adapter.extract_async(str(tmp_path)))
+            while not stop_events:
+                await asyncio.sleep(0.01)
+            canceller = threading.Thread(target=adapter.cancel_operation)
+            canceller.start()
+            canceller.join()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        try:
+            asyncio.run(run())
+        finally:
+            release.set()
+            asyncio.run(adapter.aclose())
+
+        assert stop_events[0].is_set()
+        assert not adapter.is_running
@@ -0,0 +1,582 @@
+"""Tests for the enhanced multi-grader system."""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from mark_mate.core.enhanced_grader import (
+    _STREAMED_MARK_PATTERN,
+    EnhancedGradingSystem,
+    _retry_delay,
+)
+from mark_mate.core.result_cache import ResultCache
+
+
+def _llm_response(content, cost=0.01):
+    """Build a successful LLMProvider response."""
+    return {
+        "success": True,
+        "content": content,
+        "usage": {
+            "cost": cost,
+            "response_time": 0.5,
+            "input_tokens": 100,
+            "output_tokens": 50,
+        },
+        "timestamp": "2025-01-01T10:00:00",
+    }
+
+
+class TestEnhancedGradingSystem:
+    """Test EnhancedGradingSystem grading flow with a mocked LLM provider."""
+
+    @pytest.fixture
+    def llm_provider(self):
+        """Mock LLM provider with Anthropic and OpenAI available."""
+        provider = Mock()
+        provider.get_available_providers.return_value = ["anthropic", "openai"]
+        provider.estimate_cost.return_value = 0.0
+        provider.grade_submission_async = AsyncMock(
+            return_value=_llm_response('{"mark": 80, "feedback": "Solid work"}')
+        )
+        return provider
+
+    @pytest.fixture
+    def grading_system(self, llm_provider):
+        """EnhancedGradingSystem using the default configuration."""
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            return EnhancedGradingSystem()
+
+    @pytest.fixture
+    def student_data(self):
+        """Minimal student submission."""
+        return {
+            "student_id": "123",
+            "content": {"documents": [{"filename": "a.txt", "text": "Answer"}]},
+        }
+
+    def test_grade_submission_aggregates_graders(self, grading_system, student_data):
+        """Test that every grader is called and results are aggregated."""
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert set(result["grader_results"]) == {"claude-sonnet", "gpt4o-mini"}
+        assert result["aggregate"]["mark"] == 80.0
+        assert result["aggregate"]["feedback"] == "Solid work"
+        assert result["metadata"]["successful_runs"] == 2
+        assert grading_system.session_stats["successful_grades"] == 1
+
+    def test_grade_submission_retries_failed_runs(
+        self, grading_system, llm_provider, student_data
+    ):
+        """Test that a failed LLM call is retried before succeeding."""
+        llm_provider.grade_submission_async.side_effect = [
+            {"success": False, "error": "rate limited"},
+            _llm_response('{"mark": 70, "feedback": "Retry worked"}'),
+            _llm_response('{"mark": 70, "feedback": "Retry worked"}'),
+        ]
+
+        with patch("mark_mate.core.enhanced_grader.asyncio.sleep", new=AsyncMock()):
+            result = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert llm_provider.grade_submission_async.await_count == 3
+        assert result["aggregate"]["mark"] == 70.0
+        assert result["metadata"]["failed_runs"] == 0
+
+    def test_grade_submissions_batch_groups_requests(
+        self, grading_system, llm_provider, student_data
+    ):
+        """Test that batch grading submits one batch per provider."""
+        submitted = {}
+
+        def fake_submit_batch(provider, requests, poll_interval):
+            submitted[provider] = requests
+            return {
+                request.custom_id: {
+                    "success": True,
+                    "content": '{"mark": 60, "feedback": "Batched"}',
+                    "input_tokens": 100,
+                    "output_tokens": 50,
+                }
+                for request in requests
+            }
+
+        students = [student_data, {**student_data, "student_id": "456"}]
+        with patch(
+            "mark_mate.core.enhanced_grader.submit_batch", side_effect=fake_submit_batch
+        ):
+            results = grading_system.grade_submissions_batch(students, "Total: 100")
+
+        runs = grading_system.config.runs_per_grader
+        assert set(submitted) == {"anthropic", "openai"}
+        assert all(len(reqs) == 2 * runs for reqs in submitted.values())
+        assert [r["student_id"] for r in results] == ["123", "456"]
+        assert results[1]["aggregate"]["mark"] == 60.0
+        assert list(results[0]["grader_results"]) == ["claude-sonnet", "gpt4o-mini"]
+        llm_provider.grade_submission_async.assert_not_called()
+
+    def test_shared_prompt_prefix_is_passed_to_provider(
+        self, grading_system, llm_provider, student_data
+    ):
+        """Test that the assignment spec prefix is sent for prompt caching."""
+        grading_system.grade_submission(student_data, "Total: 100")
+
+        kwargs = llm_provider.grade_submission_async.await_args.kwargs
+        assert "Total: 100" in kwargs["prompt_prefix"]
+        assert kwargs["prompt"].startswith(kwargs["prompt_prefix"])
+        assert "123" not in kwargs["prompt_prefix"]
+
+    def test_cached_grader_results_skip_llm_calls(
+        self, grading_system, llm_provider, student_data, tmp_path
+    ):
+        """Test that a second grading run is served from the result cache."""
+        grading_system.result_cache = ResultCache(str(tmp_path))
+        first = grading_system.grade_submission(student_data, "Total: 100")
+        calls = llm_provider.grade_submission_async.await_count
+
+        second = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert llm_provider.grade_submission_async.await_count == calls
+        assert second["aggregate"]["mark"] == first["aggregate"]["mark"]
+        assert second["metadata"]["total_cost"] == 0.0
+        assert all(
+            gr["metadata"]["cached"] for gr in second["grader_results"].values()
+        )
+
+    def test_successful_runs_are_reused_after_partial_failure(
+        self, llm_provider, student_data, tmp_path
+    ):
+        """Test that re-grading only repeats the runs that failed."""
+        llm_provider.grade_submission_async.side_effect = [
+            _llm_response('{"mark": 80, "feedback": "Run 1"}'),
+            {"success": False, "error": "overloaded"},
+            _llm_response('{"mark": 60, "feedback": "Run 2"}'),
+        ]
+        config_data = {
+            "grading": {"runs_per_grader": 2, "parallel_execution": False},
+            "graders": [
+                {"name": "gpt", "provider": "openai", "model": "gpt-4o-mini"}
+            ],
+            "execution": {"retry_attempts": 1},
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(
+                config_data, result_cache=ResultCache(str(tmp_path))
+            )
+
+        first = grading_system.grade_submission(student_data, "Total: 100")
+        second = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert first["grader_results"]["gpt"]["metadata"]["failed_runs"] == 1
+        assert llm_provider.grade_submission_async.await_count == 3
+        runs = second["grader_results"]["gpt"]["runs"]
+        assert [r["mark"] for r in runs] == [80.0, 60.0]
+        assert runs[0]["cost"] == 0.0
+        assert second["aggregate"]["mark"] == 70.0
+
+    def test_grade_submission_group_scatters_results(
+        self, grading_system, llm_provider, student_data
+    ):
+        """Test that one grouped call per run is split back into students."""
+        llm_provider.grade_submission_async.return_value = _llm_response(
+            '{"results": ['
+            '{"student_id": "456", "mark": 40, "feedback": "Second"},'
+            '{"student_id": "123", "mark": 90, "feedback": "First"}]}',
+            cost=0.02,
+        )
+        students = [student_data, {**student_data, "student_id": "456"}]
+
+        results = asyncio.run(
+            grading_system.grade_submission_group_async(students, "Total: 100")
+        )
+
+        runs = grading_system.config.runs_per_grader
+        assert llm_provider.grade_submission_async.await_count == 2 * runs
+        assert [r["aggregate"]["mark"] for r in results] == [90.0, 40.0]
+        assert results[0]["aggregate"]["feedback"] == "First"
+        assert results[0]["metadata"]["total_cost"] == pytest.approx(0.01 * 2 * runs)
+        kwargs = llm_provider.grade_submission_async.await_args.kwargs
+        assert kwargs["prompt"].count("=== STUDENT") == 2
+        assert kwargs["prompt"].startswith(kwargs["prompt_prefix"])
+
+    def test_from_dict_uses_in_memory_config(self, llm_provider):
+        """Test that a config dictionary is used without touching the disk."""
+        config_data = {
+            "grading": {"runs_per_grader": 2, "averaging_method": "median"},
+            "graders": [
+                {"name": "gpt", "provider": "openai", "model": "gpt-4o-mini"}
+            ],
+        }
+
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        assert [g.name for g in grading_system.config.graders] == ["gpt"]
+        assert grading_system.config.runs_per_grader == 2
+        assert grading_system.config.averaging_method == "median"
+
+    def test_concurrent_runs_respect_cost_limit(self, llm_provider, student_data):
+        """Test that runs in flight count towards max_cost_per_student."""
+
+        async def respond(**kwargs):
+            await asyncio.sleep(0.01)
+            return _llm_response('{"mark": 80, "feedback": "Fine"}', cost=0.01)
+
+        llm_provider.grade_submission_async.side_effect = respond
+        llm_provider.estimate_cost.return_value = 0.01
+        config_data = {
+            "grading": {"runs_per_grader": 5},
+            "graders": [
+                {"name": "gpt", "provider": "openai", "model": "gpt-4o-mini"}
+            ],
+            "execution": {
+                "max_cost_per_student": 0.025,
+                "max_concurrent_requests": 10,
+            },
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert llm_provider.grade_submission_async.await_count == 3
+        assert result["metadata"]["total_cost"] == pytest.approx(0.03)
+
+    def test_reflective_runs_use_one_call_per_grader(self, llm_provider, student_data):
+        """Test that reflective mode turns one call into several runs."""
+        llm_provider.grade_submission_async.return_value = _llm_response(
+            '{"scorings": [{"mark": 70, "feedback": "First pass"},'
+            '{"mark": 80, "feedback": "Reviewed"},'
+            '{"mark": 90, "feedback": "Final"}]}',
+            cost=0.03,
+        )
+        config_data = {
+            "grading": {"runs_per_grader": 3, "runs_mode": "reflective"},
+            "graders": [
+                {
+                    "name": "claude",
+                    "provider": "anthropic",
+                    "model": "claude-3-5-sonnet",
+                }
+            ],
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert llm_provider.grade_submission_async.await_count == 1
+        grader_result = result["grader_results"]["claude"]
+        assert [r["run_number"] for r in grader_result["runs"]] == [1, 2, 3]
+        assert grader_result["aggregated"]["mark"] == 80.0
+        assert result["metadata"]["total_cost"] == pytest.approx(0.03)
+        kwargs = llm_provider.grade_submission_async.await_args.kwargs
+        assert '"scorings"' in kwargs["prompt"]
+
+    def test_structured_output_sends_response_schema(self, llm_provider, student_data):
+        """Test that structured output requests and validates the schema."""
+        llm_provider.grade_submission_async.return_value = _llm_response(
+            '{"mark": 42, "max_mark": 50, "feedback": "Good", "strengths": ["a"],'
+            ' "improvements": [], "confidence": 0.9}'
+        )
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem(structured_output=True)
+
+        result = grading_system.grade_submission(student_data, "Total: 50")
+
+        kwargs = llm_provider.grade_submission_async.await_args.kwargs
+        schema = kwargs["response_format"]["json_schema"]["schema"]
+        assert schema["properties"]["mark"]["maximum"] == 50
+        run = next(iter(result["grader_results"].values()))["runs"][0]
+        assert run["mark"] == 42.0
+        assert run["max_mark"] == 50
+        parsed = grading_system._parse_grading_response(
+            llm_provider.grade_submission_async.return_value["content"], "Total: 50"
+        )
+        assert parsed["strengths"] == ["a"]
+        assert parsed["confidence"] == 0.9
+
+    @pytest.mark.parametrize("parallel, expected", [(True, 6), (False, 1)])
+    def test_runs_execute_concurrently(
+        self, llm_provider, student_data, parallel, expected
+    ):
+        """Test that grader runs overlap only when parallel execution is on."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def respond(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _llm_response('{"mark": 80, "feedback": "Solid work"}')
+
+        llm_provider.grade_submission_async.side_effect = respond
+        config_data = {
+            "grading": {"runs_per_grader": 3, "parallel_execution": parallel},
+            "graders": [
+                {"name": "claude", "provider": "anthropic", "model": "claude-3-haiku"},
+                {"name": "gpt", "provider": "openai", "model": "gpt-4o-mini"},
+            ],
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert max_in_flight == expected
+        assert list(result["grader_results"]) == ["claude", "gpt"]
+        assert [
+            r["run_number"] for r in result["grader_results"]["gpt"]["runs"]
+        ] == [1, 2, 3]
+
+    def test_batch_live_graders_share_concurrency_limit(
+        self, llm_provider, student_data
+    ):
+        """Test that graders without a batch API are graded in a bounded pool."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def respond(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _llm_response('{"mark": 70, "feedback": "Live"}')
+
+        llm_provider.get_available_providers.return_value = ["gemini"]
+        llm_provider.grade_submission_async.side_effect = respond
+        config_data = {
+            "grading": {"runs_per_grader": 2},
+            "graders": [
+                {"name": "gemini", "provider": "gemini", "model": "gemini-pro"}
+            ],
+            "execution": {"max_concurrent_requests": 3},
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        students = [{**student_data, "student_id": str(i)} for i in range(5)]
+        results = grading_system.grade_submissions_batch(students, "Total: 100")
+
+        assert max_in_flight == 3
+        assert llm_provider.grade_submission_async.await_count == 10
+        assert [r["aggregate"]["mark"] for r in results] == [70.0] * 5
+
+    @pytest.mark.parametrize(
+        ("spec", "max_mark", "rubric"),
+        [
+            ("Marks: 40\nTotal: 50", 50, "Marks: 40\nTotal: 50"),
+            ("Grading: see the rubric: code marks 20", 20, "code marks 20"),
+            ("Points: 30\n\nMarking scheme: style", 30, "style"),
+            ("Write an essay", 100, "Write an essay"),
+        ],
+    )
+    def test_spec_extraction_keeps_keyword_priority(
+        self, grading_system, spec, max_mark, rubric
+    ):
+        """Test that higher-priority keywords win wherever they appear."""
+        assert grading_system._extract_max_mark(spec) == max_mark
+        assert grading_system._extract_rubric(spec) == rubric
+
+    def test_primary_feedback_grader_supplies_feedback(self, llm_provider, student_data):
+        """Test that the primary_feedback grader's feedback is used."""
+
+        async def respond(**kwargs):
+            if kwargs["provider"] == "anthropic":
+                return _llm_response('{"mark": 80, "feedback": "Short"}')
+            return _llm_response('{"mark": 60, "feedback": "Much longer feedback"}')
+
+        llm_provider.grade_submission_async.side_effect = respond
+        config_data = {
+            "graders": [
+                {"name": "gpt", "provider": "openai", "model": "gpt-4o-mini"},
+                {
+                    "name": "claude",
+                    "provider": "anthropic",
+                    "model": "claude-3-5-haiku",
+                    "primary_feedback": True,
+                },
+            ],
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        assert result["aggregate"]["feedback"] == "Short"
+
+    def test_retry_waits_for_provider_retry_after(
+        self, grading_system, llm_provider, student_data
+    ):
+        """Test that a provider's Retry-After delay is honoured on retry."""
+        llm_provider.grade_submission_async.side_effect = [
+            {"success": False, "error": "rate limited", "retry_after": 30.0},
+            _llm_response('{"mark": 70, "feedback": "Retry worked"}'),
+            _llm_response('{"mark": 70, "feedback": "Retry worked"}'),
+        ]
+        sleep = AsyncMock()
+
+        with patch("mark_mate.core.enhanced_grader.asyncio.sleep", new=sleep):
+            grading_system.grade_submission(student_data, "Total: 100")
+
+        sleep.assert_awaited_once_with(30.0)
+
+
+    def test_mark_only_grader_streams_until_mark(self, llm_provider, student_data):
+        """Test that mark_only graders stop at the mark and give no feedback."""
+
+        async def respond(**kwargs):
+            if kwargs.get("stop_pattern") is not None:
+                return _llm_response('{\n  "max_mark": 100,\n  "mark": 62.5,')
+            return _llm_response('{"mark": 80, "feedback": "Detailed"}')
+
+        llm_provider.grade_submission_async.side_effect = respond
+        config_data = {
+            "graders": [
+                {
+                    "name": "claude",
+                    "provider": "anthropic",
+                    "model": "claude-3-5-haiku",
+                    "primary_feedback": True,
+                },
+                {
+                    "name": "gpt",
+                    "provider": "openai",
+                    "model": "gpt-4o-mini",
+                    "mark_only": True,
+                },
+            ],
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        gpt = result["grader_results"]["gpt"]["aggregated"]
+        assert gpt["mark"] == 62.5
+        assert gpt["feedback"] == ""
+        assert result["aggregate"]["feedback"] == "Detailed"
+
+
+    @pytest.mark.parametrize(
+        "finish_reason", [None, "stop"], ids=["cut-off", "finished"]
+    )
+    def test_mark_only_grader_reads_legacy_mark(
+        self, llm_provider, student_data, finish_reason
+    ):
+        """Test legacy marks, and a full parse when the stream ended itself."""
+        content = "MARK: 85/100\n" if finish_reason is None else "MARK: 85"
+        llm_provider.grade_submission_async.return_value = {
+            **_llm_response(content),
+            "finish_reason": finish_reason,
+        }
+        config_data = {
+            "graders": [
+                {
+                    "name": "gpt",
+                    "provider": "openai",
+                    "model": "gpt-4o-mini",
+                    "mark_only": True,
+                }
+            ],
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        result = grading_system.grade_submission(student_data, "Total: 100")
+
+        gpt = result["grader_results"]["gpt"]["aggregated"]
+        assert gpt["mark"] == 85.0
+        assert gpt["feedback"] == ""
+        assert llm_provider.grade_submission_async.await_count == 1
+
+    def test_max_tokens_adapts_to_observed_output(self, llm_provider, student_data):
+        """Test that max_tokens shrinks to recent output and recovers on truncation."""
+        complete = _llm_response('{"mark": 80, "feedback": "Fine"}')
+        responses = [{**complete, "finish_reason": "stop"} for _ in range(3)]
+        responses.append(
+            {**_llm_response('{"mark": 80, "feed'), "finish_reason": "length"}
+        )
+        responses.append(_llm_response('{"mark": 75, "feedback": "Full"}'))
+        llm_provider.grade_submission_async.side_effect = responses
+        config_data = {
+            "graders": [
+                {"name": "gpt", "provider": "openai", "model": "gpt-4o-mini"}
+            ],
+        }
+        with patch(
+            "mark_mate.core.enhanced_grader.LLMProvider", return_value=llm_provider
+        ):
+            grading_system = EnhancedGradingSystem.from_dict(config_data)
+
+        with patch("mark_mate.core.enhanced_grader.asyncio.sleep", new=AsyncMock()):
+            for _ in range(3):
+                grading_system.grade_submission(student_data, "Total: 100")
+            result = grading_system.grade_submission(student_data, "Total: 100")
+
+        max_tokens = [
+            call.kwargs["max_tokens"]
+            for call in llm_provider.grade_submission_async.await_args_list
+        ]
+        assert max_tokens == [2000, 2000, 2000, 256, 2000]
+        assert result["aggregate"]["mark"] == 75.0
+
+@pytest.mark.parametrize(
+    ("text", "mark"),
+    [
+        ("MARK: 85/100", "85"),
+        ("MARK: 85 out of 100", "85"),
+        ("MARK: 85.\n", "85"),
+        ("MARK: 72.5\n", "72.5"),
+        ('{\n  "max_mark": 100,\n  "mark": 62.5,', "62.5"),
+        ("MARK: 8", None),
+        ("MARK: 85.", None),
+        ('{"max_mark": 100,', None),
+    ],
+)
+def test_streamed_mark_pattern_waits_for_complete_mark(text, mark):
+    """Test that the stream stops only once the mark cannot grow any further."""
+    match = _STREAMED_MARK_PATTERN.search(text)
+
+    assert (match.group(1) if match else None) == mark
+
+
+@pytest.mark.parametrize(
+    ("attempt", "retry_after", "low", "high"),
+    [
+        (0, None, 1.0, 2.0),
+        (3, None, 8.0, 9.0),
+        (10, None, 60.0, 61.0),
+        (0, 90.0, 90.0, 90.0),
+    ],
+)
+def test_retry_delay_is_capped_with_jitter(attempt, retry_after, low, high):
+    """Test exponential backoff bounds, jitter and Retry-After handling."""
+    delay = _retry_delay(attempt, retry_after)
+
+    assert low <= delay <= high
@@ -0,0 +1,93 @@
+"""Tests for the extract CLI command."""
+
+import argparse
+import json
+
+import pytest
+
+from mark_mate.cli import extract
+
+
+def _make_args(tmp_path, **overrides):
+    values = {
+        "submissions_folder": str(tmp_path / "submissions"),
+        "output": str(tmp_path / "extracted.json"),
+        "wordpress": False,
+        "github_urls": None,
+        "dry_run": False,
+        "max_students": None,
+        "cache_dir": str(tmp_path / "cache"),
+        "no_cache": False,
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+class TestExtractionCache:
+    """Test reuse of extraction results for unchanged submissions."""
+
+    def _run(self, tmp_path, monkeypatch, **overrides):
+        calls = []
+
+        def fake_extract(submission_path, student_id, wordpress=False, github_url=None):
+            calls.append(student_id)
+            return {"student_id": student_id, "processed": True, "content": {}}
+
+        monkeypatch.setattr(extract, "extract_submission_content", fake_extract)
+        assert extract.main(_make_args(tmp_path, **overrides)) == 0
+        return calls
+
+    def test_unchanged_submissions_are_not_reextracted(self, tmp_path, monkeypatch):
+        """Test that a second run reuses results and re-extracts edited files."""
+        submissions = tmp_path / "submissions"
+        (submissions / "123_smith").mkdir(parents=True)
+        (submissions / "123_smith" / "main.py").write_text("print('hi')\n")
+        (submissions / "456_jones.txt").write_text("essay\n")
+
+        assert self._run(tmp_path, monkeypatch) == ["123", "456"]
+        assert self._run(tmp_path, monkeypatch) == []
+
+        (submissions / "123_smith" / "main.py").write_text("print('bye')\n")
+        assert self._run(tmp_path, monkeypatch) == ["123"]
+
+        output = json.loads((tmp_path / "extracted.json").read_text())
+        assert set(output["students"]) == {"123", "456"}
+
+    def test_new_results_are_stored_once_per_run(self, tmp_path, monkeypatch):
+        """Test that extractions are written in one batch instead of per student."""
+        (tmp_path / "submissions").mkdir()
+        for name in ("123_smith.txt", "456_jones.txt"):
+            (tmp_path / "submissions" / name).write_text(name)
+        batches = []
+        monkeypatch.setattr(
+            extract.ResultCache, "set", lambda *args: pytest.fail("per-student write")
+        )
+        monkeypatch.setattr(
+            extract.ResultCache,
+            "set_many",
+            lambda self, items: batches.append([key for key, _ in items]),
+        )
+
+        self._run(tmp_path, monkeypatch)
+
+        assert len(batches) == 1 and len(batches[0]) == 2
+
+    def test_no_cache_extracts_everything(self, tmp_path, monkeypatch):
+        """Test that --no-cache always runs the extractors."""
+        (tmp_path / "submissions").mkdir()
+        (tmp_path / "submissions" / "123_smith.txt").write_text("essay\n")
+
+        self._run(tmp_path, monkeypatch)
+
+        assert self._run(tmp_path, monkeypatch, no_cache=True) == ["123"]
+
+    def test_hash_covers_file_names_and_contents(self, tmp_path):
+        """Test that renaming or editing a file changes the submission hash."""
+        (tmp_path / "a.py").write_text("x = 1\n")
+        original = extract.hash_submission(tmp_path)
+
+        (tmp_path / "a.py").rename(tmp_path / "b.py")
+        renamed = extract.hash_submission(tmp_path)
+        (tmp_path / "b.py").write_text("x = 2\n")
+
+        assert len({original, renamed, extract.hash_submission(tmp_path)}) == 3
@@ -0,0 +1,286 @@
+"""Tests for the grade CLI command."""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+from unittest.mock import Mock, patch
+
+from mark_mate.cli import grade
+
+SYSTEM_CLASS = "mark_mate.core.enhanced_grader.EnhancedGradingSystem"
+
+
+class FakeGradingSystem:
+    """Grading system stub that records how many students are in flight."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def grade_submission_async(self, student_data, assignment_spec, rubric=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if student_data.get("fail"):
+            raise RuntimeError("provider unavailable")
+        return {"student_id": student_data["student_id"], "mark": 1}
+
+
+class TestGradeStudentsAsync:
+    """Test concurrent grading of multiple students."""
+
+    def test_results_preserve_input_order(self):
+        """Test that results come back in the order students were given."""
+        students = [(sid, {"student_id": sid}) for sid in ("003", "001", "002")]
+
+        results = asyncio.run(
+            grade.grade_students_async(students, "spec", FakeGradingSystem())
+        )
+
+        assert [sid for sid, _ in results] == ["003", "001", "002"]
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency students are graded at once."""
+        students = [(f"{i:03d}", {"student_id": f"{i:03d}"}) for i in range(10)]
+        grading_system = FakeGradingSystem()
+
+        asyncio.run(
+            grade.grade_students_async(
+                students, "spec", grading_system, max_concurrency=3
+            )
+        )
+
+        assert grading_system.max_in_flight == 3
+
+    def test_failed_student_does_not_abort_batch(self):
+        """Test that one failing student is reported without stopping others."""
+        students = [
+            ("001", {"student_id": "001", "fail": True}),
+            ("002", {"student_id": "002"}),
+        ]
+
+        results = dict(
+            asyncio.run(
+                grade.grade_students_async(students, "spec", FakeGradingSystem())
+            )
+        )
+
+        assert results["001"]["graded"] is False
+        assert "provider unavailable" in results["001"]["error"]
+        assert results["002"]["mark"] == 1
+
+    def test_stop_event_skips_students_not_yet_started(self):
+        """Test that setting the stop event stops grading between students."""
+        students = [(f"{i:03d}", {"student_id": f"{i:03d}"}) for i in range(5)]
+        stop_event = threading.Event()
+        graded = []
+
+        def on_result(student_id, result):
+            graded.append(student_id)
+            stop_event.set()
+
+        asyncio.run(
+            grade.grade_students_async(
+                students,
+                "spec",
+                FakeGradingSystem(),
+                max_concurrency=1,
+                on_result=on_result,
+                stop_event=stop_event,
+            )
+        )
+
+        assert graded == ["000"]
+
+
+class FakeGroupGradingSystem:
+    """Grading system stub that records the groups it was asked to grade."""
+
+    def __init__(self):
+        self.groups = []
+
+    async def grade_submission_group_async(
+        self, students, assignment_spec, rubric=None, json_mode=False
+    ):
+        self.groups.append([s["student_id"] for s in students])
+        return [{"student_id": s["student_id"], "mark": 1} for s in students]
+
+
+class TestGradeStudentGroupsAsync:
+    """Test grading several students per prompt."""
+
+    def test_students_are_chunked_and_order_kept(self):
+        """Test that students are graded in groups and results stay in order."""
+        students = [(f"{i:03d}", {"student_id": f"{i:03d}"}) for i in range(5)]
+        grading_system = FakeGroupGradingSystem()
+
+        results = asyncio.run(
+            grade.grade_student_groups_async(
+                students, "spec", grading_system, students_per_prompt=2
+            )
+        )
+
+        assert sorted(len(group) for group in grading_system.groups) == [1, 2, 2]
+        assert [sid for sid, _ in results] == [sid for sid, _ in students]
+
+
+class TestCheckpoint:
+    """Test the JSONL checkpoint used to stream and resume results."""
+
+    def test_final_results_match_json_dump(self, tmp_path):
+        """Test that assembled output is identical to dumping the whole dict."""
+        checkpoint = tmp_path / "out.json.jsonl"
+        results = {
+            "002": {"mark": 50, "feedback": "Needs\nwork"},
+            "001": {"error": "boom", "graded": False},
+        }
+        checkpoint.write_text(
+            "".join(json.dumps({sid: r}) + "\n" for sid, r in results.items()),
+            encoding="utf-8",
+        )
+        session = {"timestamp": "now", "total_students": 2}
+
+        counts = grade.write_final_results(
+            str(tmp_path / "out.json"), session, str(checkpoint)
+        )
+
+        expected = {
+            "grading_session": session,
+            "results": {sid: results[sid] for sid in sorted(results)},
+        }
+        assert (tmp_path / "out.json").read_text(encoding="utf-8") == json.dumps(
+            expected, indent=2, ensure_ascii=False
+        )
+        assert counts == (2, 1)
+
+    def test_final_results_without_students(self, tmp_path):
+        """Test that an empty checkpoint still produces the json.dump layout."""
+        checkpoint = tmp_path / "out.json.jsonl"
+        checkpoint.write_text("", encoding="utf-8")
+        session = {"config": {"graders": ["gpt"]}, "timestamp": "now"}
+
+        counts = grade.write_final_results(
+            str(tmp_path / "out.json"), session, str(checkpoint)
+        )
+
+        expected = {
+            "grading_session": {**session, "total_students": 0},
+            "results": {},
+        }
+        assert (tmp_path / "out.json").read_text(encoding="utf-8") == json.dumps(
+            expected, indent=2, ensure_ascii=False
+        )
+        assert counts == (0, 0)
+
+    def test_load_checkpoint_drops_partial_line(self, tmp_path):
+        """Test that an interrupted write is discarded on resume."""
+        checkpoint = tmp_path / "out.json.jsonl"
+        checkpoint.write_text('{"001": {"mark": 1}}\n{"002": {"ma', encoding="utf-8")
+
+        completed = grade.load_checkpoint(str(checkpoint))
+
+        assert completed == {"001"}
+        assert checkpoint.read_text(encoding="utf-8") == '{"001": {"mark": 1}}\n'
+
+
+class TestMain:
+    """Test the grade command entry point."""
+
+    def _parse_args(self, argv):
+        parser = argparse.ArgumentParser()
+        grade.add_parser(parser.add_subparsers())
+        return parser.parse_args(["grade", *argv])
+
+    def test_dry_run_loads_input_files(self, tmp_path, caplog):
+        """Test that content, spec and rubric are all loaded before grading."""
+        content = tmp_path / "content.json"
+        content.write_text(json.dumps({"students": {"001": {}}}), encoding="utf-8")
+        spec = tmp_path / "spec.txt"
+        spec.write_text("Spec", encoding="utf-8")
+        rubric = tmp_path / "rubric.txt"
+        rubric.write_text("Rubric", encoding="utf-8")
+        args = self._parse_args(
+            [str(content), str(spec), "--rubric", str(rubric), "--dry-run"]
+        )
+
+        grading_system = Mock()
+        grading_system.config.graders = []
+        with patch(SYSTEM_CLASS) as system_class, patch.object(
+            grade, "check_available_providers", return_value=["claude"]
+        ), caplog.at_level(logging.INFO):
+            system_class.from_dict.return_value = grading_system
+            assert grade.main(args) == 0
+
+        assert f"Loaded assignment specification from: {rubric}" in caplog.text
+        assert "001" in caplog.text
+
+    def test_missing_spec_file_fails(self, tmp_path):
+        """Test that a missing input file aborts before grading."""
+        content = tmp_path / "content.json"
+        content.write_text(json.dumps({"students": {}}), encoding="utf-8")
+        args = self._parse_args(
+            [str(content), str(tmp_path / "missing.txt"), "--dry-run"]
+        )
+
+        with patch(SYSTEM_CLASS), patch.object(
+            grade, "check_available_providers", return_value=["claude"]
+        ):
+            assert grade.main(args) == 1
+
+    def test_result_cache_closed_after_run(self, tmp_path):
+        """Test that the result cache opened for a run is closed when it ends."""
+        content = tmp_path / "content.json"
+        content.write_text(json.dumps({"students": {}}), encoding="utf-8")
+        args = self._parse_args(
+            [
+                str(content),
+                str(tmp_path / "missing.txt"),
+                "--cache-dir",
+                str(tmp_path / "cache"),
+            ]
+        )
+
+        with patch("mark_mate.core.result_cache.ResultCache") as cache_class, patch(
+            SYSTEM_CLASS
+        ), patch.object(grade, "check_available_providers", return_value=["claude"]):
+            assert grade.main(args) == 1
+
+        cache_class.return_value.close.assert_called_once_with()
+
+    def test_results_checkpointed_in_order_and_written(self, tmp_path):
+        """Test that graded students are checkpointed and the output assembled."""
+        students = {sid: {"student_id": sid} for sid in ("003", "001", "002")}
+        content = tmp_path / "content.json"
+        content.write_text(json.dumps({"students": students}), encoding="utf-8")
+        spec = tmp_path / "spec.txt"
+        spec.write_text("Spec", encoding="utf-8")
+        output = tmp_path / "out.json"
+        args = self._parse_args(
+            [str(content), str(spec), "--output", str(output), "--no-cache"]
+        )
+
+        grading_system = FakeGradingSystem()
+        grading_system.config = Mock(
+            graders=[], runs_per_grader=1, averaging_method="mean"
+        )
+        grading_system.get_session_summary = Mock(
+            return_value={
+                "session_stats": {"total_api_calls": 3, "total_cost": 0.0},
+                "duration_seconds": 0,
+            }
+        )
+        with patch(SYSTEM_CLASS) as system_class, patch.object(
+            grade, "check_available_providers", return_value=["claude"]
+        ):
+            system_class.from_dict.return_value = grading_system
+            assert grade.main(args) == 0
+
+        checkpoint = (tmp_path / "out.json.jsonl").read_text(encoding="utf-8")
+        assert [json.loads(line) for line in checkpoint.splitlines()] == [
+            {sid: {"student_id": sid, "mark": 1}} for sid in sorted(students)
+        ]
+        written = json.loads(output.read_text(encoding="utf-8"))
+        assert list(written["results"]) == ["001", "002", "003"]
@@ -1,5 +1,6 @@
 """Tests for grading configuration management."""
 
+import sys
 import tempfile
 from pathlib import Path
 
@@ -69,14 +70,22 @@ class TestGradingConfig:
         assert isinstance(config.prompt_sections, dict)
 
 
+    @pytest.mark.skipif(
+        sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+"
+    )
+    def test_configs_use_slots(self):
+        """Test that config instances have no per-instance __dict__."""
+        grader = GraderConfig(name="test", provider="anthropic", model="claude")
+        config = GradingConfig(graders=[grader])
+
+        assert not hasattr(grader, "__dict__")
+        assert not hasattr(config, "__dict__")
+        with pytest.raises(AttributeError):
+            grader.unknown_setting = True
+
 class TestGradingConfigManager:
     """Test GradingConfigManager functionality."""
 
-    @pytest.fixture
-    def config_manager(self):
-        """Create a GradingConfigManager instance."""
-        return GradingConfigManager()
-
     @pytest.fixture
     def sample_config_dict(self):
         """Sample configuration dictionary."""
@@ -125,6 +134,26 @@ class TestGradingConfigManager:
         assert len(config.graders) > 0
         assert "default" in config.prompts
 
+    def test_default_config_returns_independent_copies(self, config_manager):
+        """Test that changing a returned default does not affect later ones."""
+        config = config_manager.default_config()
+        config.graders.clear()
+        config.prompts["default"]["system"] = "changed"
+
+        fresh = GradingConfigManager().load_config()
+
+        assert len(fresh.graders) > 0
+        assert fresh.prompts["default"]["system"] != "changed"
+
+    def test_create_gemini_config_leaves_default_untouched(self, config_manager):
+        """Test that adding the Gemini grader does not mutate DEFAULT_CONFIG."""
+        graders_before = len(GradingConfigManager.DEFAULT_CONFIG["graders"])
+
+        config = config_manager.create_gemini_config()
+
+        assert len(config["graders"]) == graders_before + 1
+        assert len(GradingConfigManager.DEFAULT_CONFIG["graders"]) == graders_before
+
     def test_load_config_from_dict(self, config_manager, sample_config_dict):
         """Test parsing configuration from dictionary."""
         config = config_manager._parse_config(sample_config_dict)
@@ -152,6 +181,30 @@ class TestGradingConfigManager:
         finally:
             Path(temp_path).unlink()
 
+    def test_load_config_reuses_parse_until_file_changes(
+        self, config_manager, sample_config_dict, tmp_path, monkeypatch
+    ):
+        """Test that an unchanged file is parsed once and copies are returned."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.dump(sample_config_dict))
+
+        first = config_manager.load_config(str(config_path))
+        first.graders.clear()
+
+        monkeypatch.setattr(
+            GradingConfigManager,
+            "_parse_config",
+            lambda self, data: pytest.fail("unchanged config parsed again"),
+        )
+        second = GradingConfigManager().load_config(str(config_path))
+        assert len(second.graders) == 2
+
+        monkeypatch.undo()
+        sample_config_dict["grading"]["runs_per_grader"] = 3
+        config_path.write_text(yaml.dump(sample_config_dict) + "\n")
+
+        assert config_manager.load_config(str(config_path)).runs_per_grader == 3
+
     def test_load_config_nonexistent_file(self, config_manager):
         """Test loading configuration from nonexistent file."""
         config = config_manager.load_config("nonexistent.yaml")
@@ -197,6 +250,42 @@ class TestGradingConfigManager:
             config = config_manager._parse_config(config_dict)
             config_manager._validate_config(config)
 
+    def test_validate_config_invalid_runs_mode(self, config_manager):
+        """Test configuration validation with invalid runs mode."""
+        config_dict = {
+            "grading": {"runs_per_grader": 3, "runs_mode": "sequential"},
+            "graders": [
+                {
+                    "name": "test",
+                    "provider": "anthropic",
+                    "model": "claude-3-sonnet",
+                }
+            ],
+            "execution": {},
+        }
+
+        with pytest.raises(ValueError, match="Invalid runs_mode"):
+            config = config_manager._parse_config(config_dict)
+            config_manager._validate_config(config)
+
+    def test_validate_config_mark_only_primary_feedback(self, config_manager):
+        """Test that the primary feedback grader cannot be mark_only."""
+        config_dict = {
+            "graders": [
+                {
+                    "name": "test",
+                    "provider": "anthropic",
+                    "model": "claude-3-sonnet",
+                    "primary_feedback": True,
+                    "mark_only": True,
+                }
+            ],
+        }
+
+        with pytest.raises(ValueError, match="cannot be both primary_feedback"):
+            config = config_manager._parse_config(config_dict)
+            config_manager._validate_config(config)
+
     def test_validate_config_invalid_provider(self, config_manager):
         """Test configuration validation with invalid provider."""
         config_dict = {
@@ -253,6 +342,9 @@ class TestGradingConfigManager:
 
         assert len(filtered_config.graders) == 1
         assert filtered_config.graders[0].provider == "anthropic"
+        assert filtered_config.prompts == config.prompts
+        assert filtered_config.prompt_sections == config.prompt_sections
+        assert len(config.graders) == 2
 
     def test_filter_graders_no_available_providers(
         self, config_manager, sample_config_dict
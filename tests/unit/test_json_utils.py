@@ -0,0 +1,36 @@
+"""Tests for the JSON helpers."""
+
+import json
+
+from mark_mate.utils import json_utils
+
+
+class TestJsonUtils:
+    """Test that json_utils matches the standard library output."""
+
+    def test_indented_output_matches_stdlib(self):
+        """Test that indented output is identical to json.dumps(indent=2)."""
+        data = {"student": "Zoë", "marks": [1, 2.5], "nested": {"empty": {}}}
+
+        assert json_utils.dumps(data, indent=True) == json.dumps(
+            data, indent=2, ensure_ascii=False
+        )
+
+    def test_round_trip(self, tmp_path):
+        """Test that dumped JSON can be loaded back from text and files."""
+        data = {"students": {"001": {"text": "ünïcode"}}}
+        path = tmp_path / "data.json"
+        path.write_text(json_utils.dumps(data), encoding="utf-8")
+
+        assert json_utils.loads(json_utils.dumps(data)) == data
+        assert json_utils.load_file(str(path)) == data
+
+    def test_dumps_line_is_one_jsonl_record(self):
+        """Test that dumps_line writes a single UTF-8 line that loads back."""
+        data = {"001": {"feedback": "Line one\nline two", "name": "Zoë"}}
+
+        line = json_utils.dumps_line(data)
+
+        assert line.endswith(b"\n")
+        assert line.count(b"\n") == 1
+        assert json_utils.loads(line) == data
@@ -0,0 +1,127 @@
+"""Tests for the unified LLM provider helpers."""
+
+import asyncio
+import re
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+from mark_mate.core.llm_provider import LLMProvider
+
+
+def _stream(*texts, finish_reason="stop"):
+    """Build an async stream of completion chunks, the last one finishing."""
+
+    async def chunks():
+        for i, text in enumerate(texts):
+            yield ModelResponseStream(
+                id="chunk",
+                model="gpt-4o-mini",
+                choices=[
+                    StreamingChoices(
+                        index=0,
+                        delta=Delta(content=text),
+                        finish_reason=finish_reason if i == len(texts) - 1 else None,
+                    )
+                ],
+            )
+
+    return chunks()
+
+
+class TestLLMProvider:
+    """Test LLMProvider helpers that do not call a provider."""
+
+    def test_count_tokens_uses_model_tokenizer(self, llm_provider):
+        """Test that tokens are counted with the model's tokenizer."""
+        text = "def grade(x):\n    return x * 2\n" * 50
+
+        tokens = llm_provider.count_tokens("openai", "gpt-4o", text)
+
+        assert tokens > 0
+        assert tokens != len(text) // 4
+
+    def test_count_tokens_counts_shared_prefix_once(self, llm_provider):
+        """Test that a shared prefix is tokenized once and suffixes are added."""
+        prefix = "Assignment spec and rubric\n" * 20
+        with patch(
+            "mark_mate.core.llm_provider.litellm.token_counter",
+            side_effect=lambda model, text: len(text),
+        ) as token_counter:
+            counts = [
+                llm_provider.count_tokens("openai", "gpt-4o", prefix + suffix, prefix)
+                for suffix in ("Student one", "Student two!")
+            ]
+
+        assert counts == [len(prefix) + 11, len(prefix) + 12]
+        counted = [c.kwargs["text"] for c in token_counter.call_args_list]
+        assert counted == [prefix, "Student one", "Student two!"]
+
+    def test_rate_limits_are_shared_per_model(self):
+        """Test that each model gets one bucket using the lowest configured limit."""
+        provider = LLMProvider()
+
+        async def acquire_all():
+            for model, rate_limit in (
+                ("gpt-4o", 600),
+                ("gpt-4o", 300),
+                ("gpt-4o", 600),
+                ("gpt-4o-mini", 900),
+            ):
+                await provider._respect_rate_limit_async("openai", model, rate_limit)
+
+        asyncio.run(acquire_all())
+
+        assert {key: b.rpm for key, b in provider.rate_limiters.items()} == {
+            "openai:gpt-4o": 300,
+            "openai:gpt-4o-mini": 900,
+        }
+
+    def test_count_tokens_unknown_model_falls_back(self, llm_provider):
+        """Test the characters / 4 estimate for models that are not configured."""
+        assert llm_provider.count_tokens("openai", "no-such-model", "x" * 40) == 10
+
+    @pytest.mark.parametrize(
+        ("headers", "expected"),
+        [
+            ({"retry-after": "12"}, 12.0),
+            ({"Retry-After": "1.5"}, 1.5),
+            ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+            ({"retry-after": "soon"}, None),
+            ({}, None),
+        ],
+    )
+    def test_retry_after_from_response_headers(self, headers, expected):
+        """Test reading Retry-After as seconds or an HTTP date."""
+        error = Exception("rate limited")
+        error.response = SimpleNamespace(headers=headers)
+
+        assert LLMProvider._retry_after(error) == expected
+
+    @pytest.mark.parametrize(
+        ("texts", "content", "finish_reason"),
+        [
+            (("MARK: 8", "5/100\n", "FEEDBACK: Good"), "MARK: 85/100\n", None),
+            (("MARK: 8", "5"), "MARK: 85", "stop"),
+        ],
+    )
+    def test_stream_until_reports_whether_it_stopped(
+        self, llm_provider, texts, content, finish_reason
+    ):
+        """Test that a stream cut off by the pattern has no finish_reason."""
+        with patch(
+            "mark_mate.core.llm_provider.acompletion",
+            new=AsyncMock(return_value=_stream(*texts)),
+        ):
+            response = asyncio.run(
+                llm_provider._stream_until(
+                    re.compile(r"MARK: (\d+)(?=\D)"),
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": "Grade"}],
+                )
+            )
+
+        assert response.choices[0].message.content == content
+        assert response.choices[0].finish_reason == finish_reason
@@ -0,0 +1,30 @@
+"""Tests for the top-level package interface."""
+
+import subprocess
+import sys
+
+import mark_mate
+
+
+class TestLazyImports:
+    """Test that library classes are imported on first use."""
+
+    def test_import_does_not_load_llm_stack(self):
+        """Test that importing the package and CLI leaves LiteLLM unloaded."""
+        code = (
+            "import sys, mark_mate, mark_mate.cli.main; "
+            "print('litellm' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip() == "False"
+
+    def test_lazy_attributes_resolve(self):
+        """Test that exported names resolve to the real classes."""
+        from mark_mate.core.enhanced_grader import EnhancedGradingSystem
+
+        assert mark_mate.EnhancedGradingSystem is EnhancedGradingSystem
+        assert mark_mate.GradingSystem is EnhancedGradingSystem
+        assert set(mark_mate.__all__) <= set(dir(mark_mate))
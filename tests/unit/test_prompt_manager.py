@@ -1,7 +1,12 @@
 """Tests for the PromptManager class."""
 
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
+from mark_mate.config.grading_config import GradingConfigManager
 from mark_mate.core.prompt_manager import PromptManager, PromptTemplate
 
 
@@ -47,6 +52,20 @@ class TestPromptManager:
         manager = PromptManager({})
         assert "default" in manager.prompts  # Should create fallback
 
+    def test_fallback_prompt_is_not_shared(self):
+        """Test that changing one manager's fallback leaves others untouched."""
+        first = PromptManager({})
+        first.prompts["default"]["system"] = "changed"
+
+        assert PromptManager({}).prompts["default"]["system"] != "changed"
+
+    def test_prompt_template_is_frozen(self, prompt_manager):
+        """Test that templates cannot be modified after creation."""
+        template = prompt_manager.get_prompt_template()
+
+        with pytest.raises(AttributeError):
+            template.system = "changed"
+
     def test_get_prompt_template_default(self, prompt_manager):
         """Test getting default prompt template."""
         template = prompt_manager.get_prompt_template()
@@ -61,11 +80,29 @@ class TestPromptManager:
         assert template.system == "You are a programming instructor."
         assert "Code review:" in template.template
 
+    @pytest.mark.skipif(
+        sys.version_info < (3, 10), reason="dataclass slots need Python 3.10+"
+    )
+    def test_prompt_template_uses_slots(self, prompt_manager):
+        """Test that templates have no per-instance __dict__."""
+        template = prompt_manager.get_prompt_template()
+
+        assert not hasattr(template, "__dict__")
+
     def test_get_prompt_template_with_assignment_type(self, prompt_manager):
         """Test getting prompt template with assignment type preference."""
         template = prompt_manager.get_prompt_template(assignment_type="programming")
         assert template.system == "You are a programming instructor."
 
+    def test_get_prompt_template_follows_prompt_changes(self, prompt_manager):
+        """Test that changes to the public prompts dict are picked up."""
+        prompt_manager.get_prompt_template("programming")
+        prompt_manager.prompts["programming"]["system"] = "You review code."
+
+        template = prompt_manager.get_prompt_template("programming")
+
+        assert template.system == "You review code."
+
     def test_build_grading_prompt(self, prompt_manager):
         """Test building a complete grading prompt."""
         student_data = {
@@ -87,6 +124,117 @@ class TestPromptManager:
         assert "Test assignment" in result["user"]
         assert "123" in result["user"]
 
+    def test_build_grading_prompt_shared_prefix(self, prompt_manager):
+        """Test that the prefix holds only the student-independent lines."""
+        prompts = [
+            prompt_manager.build_grading_prompt(
+                student_data={"student_id": student_id, "content": {}},
+                assignment_spec="Test assignment",
+                rubric="Grade on accuracy",
+                max_mark=100,
+            )
+            for student_id in ("123", "456")
+        ]
+
+        assert prompts[0]["prefix"] == "Grade this: Test assignment\n"
+        assert prompts[0]["prefix"] == prompts[1]["prefix"]
+        assert all(p["user"].startswith(p["prefix"]) for p in prompts)
+        assert all(p["prefix"] + p["suffix"] == p["user"] for p in prompts)
+        assert prompts[0]["prefix"] is prompts[1]["prefix"]
+
+    def test_shared_prefix_rendered_once(self, prompt_manager):
+        """Test that the shared prefix is reused and the prompt is unchanged."""
+        student_data = {"student_id": "123", "content": {}}
+        first = prompt_manager.build_grading_prompt(
+            student_data, "Test assignment", "Grade on accuracy", 100
+        )
+
+        with patch.object(
+            prompt_manager,
+            "_substitute_placeholders",
+            wraps=prompt_manager._substitute_placeholders,
+        ) as substitute:
+            second = prompt_manager.build_grading_prompt(
+                student_data, "Test assignment", "Grade on accuracy", 100
+            )
+
+        assert second == first
+        assert substitute.call_count == 1
+        template = prompt_manager.get_prompt_template("default").template
+        context = prompt_manager._build_prompt_context(
+            student_data, "Test assignment", "Grade on accuracy", 100
+        )
+        assert first["user"] == prompt_manager._substitute_placeholders(
+            template, context
+        )
+
+    def test_output_format_renders_max_mark(self):
+        """Test that the default output format is filled in, braces unescaped."""
+        config = GradingConfigManager.DEFAULT_CONFIG
+        manager = PromptManager(
+            {
+                "prompts": config["prompts"],
+                "prompt_sections": config["prompt_sections"],
+            }
+        )
+
+        prompt = manager.build_grading_prompt(
+            {"student_id": "s1", "content": {}}, "Spec", "Rubric", 40
+        )
+
+        assert '"max_mark": 40,' in prompt["user"]
+        assert "{{" not in prompt["user"] and "{max_mark}" not in prompt["user"]
+
+    def test_default_templates_end_with_submission(self):
+        """Test that built-in prompts keep everything but the submission cacheable."""
+        config = GradingConfigManager.DEFAULT_CONFIG
+        manager = PromptManager(
+            {
+                "prompts": config["prompts"],
+                "prompt_sections": config["prompt_sections"],
+            }
+        )
+
+        for assignment_type in (None, "wordpress"):
+            prompt = manager.build_grading_prompt(
+                student_data={"student_id": "s42", "content": {}},
+                assignment_spec="Build a site",
+                rubric="Design 50%",
+                max_mark=100,
+                assignment_type=assignment_type,
+            )
+
+            suffix = prompt["user"][len(prompt["prefix"]) :]
+            assert "REQUIRED OUTPUT FORMAT" in prompt["prefix"]
+            assert "s42" not in prompt["prefix"]
+            assert suffix.startswith("STUDENT") and "s42" in suffix
+
+        group_prompt = manager.build_group_grading_prompt(
+            [{"student_id": "s42", "content": {}}], "Build a site", "Design 50%", 100
+        )
+        assert group_prompt["prefix"].endswith("GRADING RUBRIC:\nDesign 50%\n\n")
+        assert group_prompt["prefix"] + group_prompt["suffix"] == group_prompt["user"]
+
+    def test_example_config_templates_end_with_submission(self):
+        """Test that the checked-in example config keeps a cacheable prefix."""
+        example = Path(__file__).parents[2] / "grading_config.yaml"
+        config = GradingConfigManager().load_config(str(example))
+        manager = PromptManager(
+            {"prompts": config.prompts, "prompt_sections": config.prompt_sections}
+        )
+
+        for assignment_type in (None, "wordpress"):
+            prompt = manager.build_grading_prompt(
+                student_data={"student_id": "s42", "content": {}},
+                assignment_spec="Build a site",
+                rubric="Design 50%",
+                max_mark=100,
+                assignment_type=assignment_type,
+            )
+
+            assert "REQUIRED OUTPUT FORMAT" in prompt["prefix"]
+            assert prompt["suffix"].startswith("STUDENT") and "s42" in prompt["suffix"]
+
     def test_placeholder_substitution_missing_values(self, prompt_manager):
         """Test placeholder substitution with missing values."""
         template = "Test {missing_placeholder} here"
@@ -95,6 +243,16 @@ class TestPromptManager:
         result = prompt_manager._substitute_placeholders(template, context)
         assert "[missing_placeholder not available]" in result
 
+    def test_placeholder_substitution_keeps_literal_braces(self, prompt_manager):
+        """Test that JSON examples and escaped braces survive substitution."""
+        template = 'Score {student_id} as {"mark": 5} or {{"mark": {max_mark}}}'
+
+        result = prompt_manager._substitute_placeholders(
+            template, {"student_id": "123", "max_mark": "10"}
+        )
+
+        assert result == 'Score 123 as {"mark": 5} or {"mark": 10}'
+
     def test_content_summary_generation(self, prompt_manager):
         """Test content summary generation."""
         content = {
@@ -117,6 +275,26 @@ class TestPromptManager:
         assert "doc1.txt" in summary
         assert "script.py" in summary
 
+    def test_content_summary_counts_and_wordpress(self, prompt_manager):
+        """Test line counts and the WordPress section of the summary."""
+        content = {
+            "code": [
+                {
+                    "filename": "a.py",
+                    "content": "x = 1\r\ny = 2\r\n",
+                    "language": "python",
+                },
+                {"filename": "b.py", "content": "z = 3", "language": "python"},
+            ],
+            "wordpress_theme_files": {"files_found": ["style.css", "functions.php"]},
+        }
+
+        summary = prompt_manager._generate_content_summary(content)
+
+        assert "CODE FILES: 2 files, 3 lines total" in summary
+        assert "  - a.py (python): 2 lines" in summary
+        assert "WORDPRESS SITE ANALYSIS:\n  - Theme Files: 2 files" in summary
+
     def test_list_available_prompts(self, prompt_manager):
         """Test listing available prompt templates."""
         prompts = prompt_manager.list_available_prompts()
@@ -0,0 +1,76 @@
+"""Tests for request rate limiting."""
+
+import asyncio
+import time
+
+import pytest
+
+from mark_mate.core.rate_limiter import AsyncTokenBucket, TokenBudget
+
+
+class TestAsyncTokenBucket:
+    """Test the async token bucket."""
+
+    def test_concurrent_requests_are_spaced(self):
+        """Test that concurrent callers get successive slots."""
+        bucket = AsyncTokenBucket(rpm=1200)  # one request every 0.05s
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+
+        assert elapsed >= 0.15
+        assert elapsed < 1.0
+
+    def test_first_request_is_immediate(self):
+        """Test that an idle bucket does not delay the first request."""
+        bucket = AsyncTokenBucket(rpm=1)
+
+        start = time.monotonic()
+        asyncio.run(bucket.acquire())
+
+        assert time.monotonic() - start < 0.5
+
+    def test_invalid_rate_rejected(self):
+        """Test that a non-positive rate limit is rejected."""
+        with pytest.raises(ValueError, match="Rate limit must be positive"):
+            AsyncTokenBucket(rpm=0)
+
+
+class TestTokenBudget:
+    """Test the tokens-per-minute budget."""
+
+    def test_requests_within_budget_are_immediate(self):
+        """Test that requests fitting in the window are not delayed."""
+        budget = TokenBudget(tpm=1000)
+
+        assert budget.reserve(400) == 0
+        assert budget.reserve(600) == 0
+
+    def test_request_over_budget_waits_for_window(self, monkeypatch):
+        """Test that an over-budget request waits for old entries to expire."""
+        now = 100.0
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        budget = TokenBudget(tpm=1000)
+
+        budget.reserve(700)
+        now = 110.0
+        budget.reserve(200)
+
+        assert budget.reserve(300) == pytest.approx(50.0)
+        # Later callers queue behind the delayed request
+        assert budget.reserve(1) == pytest.approx(50.0)
+
+    def test_oversized_request_is_let_through(self):
+        """Test that a request larger than the whole budget is not stuck."""
+        budget = TokenBudget(tpm=100)
+
+        assert budget.reserve(500) == 0
+
+    def test_invalid_limit_rejected(self):
+        """Test that a non-positive token limit is rejected."""
+        with pytest.raises(ValueError, match="Token limit must be positive"):
+            TokenBudget(tpm=0)
@@ -0,0 +1,24 @@
+"""Tests for the grading response schema."""
+
+from mark_mate.core.response_schema import GradingResponse, build_response_schema
+
+
+class TestBuildResponseSchema:
+    """Test strict response_format generation."""
+
+    def test_schema_is_strict(self):
+        """Test that every field is required and extra fields are rejected."""
+        response_format = build_response_schema(40)
+        schema = response_format["json_schema"]["schema"]
+
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["strict"] is True
+        assert set(schema["required"]) == set(GradingResponse.model_fields)
+        assert schema["additionalProperties"] is False
+        assert schema["properties"]["mark"]["maximum"] == 40
+        assert not any("default" in prop for prop in schema["properties"].values())
+
+    def test_schema_is_built_once_per_max_mark(self):
+        """Test that repeated calls share one schema."""
+        assert build_response_schema(100) is build_response_schema(100)
+        assert build_response_schema(100) is not build_response_schema(50)
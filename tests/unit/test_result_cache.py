@@ -0,0 +1,43 @@
+"""Tests for the on-disk grading result cache."""
+
+from mark_mate.core.result_cache import ResultCache
+
+
+class TestResultCache:
+    """Test ResultCache storage and key generation."""
+
+    def test_round_trip_persists_across_instances(self, tmp_path):
+        """Test that stored results can be read by a new cache instance."""
+        cache = ResultCache(str(tmp_path))
+        key = ResultCache.make_key("prompt", "gpt-4o", 0.1)
+        cache.set(key, {"mark": 75})
+        cache.close()
+
+        reopened = ResultCache(str(tmp_path))
+
+        assert reopened.get(key) == {"mark": 75}
+        assert reopened.hits == 1
+
+    def test_miss_returns_none(self, tmp_path):
+        """Test that an unknown key is a miss."""
+        cache = ResultCache(str(tmp_path))
+
+        assert cache.get("missing") is None
+        assert cache.misses == 1
+
+    def test_key_depends_on_every_part(self):
+        """Test that changing any key component changes the key."""
+        base = ResultCache.make_key("prompt", "gpt-4o", 0.1)
+
+        assert base == ResultCache.make_key("prompt", "gpt-4o", 0.1)
+        assert base != ResultCache.make_key("prompt", "gpt-4o", 0.2)
+        assert base != ResultCache.make_key("prompt", "gpt-4o-mini", 0.1)
+
+    def test_set_many_stores_every_result(self, tmp_path):
+        """Test that results stored together can all be read back."""
+        cache = ResultCache(str(tmp_path))
+        items = [(ResultCache.make_key(i), {"mark": i}) for i in range(3)]
+
+        cache.set_many(items)
+
+        assert [cache.get(key) for key, _ in items] == [{"mark": i} for i in range(3)]
@@ -0,0 +1,97 @@
+"""Tests for the GitHub URL scan command."""
+
+import os
+import zipfile
+
+import pytest
+
+from mark_mate.cli import scan
+from mark_mate.cli.scan import scan_cache_path, scan_submissions_folder
+
+
+class TestScanCache:
+    """Test reuse of per-file scan results between scans."""
+
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path_factory, monkeypatch):
+        """Keep scan caches out of the user's cache directory."""
+        cache_dir = tmp_path_factory.mktemp("cache")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(cache_dir))
+        return cache_dir
+
+    def _write_submission(self, folder, url):
+        path = folder / "123_smith" / "README.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"Repository: {url}\n")
+        return path
+
+    def test_unchanged_files_are_not_rescanned(self, tmp_path, monkeypatch):
+        """Test that a second scan reuses cached URLs for unchanged files."""
+        self._write_submission(tmp_path, "https://github.com/smith/project")
+        first = scan_submissions_folder(str(tmp_path), use_cache=True)
+
+        calls = []
+        monkeypatch.setattr(
+            scan, "scan_text_file", lambda *args: calls.append(args) or []
+        )
+        second = scan_submissions_folder(str(tmp_path), use_cache=True)
+
+        assert calls == []
+        assert second == first == {"123": ["https://github.com/smith/project"]}
+
+    def test_cache_is_kept_out_of_submissions_folder(self, tmp_path, cache_dir):
+        """Test that each folder's cache is stored under the cache directory."""
+        submissions = tmp_path / "submissions"
+        self._write_submission(submissions, "https://github.com/smith/project")
+
+        scan_submissions_folder(str(submissions), use_cache=True)
+
+        assert [p.name for p in submissions.iterdir()] == ["123_smith"]
+        cache_path = scan_cache_path(str(submissions))
+        assert cache_path.startswith(str(cache_dir))
+        assert os.path.exists(cache_path)
+        assert scan_cache_path(str(tmp_path)) != cache_path
+        assert scan_cache_path(str(submissions), "elsewhere").startswith("elsewhere")
+
+    def test_modified_files_are_rescanned(self, tmp_path):
+        """Test that a changed file is scanned again."""
+        path = self._write_submission(tmp_path, "https://github.com/smith/project")
+        scan_submissions_folder(str(tmp_path), use_cache=True)
+
+        path.write_text("Moved to https://github.com/smith/project-v2\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        urls = scan_submissions_folder(str(tmp_path), use_cache=True)
+
+        assert urls == {"123": ["https://github.com/smith/project-v2"]}
+
+    def test_cache_is_ignored_for_other_encodings(self, tmp_path):
+        """Test that results saved with another encoding are discarded."""
+        self._write_submission(tmp_path, "https://github.com/smith/project")
+        scan_submissions_folder(str(tmp_path), use_cache=True)
+        cache_path = scan_cache_path(str(tmp_path))
+
+        assert scan.load_scan_cache(cache_path, "utf-8")
+        assert scan.load_scan_cache(cache_path, "latin-1") == {}
+
+
+class TestScanSubmission:
+    """Test scanning one consolidated submission."""
+
+    def test_scans_zip_and_folder_submissions(self, tmp_path):
+        """Test that URLs are found in a zip file and throughout a folder."""
+        zip_path = tmp_path / "123.zip"
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            archive.writestr("README.md", "https://github.com/smith/project")
+        folder = tmp_path / "456" / "docs"
+        folder.mkdir(parents=True)
+        (folder / "notes.txt").write_text("git@github.com:jones/site.git")
+        (folder / "links.md").write_text("github.com/jones/site")
+
+        assert scan.scan_submission(str(zip_path)) == [
+            "https://github.com/smith/project"
+        ]
+        assert scan.scan_submission(str(tmp_path / "456")) == [
+            "https://github.com/jones/site"
+        ]
@@ -0,0 +1,35 @@
+"""Tests for environment-based settings."""
+
+import pytest
+
+from mark_mate.config import settings
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    """Environment without any provider API keys."""
+    for envs in settings.PROVIDER_API_KEY_ENVS.values():
+        for env in envs:
+            monkeypatch.delenv(env, raising=False)
+    return monkeypatch
+
+
+class TestApiKeys:
+    """Test API key discovery."""
+
+    def test_fallback_env_var_is_used(self, clean_env):
+        """Test that GOOGLE_API_KEY enables Gemini when GEMINI_API_KEY is unset."""
+        clean_env.setenv("GOOGLE_API_KEY", "google-key")
+
+        assert settings.get_api_keys()["gemini"] == "google-key"
+        assert settings.available_providers() == ["gemini"]
+
+    def test_validate_api_keys_accepts_aliases(self, clean_env):
+        """Test that 'claude' is checked against the Anthropic key."""
+        clean_env.setenv("ANTHROPIC_API_KEY", "anthropic-key")
+
+        assert settings.validate_api_keys(["claude", "openai", "unknown"]) == {
+            "claude": True,
+            "openai": False,
+            "unknown": False,
+        }